@@ -4,9 +4,15 @@ Calendar adapter package for Google Calendar integration.
 
 # Export all calendar-related functions
 from adapter.calendar.auth import get_calendar_service
+from adapter.calendar.backend import get_backend
+from adapter.calendar.batch import (
+    send_bulk_create_request,
+    send_bulk_delete_request,
+    send_bulk_update_request
+)
 from adapter.calendar.events import (
     send_create_event_request,
     send_delete_event_request,
     send_update_event_request
 )
-from adapter.calendar.queries import list_calendar_events
+from adapter.calendar.queries import iter_calendar_events, list_calendar_events
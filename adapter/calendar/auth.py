@@ -2,46 +2,122 @@
 Authentication utilities for Google Calendar API.
 """
 
+import logging
 import os
 import json
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
+import threading
+
+from adapter.common.discovery import build_service
+
+logger = logging.getLogger(__name__)
 
 # Calendar API requires specific scope
 CREDS_PATH = os.path.join(os.path.dirname(__file__), "../../secrets/google-calendar.json")
 TOKEN_PATH = os.path.join(os.path.dirname(__file__), "../../secrets/token.json")
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
-def get_calendar_service():
+# Credentials and service are loaded once per process and shared by all calls.
+# The service's authorized HTTP refreshes the access token itself once it is
+# within google-auth's refresh threshold of expiry; nothing is refreshed early.
+_credentials = None
+_service = None
+_lock = threading.Lock()
+
+def _save_credentials(creds):
+    with open(TOKEN_PATH, 'w') as token_file:
+        token_file.write(creds.to_json())
+
+def get_calendar_credentials(interactive=True):
     """
-    Helper function to handle authentication and return a Google Calendar service object.
-    Handles token caching and OAuth flow.
+    Return the process-wide Calendar credentials, loading them on first use.
+
+    Credentials are refreshed only when they are expired or about to expire,
+    and the refreshed token is written back to the token file.
+    
+    Args:
+        interactive: Run the browser OAuth flow when there are no valid credentials.
+            With False (e.g. during warmup), return None instead.
+    
+    Returns:
+        Google OAuth credentials, or None if unavailable and not interactive
     """
+    global _credentials
+    
+    creds = _credentials
+    if creds is not None and creds.valid:
+        return creds
+    
+    with _lock:
+        creds = _credentials
+        if creds is None:
+            creds = _load_credentials(interactive)
+            if creds is None:
+                return None
+        elif not creds.valid and creds.refresh_token:
+            from google.auth.transport.requests import Request
+            logger.info("Refreshing calendar credentials near expiry")
+            creds.refresh(Request())
+            _save_credentials(creds)
+        _credentials = creds
+        return creds
+
+def refresh_calendar_credentials(rejected_token):
+    """
+    Refresh the process-wide Calendar credentials after the API rejected a token.
+
+    Callers that were rejected with the same token at the same time share one
+    refresh: if the cached token has already changed, it is returned as is.
+
+    Args:
+        rejected_token: Access token the API answered with 401
+
+    Returns:
+        Google OAuth credentials, or None if there are none or they cannot
+        be refreshed
+    """
+    with _lock:
+        creds = _credentials
+        if creds is None:
+            return None
+        if creds.token == rejected_token:
+            if not creds.refresh_token:
+                return None
+            from google.auth.transport.requests import Request
+            logger.info("Refreshing calendar credentials rejected by the API")
+            creds.refresh(Request())
+            _save_credentials(creds)
+        return creds
+
+def _load_credentials(interactive):
+    # Google client libraries are slow to import, so load them on first use
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from google.oauth2.credentials import Credentials
+    from google.auth.transport.requests import Request
+    
     # Check if we already have valid credentials stored
     creds = None
     if os.path.exists(TOKEN_PATH):
         try:
-            print("Loading existing credentials from token file")
+            logger.info("Loading existing credentials from token file")
             with open(TOKEN_PATH, 'r') as token_file:
                 token_data = json.load(token_file)
                 creds = Credentials.from_authorized_user_info(token_data, SCOPES)
             
-            # Check if credentials are expired and refresh if possible
-            if creds.expired and creds.refresh_token:
-                print("Refreshing expired credentials")
+            # Refresh if expired (or about to) and save the refreshed credentials
+            if not creds.valid and creds.refresh_token:
+                logger.info("Refreshing expired credentials")
                 creds.refresh(Request())
-                # Save the refreshed credentials
-                with open(TOKEN_PATH, 'w') as token_file:
-                    token_file.write(creds.to_json())
+                _save_credentials(creds)
         except Exception as e:
-            print(f"Error loading credentials: {e}")
+            logger.error(f"Error loading credentials: {e}")
             creds = None
     
     # If we don't have valid credentials, run the OAuth flow
     if not creds or not hasattr(creds, 'valid') or not creds.valid:
-        print("No valid credentials found, running OAuth flow")
+        if not interactive:
+            logger.warning("No valid calendar credentials found, skipping OAuth flow")
+            return None
+        logger.warning("No valid credentials found, running OAuth flow")
         # Create a flow instance to manage the OAuth 2.0 Authorization Grant Flow steps
         flow = InstalledAppFlow.from_client_secrets_file(CREDS_PATH, SCOPES)
         
@@ -50,9 +126,31 @@ def get_calendar_service():
         creds = flow.run_local_server(port=0)
         
         # Save the credentials for future use
-        with open(TOKEN_PATH, 'w') as token_file:
-            token_file.write(creds.to_json())
+        _save_credentials(creds)
+    
+    return creds
+
+def get_calendar_service(interactive=True):
+    """
+    Helper function to handle authentication and return a Google Calendar service object.
+    
+    The service is built once per process from the discovery document bundled
+    with googleapiclient, so no call fetches it over the network.
+    
+    Args:
+        interactive: Run the browser OAuth flow when there are no valid credentials.
+            With False (e.g. during warmup), return None instead.
+    """
+    global _service
+    
+    if _service is not None:
+        return _service
+    
+    creds = get_calendar_credentials(interactive=interactive)
+    if creds is None:
+        return None
     
-    # Build and return the service object
-    service = build('calendar', 'v3', credentials=creds)
-    return service
+    with _lock:
+        if _service is None:
+            _service = build_service('calendar', 'v3', creds)
+        return _service
@@ -0,0 +1,212 @@
+"""
+Pluggable transport for the calendar adapter.
+
+events.py and queries.py talk to Google Calendar through a backend chosen
+with the MCP_CALENDAR_BACKEND environment variable:
+- "googleapiclient" (default): the discovery-based client, run on the
+  calendar thread pool
+- "httpx": the native async client in adapter.calendar.client
+
+Both backends take and return Calendar v3 resources as plain dicts. patch()
+takes an optional etag, sent as If-Match so the patch fails with 412 if the
+event changed since that version.
+
+watch() registers a push-notification channel for the calendar's events and
+stop_channel() ends one.
+
+batch() sends many operations in one multipart batch request. Operations are
+dicts with "method" ("insert", "get", "patch" or "delete"), and "event_id"
+and "body" where the method needs them. Each result is a
+(status_code, payload) pair, with payload {"message": ..., "reason": ...}
+for failed operations.
+"""
+
+import os
+
+from adapter.calendar.auth import get_calendar_service
+from adapter.common.executor import execute, run_blocking
+
+CALENDAR_BACKEND = os.environ.get("MCP_CALENDAR_BACKEND", "googleapiclient").lower()
+
+class GoogleApiClientBackend:
+    """Calendar backend on googleapiclient."""
+
+    name = "googleapiclient"
+    calendar_id = "primary"
+
+    async def _events(self):
+        service = await run_blocking("google_calendar", get_calendar_service)
+        return service.events()
+
+    async def insert(self, body, fields=None):
+        events = await self._events()
+        return await execute("google_calendar", "events.insert",
+                             events.insert(calendarId=self.calendar_id, body=body, fields=fields))
+
+    async def get(self, event_id, fields=None):
+        events = await self._events()
+        return await execute("google_calendar", "events.get",
+                             events.get(calendarId=self.calendar_id, eventId=event_id, fields=fields))
+
+    async def update(self, event_id, body, fields=None):
+        events = await self._events()
+        return await execute("google_calendar", "events.update",
+                             events.update(calendarId=self.calendar_id, eventId=event_id, body=body, fields=fields))
+
+    async def patch(self, event_id, body, fields=None, etag=None):
+        events = await self._events()
+        request = events.patch(calendarId=self.calendar_id, eventId=event_id, body=body, fields=fields)
+        if etag:
+            request.headers["If-Match"] = etag
+        return await execute("google_calendar", "events.patch", request)
+
+    async def delete(self, event_id):
+        events = await self._events()
+        await execute("google_calendar", "events.delete",
+                      events.delete(calendarId=self.calendar_id, eventId=event_id))
+
+    async def list(self, fields=None, **params):
+        events = await self._events()
+        return await execute("google_calendar", "events.list",
+                             events.list(calendarId=self.calendar_id, fields=fields, **params))
+
+    async def watch(self, body):
+        events = await self._events()
+        return await execute("google_calendar", "events.watch",
+                             events.watch(calendarId=self.calendar_id, body=body))
+
+    async def stop_channel(self, body):
+        service = await run_blocking("google_calendar", get_calendar_service)
+        await execute("google_calendar", "channels.stop", service.channels().stop(body=body))
+
+    def _request(self, events, operation):
+        method = operation["method"]
+        if method == "insert":
+            return events.insert(calendarId=self.calendar_id, body=operation["body"])
+        if method == "get":
+            return events.get(calendarId=self.calendar_id, eventId=operation["event_id"])
+        if method == "patch":
+            return events.patch(calendarId=self.calendar_id, eventId=operation["event_id"], body=operation["body"])
+        if method == "delete":
+            return events.delete(calendarId=self.calendar_id, eventId=operation["event_id"])
+        raise ValueError(f"Unsupported batch method {method!r}")
+
+    async def batch(self, operations):
+        service = await run_blocking("google_calendar", get_calendar_service)
+        events = service.events()
+        results = [(None, None)] * len(operations)
+
+        def callback(request_id, response, exception):
+            if exception is None:
+                results[int(request_id)] = (200, response)
+            else:
+                status = getattr(getattr(exception, "resp", None), "status", None)
+                details = getattr(exception, "error_details", None)
+                reason = details[0].get("reason") if isinstance(details, list) and details else None
+                results[int(request_id)] = (int(status) if status else None, {"message": str(exception), "reason": reason})
+
+        batch = service.new_batch_http_request(callback=callback)
+        credentials = None
+        for index, operation in enumerate(operations):
+            request = self._request(events, operation)
+            credentials = credentials or getattr(getattr(request, "http", None), "credentials", None)
+            batch.add(request, request_id=str(index))
+        await execute("google_calendar", "batch", batch, credentials=credentials)
+        return results
+
+class HttpxBackend:
+    """Calendar backend on the native async client."""
+
+    name = "httpx"
+
+    def _client(self):
+        # Imported on first use so the default backend never loads it
+        from adapter.calendar.client import get_calendar_client
+        return get_calendar_client()
+
+    async def insert(self, body, fields=None):
+        return await self._client().insert_event(body, fields=fields)
+
+    async def get(self, event_id, fields=None):
+        return await self._client().get_event(event_id, fields=fields)
+
+    async def update(self, event_id, body, fields=None):
+        return await self._client().update_event(event_id, body, fields=fields)
+
+    async def patch(self, event_id, body, fields=None, etag=None):
+        return await self._client().patch_event(event_id, body, fields=fields, etag=etag)
+
+    async def delete(self, event_id):
+        await self._client().delete_event(event_id)
+
+    async def list(self, fields=None, **params):
+        return await self._client().list_events(fields=fields, **params)
+
+    async def watch(self, body):
+        return await self._client().watch_events(body)
+
+    async def stop_channel(self, body):
+        await self._client().stop_channel(body)
+
+    async def batch(self, operations):
+        client = self._client()
+        requests = []
+        for operation in operations:
+            method = operation["method"]
+            path = f"/calendars/{client.calendar_id}/events"
+            if method != "insert":
+                path = f"{path}/{operation['event_id']}"
+            http_method = {"insert": "POST", "get": "GET", "patch": "PATCH", "delete": "DELETE"}.get(method)
+            if http_method is None:
+                raise ValueError(f"Unsupported batch method {method!r}")
+            requests.append((http_method, path, operation.get("body")))
+
+        results = []
+        for status, payload in await client.batch(requests):
+            if status is not None and status >= 400:
+                error = (payload or {}).get("error", {})
+                errors = error.get("errors") or [{}]
+                payload = {"message": error.get("message", f"HTTP {status}"), "reason": errors[0].get("reason")}
+            results.append((status, payload))
+        return results
+
+def error_status(error):
+    """
+    Get the HTTP status of a failed backend call.
+
+    Args:
+        error: Exception raised by either backend
+
+    Returns:
+        Status code, or None if the error carries none (e.g. a network error)
+    """
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "resp", None), "status", None)
+    return int(status) if status is not None else None
+
+BACKENDS = {
+    GoogleApiClientBackend.name: GoogleApiClientBackend,
+    HttpxBackend.name: HttpxBackend,
+}
+
+_backend = None
+
+def get_backend():
+    """
+    Get the configured calendar backend.
+
+    Returns:
+        Backend instance selected by MCP_CALENDAR_BACKEND
+
+    Raises:
+        ValueError: If MCP_CALENDAR_BACKEND names an unknown backend
+    """
+    global _backend
+
+    if _backend is None:
+        backend_class = BACKENDS.get(CALENDAR_BACKEND)
+        if backend_class is None:
+            raise ValueError(f"Unknown MCP_CALENDAR_BACKEND {CALENDAR_BACKEND!r}; expected one of {sorted(BACKENDS)}")
+        _backend = backend_class()
+    return _backend
@@ -0,0 +1,252 @@
+"""
+Bulk calendar operations through the Google batch endpoint.
+
+Operations are packed into multipart batch requests of up to BATCH_LIMIT
+each, so a bulk call costs one round trip per batch rather than per event;
+at most BATCH_CONCURRENCY batch requests are in flight per bulk call.
+Operations that fail with a retryable error (rate limiting or a server
+error) are collected and retried together, with exponential backoff.
+
+A failed batch request may still have applied some of its operations, so
+only operations that are safe to repeat are retried. Inserts are made safe by
+giving every new event a client-generated id: a repeated insert of an event
+that already exists fails with 409, and the event is then fetched instead.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import uuid
+
+from adapter.calendar.backend import get_backend
+from adapter.calendar.events import build_event_body, record_writes
+
+logger = logging.getLogger(__name__)
+
+# Calendar API limit on requests per batch
+BATCH_LIMIT = 50
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 0.5  # Seconds before the first retry; doubled on each further attempt
+BATCH_CONCURRENCY = int(os.environ.get("MCP_CALENDAR_BATCH_CONCURRENCY", "4"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+def _retryable(operation, status, payload):
+    if operation["method"] == "insert" and not (operation.get("body") or {}).get("id"):
+        # Without an id a repeated insert would create a duplicate
+        return False
+    if status is None or status in RETRY_STATUSES:
+        return True
+    return status == 403 and (payload or {}).get("reason") in RETRY_REASONS
+
+def new_event_id():
+    """
+    Generate an id for an event to insert.
+
+    Calendar ids use base32hex characters (0-9, a-v), which hex digits are.
+    """
+    return uuid.uuid4().hex
+
+async def run_batch(operations):
+    """
+    Run calendar operations through batch requests, retrying transient failures.
+
+    Args:
+        operations: Backend batch operations (see adapter.calendar.backend)
+
+    Returns:
+        Tuple of ((status_code, payload) per operation, number of batch requests sent)
+    """
+    backend = get_backend()
+    operations = list(operations)
+    results = [(None, {"message": "Not sent", "reason": None})] * len(operations)
+    pending = list(range(len(operations)))
+    sent = set()  # Operations sent in an earlier attempt
+    batches = 0
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def send(chunk):
+        async with semaphore:
+            return await backend.batch([operations[i] for i in chunk])
+
+    for attempt in range(MAX_ATTEMPTS):
+        if not pending:
+            break
+        if attempt:
+            await asyncio.sleep(BACKOFF_BASE * 2 ** (attempt - 1) * (1 + random.random()))
+            logger.info(f"Retrying {len(pending)} calendar batch operations (attempt {attempt + 1})")
+
+        chunks = [pending[i:i + BATCH_LIMIT] for i in range(0, len(pending), BATCH_LIMIT)]
+        batches += len(chunks)
+        responses = await asyncio.gather(*(send(chunk) for chunk in chunks), return_exceptions=True)
+
+        retry = []
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, Exception):
+                # The batch request itself failed; its operations are retried where that is safe
+                logger.warning(f"Calendar batch request failed: {response}")
+                status = getattr(response, "status_code", None)
+                response = [(status, {"message": str(response), "reason": getattr(response, "reason", None)})] * len(chunk)
+            for index, (status, payload) in zip(chunk, response):
+                results[index] = (status, payload)
+                operation = operations[index]
+                if status is not None and status < 400:
+                    continue
+                if status == 409 and operation["method"] == "insert" and index in sent:
+                    # Created by an earlier attempt whose response was lost; fetch it
+                    operations[index] = {"method": "get", "event_id": operation["body"]["id"]}
+                    retry.append(index)
+                elif status == 410 and operation["method"] == "delete" and index in sent:
+                    # Deleted by an earlier attempt whose response was lost
+                    results[index] = (204, None)
+                elif _retryable(operation, status, payload):
+                    retry.append(index)
+        sent.update(pending)
+        pending = retry
+
+    return results, batches
+
+def _summarize(items, batches, action):
+    failed = sum(1 for item in items if item["status"] == "error")
+    succeeded = len(items) - failed
+    if failed == 0:
+        status = "success"
+    elif succeeded == 0:
+        status = "error"
+    else:
+        status = "partial"
+    return {
+        "status": status,
+        "message": f"{succeeded} of {len(items)} events {action}",
+        "succeeded": succeeded,
+        "failed": failed,
+        "batches": batches,
+        "results": items,
+    }
+
+def _error_item(index, status, payload, **extra):
+    item = {"index": index, "status": "error", "status_code": status,
+            "message": (payload or {}).get("message", "Unknown error")}
+    item.update(extra)
+    return item
+
+async def send_bulk_create_request(events: list):
+    """
+    Create many calendar events through batch requests.
+
+    Args:
+        events: Dicts with "summary" (or "title"), "start_time", "end_time" and
+            optionally "description", "location" and "attendees" (emails)
+
+    Returns:
+        Dictionary with per-event results and totals
+    """
+    operations, positions, items = [], [], [None] * len(events)
+    for index, spec in enumerate(events):
+        if not isinstance(spec, dict):
+            items[index] = _error_item(index, None, {"message": "each event must be an object"})
+            continue
+        title = spec.get("summary") or spec.get("title")
+        if not title or not spec.get("start_time") or not spec.get("end_time"):
+            items[index] = _error_item(index, None, {"message": "summary, start_time and end_time are required"})
+            continue
+        body = build_event_body(title, spec["start_time"], spec["end_time"], spec.get("description", ""),
+                                spec.get("location"), spec.get("attendees"))
+        body["id"] = new_event_id()
+        operations.append({"method": "insert", "body": body})
+        positions.append(index)
+
+    results, batches = await run_batch(operations)
+    for index, (status, payload) in zip(positions, results):
+        if status is not None and status < 400:
+            items[index] = {"index": index, "status": "success", "event_id": payload.get("id"),
+                            "html_link": payload.get("htmlLink")}
+        else:
+            items[index] = _error_item(index, status, payload)
+    await record_writes([payload for status, payload in results if status is not None and status < 400])
+    return _summarize(items, batches, "created")
+
+async def send_bulk_update_request(updates: list):
+    """
+    Update many calendar events through batch requests.
+
+    Each event is patched with only the fields given for it.
+
+    Args:
+        updates: Dicts with "event_id" and any of "title", "start_time",
+            "end_time", "description", "location" and "attendees" (emails,
+            replacing the current list)
+
+    Returns:
+        Dictionary with per-event results and totals
+    """
+    operations, positions, items = [], [], [None] * len(updates)
+    for index, spec in enumerate(updates):
+        if not isinstance(spec, dict):
+            items[index] = _error_item(index, None, {"message": "each update must be an object"})
+            continue
+        event_id = spec.get("event_id")
+        body = {}
+        if spec.get("title"):
+            body["summary"] = spec["title"]
+        if spec.get("description"):
+            body["description"] = spec["description"]
+        if spec.get("location"):
+            body["location"] = spec["location"]
+        if spec.get("start_time"):
+            body["start"] = {"dateTime": spec["start_time"]}
+        if spec.get("end_time"):
+            body["end"] = {"dateTime": spec["end_time"]}
+        if spec.get("attendees") is not None:
+            body["attendees"] = [{"email": email} for email in spec["attendees"]]
+        if not event_id or not body:
+            items[index] = _error_item(index, None, {"message": "event_id and at least one field to change are required"},
+                                       event_id=event_id)
+            continue
+        operations.append({"method": "patch", "event_id": event_id, "body": body})
+        positions.append(index)
+
+    results, batches = await run_batch(operations)
+    for index, operation, (status, payload) in zip(positions, operations, results):
+        event_id = operation["event_id"]
+        if status is not None and status < 400:
+            items[index] = {"index": index, "status": "success", "event_id": event_id,
+                            "html_link": payload.get("htmlLink")}
+        else:
+            items[index] = _error_item(index, status, payload, event_id=event_id)
+    await record_writes([payload for status, payload in results if status is not None and status < 400])
+    return _summarize(items, batches, "updated")
+
+async def send_bulk_delete_request(event_ids: list):
+    """
+    Delete many calendar events through batch requests.
+
+    An event already gone (410) is only reported as deleted when an earlier
+    attempt of this call deleted it; otherwise it is an error.
+
+    Args:
+        event_ids: IDs of the events to delete
+
+    Returns:
+        Dictionary with per-event results and totals
+    """
+    operations, positions, items = [], [], [None] * len(event_ids)
+    for index, event_id in enumerate(event_ids):
+        if not isinstance(event_id, str) or not event_id:
+            items[index] = _error_item(index, None, {"message": "each event ID must be a non-empty string"},
+                                       event_id=event_id)
+            continue
+        operations.append({"method": "delete", "event_id": event_id})
+        positions.append(index)
+
+    results, batches = await run_batch(operations)
+    for index, operation, (status, payload) in zip(positions, operations, results):
+        event_id = operation["event_id"]
+        if status is not None and status < 400:
+            items[index] = {"index": index, "status": "success", "event_id": event_id}
+        else:
+            items[index] = _error_item(index, status, payload, event_id=event_id)
+    await record_writes(deleted_ids=[item["event_id"] for item in items if item["status"] == "success"])
+    return _summarize(items, batches, "deleted")
@@ -0,0 +1,304 @@
+"""
+Native asyncio client for the Google Calendar v3 REST API.
+
+Requests go over a pooled httpx client (HTTP/2 when the h2 package is
+installed), with the access token taken from the process-wide credential
+cache in adapter.calendar.auth. Every method accepts a ``fields`` projection
+so callers only download the parts of a resource they use.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import uuid
+
+import httpx
+
+from adapter.calendar.auth import get_calendar_credentials, refresh_calendar_credentials
+from adapter.common.executor import run_blocking
+from adapter.common.metrics import track_upstream
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_API_PATH = "/calendar/v3"
+CALENDAR_API_BASE = "https://www.googleapis.com" + CALENDAR_API_PATH
+BATCH_URL = "https://www.googleapis.com/batch/calendar/v3"
+
+# Try to enable HTTP/2, but fall back to HTTP/1.1 if h2 is not available
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+class CalendarApiError(Exception):
+    """Error response from the Calendar API."""
+
+    def __init__(self, status_code, message, reason=None):
+        super().__init__(f"Calendar API error {status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+        self.reason = reason
+
+class CalendarClient:
+    """
+    Async Calendar v3 client.
+
+    Args:
+        http: httpx.AsyncClient to send requests with
+        calendar_id: Calendar the event methods operate on
+    """
+
+    def __init__(self, http, calendar_id="primary"):
+        self.http = http
+        self.calendar_id = calendar_id
+        self._credentials = None
+
+    async def _token(self, force_refresh=False):
+        creds = self._credentials
+        if force_refresh and creds is not None:
+            # Loading or refreshing credentials is blocking I/O
+            creds = await run_blocking("google_calendar", refresh_calendar_credentials, creds.token)
+            if creds is None:
+                raise CalendarApiError(401, "Calendar credentials were rejected and cannot be refreshed")
+            self._credentials = creds
+        elif creds is None or not creds.valid:
+            creds = await run_blocking("google_calendar", get_calendar_credentials, interactive=False)
+            if creds is None:
+                raise CalendarApiError(401, "No valid calendar credentials")
+            self._credentials = creds
+        return creds.token
+
+    async def request(self, method, path, operation, params=None, json=None, headers=None, fields=None):
+        """
+        Send one authorized request.
+
+        Args:
+            method: HTTP method
+            path: Path below the API base, e.g. "/calendars/primary/events"
+            operation: Operation name for upstream metrics, e.g. "events.list"
+            params: Query parameters
+            json: JSON request body
+            headers: Extra request headers
+            fields: Partial response projection, e.g. "id,etag,updated"
+
+        Returns:
+            Decoded JSON response, or None for empty responses
+
+        Raises:
+            CalendarApiError: If the API returns an error status
+        """
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        if fields:
+            params["fields"] = fields
+
+        with track_upstream("google_calendar", operation):
+            response = await self._send(method, CALENDAR_API_BASE + path, params=params, json=json, headers=headers)
+            if response.status_code >= 400:
+                raise _api_error(response)
+        if response.status_code == 204 or not response.content:
+            return None
+        return response.json()
+
+    async def _send(self, method, url, headers=None, **kwargs):
+        response = None
+        for attempt in range(2):
+            request_headers = dict(headers or {})
+            request_headers["Authorization"] = f"Bearer {await self._token(force_refresh=attempt > 0)}"
+            response = await self.http.request(method, url, headers=request_headers, **kwargs)
+            # A revoked or expired token gets one refresh and retry
+            if response.status_code != 401:
+                break
+        return response
+
+    async def batch(self, requests):
+        """
+        Send several requests in one multipart/mixed batch request.
+
+        Args:
+            requests: (method, path, body) tuples, with paths below the API
+                base and body None for requests without one
+
+        Returns:
+            (status_code, decoded body) per request, in request order
+
+        Raises:
+            CalendarApiError: If the batch request as a whole fails
+        """
+        boundary = f"batch_{uuid.uuid4().hex}"
+        parts = []
+        for index, (method, path, body) in enumerate(requests):
+            lines = [
+                f"--{boundary}",
+                "Content-Type: application/http",
+                f"Content-ID: <item{index}>",
+                "",
+                f"{method} {CALENDAR_API_PATH}{path} HTTP/1.1",
+            ]
+            if body is not None:
+                lines += ["Content-Type: application/json", "", json.dumps(body)]
+            else:
+                lines += [""]
+            parts.append("\r\n".join(lines))
+        content = "\r\n".join(parts) + f"\r\n--{boundary}--\r\n"
+
+        with track_upstream("google_calendar", "batch"):
+            response = await self._send(
+                "POST", BATCH_URL, content=content.encode(),
+                headers={"Content-Type": f"multipart/mixed; boundary={boundary}"},
+            )
+            if response.status_code >= 400:
+                raise _api_error(response)
+        return _parse_batch_response(response, len(requests))
+
+    def _events_path(self, event_id=None):
+        path = f"/calendars/{self.calendar_id}/events"
+        return f"{path}/{event_id}" if event_id else path
+
+    async def insert_event(self, body, fields=None, send_updates=None):
+        """Create an event and return it."""
+        return await self.request("POST", self._events_path(), "events.insert",
+                                  params={"sendUpdates": send_updates}, json=body, fields=fields)
+
+    async def get_event(self, event_id, fields=None):
+        """Fetch one event."""
+        return await self.request("GET", self._events_path(event_id), "events.get", fields=fields)
+
+    async def update_event(self, event_id, body, fields=None, send_updates=None):
+        """Replace an event with a full resource."""
+        return await self.request("PUT", self._events_path(event_id), "events.update",
+                                  params={"sendUpdates": send_updates}, json=body, fields=fields)
+
+    async def patch_event(self, event_id, body, fields=None, send_updates=None, etag=None):
+        """
+        Apply a partial update to an event.
+
+        Args:
+            event_id: Event to patch
+            body: Only the fields to change
+            fields: Partial response projection
+            send_updates: "all", "externalOnly" or "none"
+            etag: Send If-Match so the patch fails with 412 if the event changed
+        """
+        headers = {"If-Match": etag} if etag else None
+        return await self.request("PATCH", self._events_path(event_id), "events.patch",
+                                  params={"sendUpdates": send_updates}, json=body, headers=headers, fields=fields)
+
+    async def delete_event(self, event_id, send_updates=None):
+        """Delete an event."""
+        await self.request("DELETE", self._events_path(event_id), "events.delete",
+                           params={"sendUpdates": send_updates})
+
+    async def list_events(self, fields=None, **params):
+        """
+        Fetch one page of events.
+
+        Args:
+            fields: Partial response projection, e.g. "nextPageToken,items(id,summary)"
+            **params: Query parameters of events.list (timeMin, q, pageToken, ...)
+
+        Returns:
+            The events.list response
+        """
+        params = {k: (str(v).lower() if isinstance(v, bool) else v) for k, v in params.items()}
+        return await self.request("GET", self._events_path(), "events.list", params=params, fields=fields)
+
+    async def freebusy_query(self, body, fields=None):
+        """
+        Query busy intervals.
+
+        Args:
+            body: freeBusy.query request with "timeMin", "timeMax", "items"
+                ([{"id": calendar_id}, ...]) and optionally "timeZone"
+            fields: Partial response projection, e.g. "calendars"
+
+        Returns:
+            The freeBusy.query response
+        """
+        return await self.request("POST", "/freeBusy", "freebusy.query", json=body, fields=fields)
+
+    async def watch_events(self, body):
+        """
+        Register a push-notification channel for changes to this calendar's events.
+
+        Args:
+            body: Channel resource with "id", "type", "address" and optionally
+                "token" and "params"
+
+        Returns:
+            The created channel, including "resourceId" and "expiration"
+        """
+        return await self.request("POST", self._events_path() + "/watch", "events.watch", json=body)
+
+    async def stop_channel(self, body):
+        """Stop a notification channel ({"id": ..., "resourceId": ...})."""
+        await self.request("POST", "/channels/stop", "channels.stop", json=body)
+
+def _api_error(response):
+    message, reason = response.reason_phrase, None
+    try:
+        error = response.json().get("error", {})
+        message = error.get("message", message)
+        errors = error.get("errors") or [{}]
+        reason = errors[0].get("reason")
+    except ValueError:
+        pass
+    return CalendarApiError(response.status_code, message, reason)
+
+def _parse_batch_response(response, count):
+    """Split a multipart/mixed batch response into (status_code, body) per request."""
+    match = re.search(r'boundary="?([^";]+)"?', response.headers.get("content-type", ""))
+    if not match:
+        raise CalendarApiError(response.status_code, "Batch response without a multipart boundary")
+
+    results = [(None, None)] * count
+    for part in response.text.replace("\r\n", "\n").split(f"--{match.group(1)}"):
+        outer_headers, _, inner = part.strip().partition("\n\n")
+        item = re.search(r"Content-ID:\s*<response-item(\d+)>", outer_headers, re.IGNORECASE)
+        if not item:
+            continue
+        status_line, _, rest = inner.partition("\n")
+        _, _, body = rest.partition("\n\n")
+        try:
+            payload = json.loads(body) if body.strip() else None
+        except ValueError:
+            payload = {"error": {"message": body.strip()}}
+        results[int(item.group(1))] = (int(status_line.split()[1]), payload)
+    return results
+
+# Pooled client shared by every transport running on the current event loop
+_client = None
+_client_loop = None
+
+def get_calendar_client() -> CalendarClient:
+    """
+    Get the pooled Calendar client for the running event loop.
+
+    Like the weather client, it is bound to the loop that created it, so a
+    new one is made if the loop changes.
+
+    Returns:
+        Shared CalendarClient instance
+    """
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.http.is_closed or _client_loop is not loop:
+        http = httpx.AsyncClient(
+            timeout=30.0,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+        _client = CalendarClient(http)
+        _client_loop = loop
+    return _client
+
+async def close_calendar_client():
+    """Close the pooled Calendar client if it belongs to the running event loop."""
+    global _client, _client_loop
+
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.http.aclose()
+    _client = None
+    _client_loop = None
@@ -3,14 +3,20 @@ Event management utilities for Google Calendar API.
 Handles creating, updating, and deleting calendar events.
 """
 
+import logging
 import datetime
-from adapter.calendar.auth import get_calendar_service
+from adapter.calendar.backend import error_status, get_backend
+from adapter.calendar.mirror import get_mirror
 
-async def send_create_event_request(title: str, start_time: str, end_time: str, 
-                                  description: str = "", location: str = None, 
-                                  attendees: list = None):
+logger = logging.getLogger(__name__)
+
+# Patch attempts when the event keeps changing between fetch and write
+MAX_PATCH_ATTEMPTS = 3
+
+def build_event_body(title: str, start_time: str, end_time: str, description: str = "",
+                     location: str = None, attendees: list = None) -> dict:
     """
-    Sends a request to Google Calendar to create a new event.
+    Build the Calendar API resource for a new event.
     
     Args:
         title: Event title/summary
@@ -21,11 +27,8 @@ async def send_create_event_request(title: str, start_time: str, end_time: str,
         attendees: List of email addresses for attendees (optional)
         
     Returns:
-        Dictionary with created event details
+        Event resource dictionary
     """
-    service = get_calendar_service()
-    
-    # Format the event data
     event = {
         'summary': title,
         'description': description,
@@ -46,9 +49,45 @@ async def send_create_event_request(title: str, start_time: str, end_time: str,
     if attendees:
         event['attendees'] = [{'email': email} for email in attendees]
     
+    return event
+
+async def record_writes(events=(), deleted_ids=()):
+    """Apply successful writes to the local mirror, if there is one."""
+    mirror = get_mirror()
+    if mirror is None:
+        return
+    try:
+        await mirror.apply(events, deleted_ids)
+    except Exception as e:
+        # The next sync brings the changes in anyway
+        logger.warning(f"Could not apply calendar writes to the mirror: {e}")
+
+async def send_create_event_request(title: str, start_time: str, end_time: str, 
+                                  description: str = "", location: str = None, 
+                                  attendees: list = None):
+    """
+    Sends a request to Google Calendar to create a new event.
+    
+    Args:
+        title: Event title/summary
+        start_time: Start time in ISO format
+        end_time: End time in ISO format
+        description: Event description (optional)
+        location: Event location (optional)
+        attendees: List of email addresses for attendees (optional)
+        
+    Returns:
+        Dictionary with created event details
+    """
+    backend = get_backend()
+    
+    # Format the event data
+    event = build_event_body(title, start_time, end_time, description, location, attendees)
+    
     # Call the Calendar API to create the event
     try:
-        created_event = service.events().insert(calendarId='primary', body=event).execute()
+        created_event = await backend.insert(event)
+        await record_writes([created_event])
         
         # Format the response
         response = {
@@ -61,7 +100,7 @@ async def send_create_event_request(title: str, start_time: str, end_time: str,
         
         return response
     except Exception as e:
-        print(f"Error creating event: {e}")
+        logger.error(f"Error creating event: {e}")
         return {
             'status': 'error',
             'message': f"Failed to create event: {str(e)}",
@@ -78,11 +117,12 @@ async def send_delete_event_request(event_id: str):
     Returns:
         Dictionary with status of the deletion
     """
-    service = get_calendar_service()
+    backend = get_backend()
     
     try:
         # Call the Calendar API to delete the event
-        service.events().delete(calendarId='primary', eventId=event_id).execute()
+        await backend.delete(event_id)
+        await record_writes(deleted_ids=[event_id])
         
         return {
             'status': 'success',
@@ -91,7 +131,7 @@ async def send_delete_event_request(event_id: str):
             'deleted': True
         }
     except Exception as e:
-        print(f"Error deleting event: {e}")
+        logger.error(f"Error deleting event: {e}")
         return {
             'status': 'error',
             'message': f"Failed to delete event: {str(e)}",
@@ -99,6 +139,34 @@ async def send_delete_event_request(event_id: str):
             'deleted': False
         }
 
+def _updated_attendees(attendees: list, add_attendees: list = None, remove_attendees: list = None) -> list:
+    """Apply attendee additions and removals to an event's attendee list."""
+    # Remove attendees if specified
+    current_attendees = [
+        attendee for attendee in attendees
+        if attendee.get('email') not in (remove_attendees or [])
+    ]
+    
+    # Add new attendees that aren't already in the list
+    current_emails = [attendee.get('email') for attendee in current_attendees]
+    for email in add_attendees or []:
+        if email not in current_emails:
+            current_attendees.append({'email': email})
+            current_emails.append(email)
+    
+    return current_attendees
+
+async def _cached_event(event_id: str):
+    """Get the local mirror's copy of an event, if it has one."""
+    mirror = get_mirror()
+    if mirror is None:
+        return None
+    try:
+        return await mirror.get(event_id)
+    except Exception as e:
+        logger.warning(f"Could not read event {event_id} from the mirror: {e}")
+        return None
+
 async def send_update_event_request(event_id: str, title: str = None, 
                                   start_time: str = None, end_time: str = None, 
                                   description: str = None, location: str = None, 
@@ -106,6 +174,11 @@ async def send_update_event_request(event_id: str, title: str = None,
     """
     Sends a request to Google Calendar to update an existing event.
     
+    The update is a single patch carrying only the changed fields. Attendee
+    changes are applied to the mirrored copy of the event (fetched if the
+    mirror does not hold it) and sent with its ETag in If-Match; if the event
+    changed in the meantime, it is fetched again and the patch retried.
+    
     Args:
         event_id: ID of the event to update
         title: New title for the event (optional)
@@ -119,58 +192,47 @@ async def send_update_event_request(event_id: str, title: str = None,
     Returns:
         Dictionary with updated event details
     """
-    service = get_calendar_service()
+    backend = get_backend()
+    
+    # Only the fields that change
+    changes = {}
+    if title:
+        changes['summary'] = title
+    
+    if description:
+        changes['description'] = description
+    
+    if location:
+        changes['location'] = location
+    
+    if start_time:
+        changes['start'] = {'dateTime': start_time}
+    
+    if end_time:
+        changes['end'] = {'dateTime': end_time}
     
     try:
-        # First, get the existing event
-        event = service.events().get(calendarId='primary', eventId=event_id).execute()
-        
-        # Update fields if provided
-        if title:
-            event['summary'] = title
-        
-        if description:
-            event['description'] = description
-        
-        if location:
-            event['location'] = location
-        
-        if start_time:
-            event['start']['dateTime'] = start_time
-        
-        if end_time:
-            event['end']['dateTime'] = end_time
-        
-        # Handle attendees
-        current_attendees = event.get('attendees', [])
-        
-        # Remove attendees if specified
-        if remove_attendees:
-            current_attendees = [
-                attendee for attendee in current_attendees 
-                if attendee.get('email') not in remove_attendees
-            ]
-        
-        # Add new attendees if specified
-        if add_attendees:
-            # Get current email addresses
-            current_emails = [attendee.get('email') for attendee in current_attendees]
+        # The attendee list is replaced as a whole, so it is computed from a known version
+        event = await _cached_event(event_id) if add_attendees or remove_attendees else None
+        for attempt in range(MAX_PATCH_ATTEMPTS):
+            body, etag = dict(changes), None
+            if add_attendees or remove_attendees:
+                if event is None:
+                    event = await backend.get(event_id)
+                body['attendees'] = _updated_attendees(event.get('attendees', []), add_attendees, remove_attendees)
+                etag = event.get('etag')
             
-            # Add new attendees that aren't already in the list
-            for email in add_attendees:
-                if email not in current_emails:
-                    current_attendees.append({'email': email})
-        
-        # Update the attendees list if it was modified
-        if add_attendees or remove_attendees:
-            event['attendees'] = current_attendees
-        
-        # Call the Calendar API to update the event
-        updated_event = service.events().update(
-            calendarId='primary', 
-            eventId=event_id, 
-            body=event
-        ).execute()
+            try:
+                updated_event = await backend.patch(event_id, body, etag=etag)
+                break
+            except Exception as e:
+                # 412 Precondition Failed: the event changed since the copy we used
+                if error_status(e) != 412 or attempt == MAX_PATCH_ATTEMPTS - 1:
+                    raise
+                logger.info(f"Event {event_id} changed concurrently, fetching it again")
+                event = None
+        
+        await record_writes([updated_event])
         
         # Format the response
         response = {
@@ -183,7 +245,7 @@ async def send_update_event_request(event_id: str, title: str = None,
         
         return response
     except Exception as e:
-        print(f"Error updating event: {e}")
+        logger.error(f"Error updating event: {e}")
         return {
             'status': 'error',
             'message': f"Failed to update event: {str(e)}",
@@ -0,0 +1,395 @@
+"""
+Local mirror of the primary calendar, kept current with incremental sync.
+
+The first sync lists every event; later syncs pass the stored syncToken and
+only receive what changed since (cancelled events are removed). When Google
+expires the token (410 Gone) the mirror is rebuilt with a full sync.
+
+List and search calls are answered from memory once the mirror is fresh
+(synced within MCP_CALENDAR_SYNC_INTERVAL seconds); a stale mirror is brought
+up to date with a small delta first. Successful writes are applied to the
+mirror straight away, so reads see them before the next sync.
+
+The mirror is persisted in the secrets directory and shared by server
+processes like the other state files. MCP_CALENDAR_MIRROR=0 turns it off.
+"""
+
+import asyncio
+import bisect
+import datetime
+import json
+import logging
+import os
+import time
+import zoneinfo
+
+from adapter.calendar.backend import error_status, get_backend
+from adapter.common.metrics import REGISTRY
+from adapter.common.shared_file import atomic_write_json, file_lock, file_signature
+
+logger = logging.getLogger(__name__)
+
+MIRROR_PATH = os.path.join(os.path.dirname(__file__), "../../secrets/calendar-mirror.json")
+MIRROR_ENABLED = os.environ.get("MCP_CALENDAR_MIRROR", "1").lower() not in ("0", "false", "no")
+SYNC_INTERVAL = float(os.environ.get("MCP_CALENDAR_SYNC_INTERVAL", "30"))
+
+# Largest page events.list allows
+PAGE_SIZE = 2500
+SYNC_FIELDS = ("nextPageToken,nextSyncToken,timeZone,"
+               "items(id,status,etag,updated,summary,description,location,start,end,attendees,htmlLink)")
+
+SYNCS = REGISTRY.counter("mcp_calendar_sync_total", "Calendar mirror syncs", ["kind"])
+SYNC_CHANGES = REGISTRY.counter("mcp_calendar_sync_changes_total", "Event changes received by calendar mirror syncs")
+MIRROR_EVENTS = REGISTRY.gauge("mcp_calendar_mirror_events", "Events held in the calendar mirror")
+
+def _zone(time_zone):
+    try:
+        return zoneinfo.ZoneInfo(time_zone) if time_zone else datetime.timezone.utc
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        return datetime.timezone.utc
+
+def parse_event_time(value, time_zone=None):
+    """
+    Parse an event start/end ({"dateTime": ...} or {"date": ...}) or an ISO string.
+
+    All-day dates start at midnight in time_zone, the calendar's time zone,
+    as Google places them; naive times and dates without a time zone are
+    taken as UTC.
+
+    Returns:
+        Timezone-aware datetime, or None if it cannot be parsed
+    """
+    if isinstance(value, dict):
+        value = value.get("dateTime") or value.get("date")
+    if not value:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        all_day = "T" not in value
+        parsed = parsed.replace(tzinfo=_zone(time_zone) if all_day else datetime.timezone.utc)
+    return parsed
+
+def _search_text(event):
+    parts = [event.get("summary", ""), event.get("description", ""), event.get("location", "")]
+    for attendee in event.get("attendees", []):
+        parts.append(attendee.get("email", ""))
+        parts.append(attendee.get("displayName", ""))
+    return " ".join(parts).lower()
+
+class CalendarMirror:
+    """In-memory copy of the calendar's events with a persisted sync token."""
+
+    def __init__(self, path=None):
+        self.path = path or MIRROR_PATH
+        self.events = {}
+        self.sync_token = None
+        self.synced_at = 0.0
+        self._signature = None
+        self.time_zone = None
+        self._index = None
+        self._texts = {}
+        self._lock = asyncio.Lock()
+        self._dirty = False
+        self._save_task = None
+        self._sync_task = None
+        self._sync_again = False
+        self._writes = None  # Writes applied while a sync is fetching pages
+
+    def _read(self):
+        signature = file_signature(self.path)
+        if signature is None or signature == self._signature:
+            return None
+        try:
+            with open(self.path) as f:
+                return signature, json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable calendar mirror {self.path}: {e}")
+            return None
+
+    async def load(self):
+        """Reload from disk if another process (or a restart) changed the file."""
+        if self._dirty:
+            # Local writes not yet on disk are newer than the file
+            return
+        loaded = await asyncio.to_thread(self._read)
+        # Checked again: a write may have been applied while the file was read
+        if loaded is None or self._dirty or loaded[0] == self._signature:
+            return
+        signature, data = loaded
+        self.events = {event["id"]: event for event in data.get("events", [])}
+        self.sync_token = data.get("sync_token")
+        self.synced_at = data.get("synced_at", 0.0)
+        self.time_zone = data.get("time_zone")
+        self._signature = signature
+        self._index = None
+        MIRROR_EVENTS.set(len(self.events))
+
+    async def save(self):
+        """Persist the mirror; the snapshot is taken here and written on a worker thread."""
+        data = {"sync_token": self.sync_token, "synced_at": self.synced_at, "time_zone": self.time_zone,
+                "events": list(self.events.values())}
+        MIRROR_EVENTS.set(len(self.events))
+
+        def write():
+            with file_lock(self.path):
+                atomic_write_json(self.path, data)
+            return file_signature(self.path)
+
+        self._signature = await asyncio.to_thread(write)
+
+    def _schedule_save(self):
+        """Persist in the background; writes arriving meanwhile share the next save."""
+        self._dirty = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.get_running_loop().create_task(self._flush())
+
+    async def _flush(self):
+        try:
+            while self._dirty:
+                self._dirty = False
+                await self.save()
+        except Exception as e:
+            logger.warning(f"Could not save the calendar mirror: {e}")
+
+    async def sync(self, max_age=None):
+        """
+        Fetch changes since the last sync, or everything if there is no valid token.
+
+        Args:
+            max_age: Skip the sync if the mirror synced within this many
+                seconds, e.g. by a concurrent caller this one waited for
+
+        Returns:
+            Number of changed events received
+        """
+        async with self._lock:
+            await self.load()
+            if max_age is not None and time.time() - self.synced_at <= max_age:
+                return 0
+            full = self.sync_token is None
+            try:
+                changes = await self._sync(full=full)
+            except Exception as e:
+                if full or error_status(e) != 410:
+                    raise
+                logger.info("Calendar sync token expired, running a full sync")
+                full = True
+                changes = await self._sync(full=True)
+            # An empty delta leaves the file as it is; the sync token stored
+            # there stays valid, so only this process's copy moves on
+            if changes or full:
+                await self.save()
+            return changes
+
+    async def _sync(self, full):
+        backend = get_backend()
+        events = {} if full else dict(self.events)
+        params = {"singleEvents": True, "maxResults": PAGE_SIZE}
+        if not full:
+            params["syncToken"] = self.sync_token
+
+        changes = 0
+        time_zone = self.time_zone
+        self._writes = []
+        try:
+            while True:
+                page = await backend.list(fields=SYNC_FIELDS, **params)
+                time_zone = page.get("timeZone") or time_zone
+                for event in page.get("items", []):
+                    changes += 1
+                    if event.get("status") == "cancelled":
+                        events.pop(event["id"], None)
+                    else:
+                        events[event["id"]] = event
+                if not page.get("nextPageToken"):
+                    break
+                params["pageToken"] = page["nextPageToken"]
+        finally:
+            writes, self._writes = self._writes, None
+
+        # Writes applied meanwhile went to the old dict and may be missing
+        # from the pages; replay them unless the pages hold a newer version
+        for written, deleted_ids in writes:
+            for event in written:
+                current = events.get(event["id"])
+                if current is None or current.get("updated", "") <= event.get("updated", ""):
+                    events[event["id"]] = event
+            for event_id in deleted_ids:
+                events.pop(event_id, None)
+
+        self.events = events
+        self.sync_token = page.get("nextSyncToken")
+        self.synced_at = time.time()
+        self.time_zone = time_zone
+        self._index = None
+        SYNCS.inc(kind="full" if full else "incremental")
+        SYNC_CHANGES.inc(changes)
+        return changes
+
+    async def ensure_fresh(self, max_age=SYNC_INTERVAL):
+        """
+        Sync if the mirror is older than max_age seconds.
+
+        A failed sync is tolerated (with a warning) as long as the mirror has
+        synced before; the caller then reads slightly stale data.
+
+        Raises:
+            Exception: The sync error, if the mirror has never synced
+        """
+        await self.load()
+        if time.time() - self.synced_at <= max_age:
+            return
+        try:
+            await self.sync(max_age=max_age)
+        except Exception as e:
+            if not self.synced_at:
+                raise
+            logger.warning(f"Calendar mirror sync failed, serving data from {time.time() - self.synced_at:.0f}s ago: {e}")
+
+    def request_sync(self):
+        """
+        Sync in the background, e.g. after a change notification.
+
+        Requests arriving while a sync runs are coalesced into one more sync.
+        """
+        if self._sync_task is not None and not self._sync_task.done():
+            self._sync_again = True
+            return
+        self._sync_task = asyncio.get_running_loop().create_task(self._sync_requested())
+
+    async def _sync_requested(self):
+        while True:
+            self._sync_again = False
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning(f"Calendar sync after notification failed: {e}")
+            if not self._sync_again:
+                break
+
+    async def apply(self, events=(), deleted_ids=()):
+        """
+        Record successful writes.
+
+        Args:
+            events: Event resources returned by creates and updates
+            deleted_ids: IDs of deleted events
+        """
+        events, deleted_ids = list(events), list(deleted_ids)
+        if self._writes is not None:
+            self._writes.append((events, deleted_ids))
+        changed = False
+        for event in events:
+            if event and event.get("id"):
+                self.events[event["id"]] = event
+                changed = True
+        for event_id in deleted_ids:
+            changed = self.events.pop(event_id, None) is not None or changed
+        if changed:
+            self._index = None
+            self._schedule_save()
+
+    async def get(self, event_id):
+        """
+        Get the mirrored copy of an event.
+
+        Returns:
+            Event resource (with its etag), or None if the mirror does not hold it
+        """
+        await self.load()
+        return self.events.get(event_id)
+
+    def _sorted(self):
+        if self._index is None:
+            self._texts = {}
+            index = []
+            for event in self.events.values():
+                start = parse_event_time(event.get("start"), self.time_zone)
+                end = parse_event_time(event.get("end"), self.time_zone) or start
+                if start is not None:
+                    index.append((start, end, event["id"]))
+            index.sort()
+            self._index = index
+        return self._index
+
+    def query(self, search_query=None, time_min=None, time_max=None, max_results=None):
+        """
+        Find events overlapping a time range, ordered by start time.
+
+        Args:
+            search_query: Terms that must all appear in the summary,
+                description, location or attendees (case-insensitive
+                substrings, like the API's q parameter)
+            time_min: Only events ending after this time (ISO format)
+            time_max: Only events starting before this time (ISO format)
+            max_results: Maximum number of events to return
+
+        Returns:
+            List of Calendar API event resources
+        """
+        index = self._sorted()
+        lower = parse_event_time(time_min)
+        upper = parse_event_time(time_max)
+        stop = len(index)
+        if upper is not None:
+            stop = bisect.bisect_left(index, (upper,))
+        terms = search_query.lower().split() if search_query else ()
+
+        matches = []
+        for start, end, event_id in index[:stop]:
+            if lower is not None and end <= lower:
+                continue
+            event = self.events[event_id]
+            if terms:
+                text = self._texts.get(event_id)
+                if text is None:
+                    text = self._texts[event_id] = _search_text(event)
+                if not all(term in text for term in terms):
+                    continue
+            matches.append(event)
+            if max_results and len(matches) >= max_results:
+                break
+        return matches
+
+_mirror = None
+
+def get_mirror():
+    """
+    Get the process-wide calendar mirror.
+
+    Returns:
+        CalendarMirror, or None if MCP_CALENDAR_MIRROR turns it off
+    """
+    global _mirror
+
+    if not MIRROR_ENABLED:
+        return None
+    if _mirror is None:
+        _mirror = CalendarMirror()
+    return _mirror
+
+async def run_sync_loop(interval=SYNC_INTERVAL):
+    """
+    Keep the mirror fresh in the background so reads rarely wait for a sync.
+
+    Skips syncing while there are no stored calendar credentials; it never
+    starts the browser OAuth flow.
+    """
+    from adapter.calendar.auth import get_calendar_credentials
+    from adapter.common.executor import run_blocking
+
+    mirror = get_mirror()
+    if mirror is None:
+        return
+    while True:
+        try:
+            if await run_blocking("google_calendar", get_calendar_credentials, interactive=False) is not None:
+                await mirror.ensure_fresh(max_age=interval / 2)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Background calendar sync failed: {e}")
+        await asyncio.sleep(interval)
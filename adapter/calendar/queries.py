@@ -3,26 +3,45 @@ Query utilities for Google Calendar API.
 Handles listing and searching calendar events.
 """
 
+import logging
 import datetime
 import zoneinfo
-from adapter.calendar.auth import get_calendar_service
+from adapter.calendar.backend import get_backend
+from adapter.calendar.mirror import get_mirror
 
-async def list_calendar_events(max_results: int = 10, search_query: str = None, 
-                             time_min: str = None, time_max: str = None):
+logger = logging.getLogger(__name__)
+
+# Largest page events.list allows
+MAX_PAGE_SIZE = 2500
+# Only the parts of each event that format_event uses
+LIST_FIELDS = "nextPageToken,items(id,summary,start,end,location,description,htmlLink,attendees)"
+
+def format_event(event: dict) -> dict:
     """
-    Lists calendar events with optional filtering.
+    Reduce a Calendar API event resource to the fields the tools return.
     
     Args:
-        max_results: Maximum number of events to return
-        search_query: Text to search for in event summary/description
-        time_min: Earliest time to include (ISO format)
-        time_max: Latest time to include (ISO format)
+        event: Event resource
     
     Returns:
-        Dictionary with events and metadata
+        Formatted event dictionary
     """
-    service = get_calendar_service()
+    start = event['start'].get('dateTime', event['start'].get('date'))
+    end = event['end'].get('dateTime', event['end'].get('date'))
     
+    return {
+        'id': event['id'],
+        'summary': event.get('summary', 'No title'),
+        'start': start,
+        'end': end,
+        'location': event.get('location', ''),
+        'description': event.get('description', ''),
+        'html_link': event.get('htmlLink', ''),
+        'attendees': event.get('attendees', [])
+    }
+
+def _default_time_range(time_min: str = None, time_max: str = None):
+    """Fill in the default range: from now, for 7 days after time_min."""
     # Set up default time range if not specified
     if not time_min:
         # Default to now
@@ -44,12 +63,46 @@ async def list_calendar_events(max_results: int = 10, search_query: str = None,
             time_max_dt = datetime.datetime.now(zoneinfo.ZoneInfo("UTC")) + datetime.timedelta(days=7)
             time_max = time_max_dt.isoformat()
     
+    return time_min, time_max
+
+async def iter_calendar_events(max_results: int = None, search_query: str = None,
+                               time_min: str = None, time_max: str = None):
+    """
+    Yield formatted calendar events in start time order, across all result pages.
+    
+    Events come from the local mirror when it is available. Otherwise each page
+    is requested with the largest page size needed (up to 2500) and only the
+    fields format_event uses, and its events are yielded as soon as it arrives.
+    
+    Args:
+        max_results: Maximum number of events to yield (None for all)
+        search_query: Text to search for in event summary/description
+        time_min: Earliest time to include (ISO format, defaults to now)
+        time_max: Latest time to include (ISO format, defaults to 7 days after time_min)
+    
+    Raises:
+        Exception: Errors from the Calendar API
+    """
+    time_min, time_max = _default_time_range(time_min, time_max)
+    
+    # Serve from the local mirror when it is enabled and has synced
+    mirror = get_mirror()
+    if mirror is not None:
+        try:
+            await mirror.ensure_fresh()
+        except Exception as e:
+            logger.warning(f"Calendar mirror unavailable, querying the API: {e}")
+        else:
+            for event in mirror.query(search_query, time_min, time_max, max_results):
+                yield format_event(event)
+            return
+    
+    backend = get_backend()
+    
     # Build the query parameters
     params = {
-        'calendarId': 'primary',
         'timeMin': time_min,
         'timeMax': time_max,
-        'maxResults': max_results,
         'singleEvents': True,
         'orderBy': 'startTime'
     }
@@ -58,29 +111,38 @@ async def list_calendar_events(max_results: int = 10, search_query: str = None,
     if search_query:
         params['q'] = search_query
     
-    try:
-        # Call the Calendar API to list events
-        events_result = service.events().list(**params).execute()
-        events = events_result.get('items', [])
+    remaining = max_results
+    while remaining is None or remaining > 0:
+        params['maxResults'] = MAX_PAGE_SIZE if remaining is None else min(remaining, MAX_PAGE_SIZE)
+        page = await backend.list(fields=LIST_FIELDS, **params)
+        for event in page.get('items', [])[:remaining]:
+            yield format_event(event)
+            if remaining is not None:
+                remaining -= 1
         
-        # Format the response
-        formatted_events = []
-        for event in events:
-            start = event['start'].get('dateTime', event['start'].get('date'))
-            end = event['end'].get('dateTime', event['end'].get('date'))
-            
-            formatted_event = {
-                'id': event['id'],
-                'summary': event.get('summary', 'No title'),
-                'start': start,
-                'end': end,
-                'location': event.get('location', ''),
-                'description': event.get('description', ''),
-                'html_link': event.get('htmlLink', ''),
-                'attendees': event.get('attendees', [])
-            }
-            
-            formatted_events.append(formatted_event)
+        # Pages can hold fewer events than requested; follow the token until the end
+        if not page.get('nextPageToken'):
+            break
+        params['pageToken'] = page['nextPageToken']
+
+async def list_calendar_events(max_results: int = 10, search_query: str = None, 
+                             time_min: str = None, time_max: str = None):
+    """
+    Lists calendar events with optional filtering.
+    
+    Args:
+        max_results: Maximum number of events to return
+        search_query: Text to search for in event summary/description
+        time_min: Earliest time to include (ISO format)
+        time_max: Latest time to include (ISO format)
+    
+    Returns:
+        Dictionary with events and metadata
+    """
+    try:
+        formatted_events = [
+            event async for event in iter_calendar_events(max_results, search_query, time_min, time_max)
+        ]
         
         return {
             'status': 'success',
@@ -89,7 +151,7 @@ async def list_calendar_events(max_results: int = 10, search_query: str = None,
             'count': len(formatted_events)
         }
     except Exception as e:
-        print(f"Error listing events: {e}")
+        logger.error(f"Error listing events: {e}")
         return {
             'status': 'error',
             'message': f"Failed to list events: {str(e)}",
@@ -0,0 +1,188 @@
+"""
+Push notifications for calendar changes.
+
+When MCP_CALENDAR_WEBHOOK_URL is set (the public HTTPS address of the HTTP
+transport's WEBHOOK_PATH route), the server registers an Events watch channel
+so Google calls the webhook whenever the primary calendar changes. Each
+notification carries the channel token we registered in
+X-Goog-Channel-Token, which is how the webhook authenticates it; the route is
+exempt from bearer auth because Google cannot send one.
+
+Channels expire (MCP_CALENDAR_WATCH_TTL, default 7 days); a new one is
+registered RENEW_MARGIN seconds before the current one expires, after which
+the old one is stopped. Channel state, including the generated channel token
+when MCP_CALENDAR_WEBHOOK_TOKEN is not set, is kept in the secrets directory.
+Registration holds the state file's lock from the check to the save, so with
+several workers only one registers and the others reuse its channel and token.
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+import uuid
+
+from adapter.calendar.backend import get_backend
+from adapter.common.metrics import REGISTRY
+from adapter.common.shared_file import async_file_lock, atomic_write_json, file_signature
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_PATH = "/calendar/notifications"
+WEBHOOK_URL = os.environ.get("MCP_CALENDAR_WEBHOOK_URL")
+WEBHOOK_TOKEN = os.environ.get("MCP_CALENDAR_WEBHOOK_TOKEN")
+WATCH_STATE_PATH = os.path.join(os.path.dirname(__file__), "../../secrets/calendar-watch.json")
+WATCH_TTL = int(os.environ.get("MCP_CALENDAR_WATCH_TTL", str(7 * 24 * 3600)))
+RENEW_MARGIN = 3600  # Seconds before expiry at which a channel is replaced
+RETRY_DELAY = 60  # Seconds before retrying a failed registration
+
+NOTIFICATIONS = REGISTRY.counter("mcp_calendar_notifications_total", "Calendar push notifications received", ["state"])
+CHANNEL_REGISTRATIONS = REGISTRY.counter("mcp_calendar_watch_registrations_total", "Calendar watch channels registered")
+
+class CalendarWatch:
+    """Registers, renews and authenticates calendar watch channels."""
+
+    def __init__(self, address=None, token=None, path=None):
+        self.address = address or WEBHOOK_URL
+        self.path = path or WATCH_STATE_PATH
+        self._configured_token = token or WEBHOOK_TOKEN
+        self.state = {"token": None, "channels": []}
+        self._signature = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def token(self):
+        return self._configured_token or self.state.get("token")
+
+    def load(self):
+        """Reload the channel state if another process changed it."""
+        signature = file_signature(self.path)
+        if signature is None or signature == self._signature:
+            return
+        try:
+            with open(self.path) as f:
+                self.state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable calendar watch state {self.path}: {e}")
+            return
+        self._signature = signature
+
+    def _save(self):
+        # Called with the state file's lock held
+        atomic_write_json(self.path, self.state)
+        self._signature = file_signature(self.path)
+
+    def current_channel(self):
+        """Return the newest channel that is not about to expire, or None."""
+        self.load()
+        live = [c for c in self.state.get("channels", []) if c["expiration"] / 1000 - RENEW_MARGIN > time.time()]
+        return max(live, key=lambda c: c["expiration"]) if live else None
+
+    async def ensure_channel(self):
+        """
+        Make sure a live channel exists, registering a replacement if needed.
+
+        Returns:
+            The live channel ({"id", "resource_id", "expiration"} with expiration in ms)
+        """
+        channel = self.current_channel()
+        if channel is not None:
+            return channel
+
+        async with self._lock, async_file_lock(self.path):
+            # Another worker may have registered a channel while this one waited
+            channel = self.current_channel()
+            if channel is not None:
+                return channel
+            return await self._register()
+
+    async def _register(self):
+        if self.token is None:
+            self.state["token"] = secrets.token_urlsafe(32)
+        body = {
+            "id": str(uuid.uuid4()),
+            "type": "web_hook",
+            "address": self.address,
+            "token": self.token,
+            "params": {"ttl": str(WATCH_TTL)},
+        }
+        response = await get_backend().watch(body)
+        channel = {
+            "id": response.get("id", body["id"]),
+            "resource_id": response["resourceId"],
+            "expiration": int(response.get("expiration") or (time.time() + WATCH_TTL) * 1000),
+        }
+        CHANNEL_REGISTRATIONS.inc()
+        logger.info(f"Registered calendar watch channel {channel['id']} until {channel['expiration'] // 1000}")
+
+        old_channels = self.state.get("channels", [])
+        self.state["channels"] = [channel]
+        await asyncio.to_thread(self._save)
+        for old in old_channels:
+            await self._stop(old)
+        return channel
+
+    async def _stop(self, channel):
+        try:
+            await get_backend().stop_channel({"id": channel["id"], "resourceId": channel["resource_id"]})
+        except Exception as e:
+            # An expired or already stopped channel is gone either way
+            logger.info(f"Could not stop calendar watch channel {channel['id']}: {e}")
+
+    def verify(self, headers):
+        """
+        Authenticate a notification and return its resource state.
+
+        Args:
+            headers: Request headers of the notification
+
+        Returns:
+            X-Goog-Resource-State ("sync", "exists", "not_exists"), or None if
+            the channel token does not match
+        """
+        self.load()
+        expected = self.token
+        received = headers.get("x-goog-channel-token", "")
+        if not expected or not hmac.compare_digest(received.encode(), expected.encode()):
+            return None
+        state = headers.get("x-goog-resource-state", "exists")
+        NOTIFICATIONS.inc(state=state)
+        return state
+
+_watch = None
+
+def get_watch():
+    """Get the process-wide calendar watch."""
+    global _watch
+
+    if _watch is None:
+        _watch = CalendarWatch()
+    return _watch
+
+async def run_watch_loop():
+    """
+    Keep a watch channel registered while MCP_CALENDAR_WEBHOOK_URL is set.
+
+    Skips registering while there are no stored calendar credentials; it never
+    starts the browser OAuth flow.
+    """
+    from adapter.calendar.auth import get_calendar_credentials
+    from adapter.common.executor import run_blocking
+
+    watch = get_watch()
+    if not watch.address:
+        return
+    while True:
+        delay = RETRY_DELAY
+        try:
+            if await run_blocking("google_calendar", get_calendar_credentials, interactive=False) is not None:
+                channel = await watch.ensure_channel()
+                delay = channel["expiration"] / 1000 - RENEW_MARGIN - time.time()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Calendar watch registration failed: {e}")
+        await asyncio.sleep(max(delay, 1))
@@ -2,12 +2,13 @@
 Authentication utilities for Google APIs.
 """
 
+import logging
 import os
 import json
 import pickle
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
+import threading
+
+logger = logging.getLogger(__name__)
 
 # Path to save token
 TOKEN_PATH = os.path.join(os.path.dirname(__file__), "../../secrets/token.pickle")
@@ -15,25 +16,50 @@ TOKEN_PATH = os.path.join(os.path.dirname(__file__), "../../secrets/token.pickle
 # Path to client secrets file
 CLIENT_SECRETS_PATH = os.path.join(os.path.dirname(__file__), "../../secrets/google-directory.json")
 
-def get_credentials(scopes):
+# Credentials loaded once per process, keyed by scopes; reused until near expiry
+_credentials = {}
+_lock = threading.Lock()
+
+def get_credentials(scopes, interactive=True):
     """
     Get OAuth credentials for Google APIs.
     
+    The token file is read once per process. Cached credentials are returned
+    as they are while valid, and refreshed only once they are near expiry.
+    
     Args:
         scopes: List of OAuth scopes to request
+        interactive: Run the browser OAuth flow if there are no valid credentials
         
     Returns:
         Google OAuth credentials or None if authentication fails
     """
-    creds = None
+    key = tuple(scopes)
+    creds = _credentials.get(key)
+    if creds is not None and creds.valid:
+        return creds
+    
+    with _lock:
+        creds = _load_credentials(scopes, interactive, _credentials.get(key))
+        if creds is not None:
+            _credentials[key] = creds
+        return creds
+
+def _load_credentials(scopes, interactive, creds):
+    # Google client libraries are slow to import, so load them on first use
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from google.auth.transport.requests import Request
+    
+    if creds is not None and creds.valid:
+        return creds
     
     # Try to load credentials from token file
-    if os.path.exists(TOKEN_PATH):
+    if creds is None and os.path.exists(TOKEN_PATH):
         try:
             with open(TOKEN_PATH, 'rb') as token:
                 creds = pickle.load(token)
         except Exception as e:
-            print(f"Error loading token from {TOKEN_PATH}: {e}")
+            logger.error(f"Error loading token from {TOKEN_PATH}: {e}")
     
     # If credentials don't exist or are invalid, get new ones
     if not creds or not creds.valid:
@@ -41,21 +67,24 @@ def get_credentials(scopes):
             try:
                 creds.refresh(Request())
             except Exception as e:
-                print(f"Error refreshing token: {e}")
+                logger.error(f"Error refreshing token: {e}")
                 creds = None
         
         # If still no valid credentials, need to authenticate
         if not creds:
+            if not interactive:
+                logger.warning("No valid Google credentials found, skipping OAuth flow")
+                return None
             try:
                 if os.path.exists(CLIENT_SECRETS_PATH):
                     flow = InstalledAppFlow.from_client_secrets_file(
                         CLIENT_SECRETS_PATH, scopes)
                     creds = flow.run_local_server(port=0)
                 else:
-                    print(f"Client secrets file not found at {CLIENT_SECRETS_PATH}")
+                    logger.warning(f"Client secrets file not found at {CLIENT_SECRETS_PATH}")
                     return None
             except Exception as e:
-                print(f"Error during authentication flow: {e}")
+                logger.error(f"Error during authentication flow: {e}")
                 return None
         
         # Save the credentials for the next run
@@ -64,6 +93,6 @@ def get_credentials(scopes):
             with open(TOKEN_PATH, 'wb') as token:
                 pickle.dump(creds, token)
         except Exception as e:
-            print(f"Error saving token to {TOKEN_PATH}: {e}")
+            logger.error(f"Error saving token to {TOKEN_PATH}: {e}")
     
     return creds
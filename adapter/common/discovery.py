@@ -0,0 +1,54 @@
+"""
+Offline construction of Google API service objects.
+
+googleapiclient ships the discovery documents of the public APIs with the
+package. Services are built from those with build_from_document, so building
+one never fetches a discovery document over the network.
+"""
+
+import functools
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=None)
+def load_discovery_document(api, version):
+    """
+    Load the bundled discovery document for an API.
+
+    Args:
+        api: API name, e.g. "calendar"
+        version: API version, e.g. "v3"
+
+    Returns:
+        Parsed discovery document, or None if it is not bundled
+    """
+    from googleapiclient.discovery_cache import get_static_doc
+
+    document = get_static_doc(api, version)
+    return json.loads(document) if document else None
+
+def build_service(api, version, credentials):
+    """
+    Build a service object from the bundled discovery document.
+
+    Falls back to build(), which may fetch the document, when the installed
+    googleapiclient does not bundle it.
+
+    Args:
+        api: API name, e.g. "calendar"
+        version: API version, e.g. "v3"
+        credentials: Google OAuth credentials
+
+    Returns:
+        googleapiclient Resource for the API
+    """
+    # Imported on first use; googleapiclient is slow to import
+    from googleapiclient.discovery import build, build_from_document
+
+    document = load_discovery_document(api, version)
+    if document is None:
+        logger.warning(f"No bundled discovery document for {api} {version}, fetching it")
+        return build(api, version, credentials=credentials)
+    return build_from_document(document, credentials=credentials)
@@ -0,0 +1,132 @@
+"""
+Bounded thread pools for blocking upstream I/O.
+
+The Google client library is synchronous, so its requests run on a named
+thread pool per upstream instead of on the event loop. Pool sizes cap how many
+requests to one upstream run at once; calls beyond that wait in the pool's
+queue, which is exported as a metric.
+
+httplib2 connections are not thread-safe, so each pool thread executes
+requests over its own authorized HTTP object built from the service's shared
+credentials.
+
+Pool sizes come from MCP_UPSTREAM_POOL_SIZES, JSON overriding the defaults,
+e.g. {"google_calendar": 16}.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from adapter.common.metrics import REGISTRY, track_upstream
+
+DEFAULT_POOL_SIZE = 4
+POOL_SIZES = {
+    "google_calendar": 8,
+    "google_directory": 4,
+}
+POOL_SIZES.update(json.loads(os.environ.get("MCP_UPSTREAM_POOL_SIZES", "{}")))
+
+QUEUED = REGISTRY.gauge("mcp_executor_queued", "Blocking calls waiting for a pool thread", ["pool"])
+ACTIVE = REGISTRY.gauge("mcp_executor_active", "Blocking calls running on a pool thread", ["pool"])
+WAIT = REGISTRY.histogram("mcp_executor_wait_seconds", "Time blocking calls waited for a pool thread", ["pool"])
+
+_executors = {}
+_executors_lock = threading.Lock()
+_local = threading.local()
+
+def get_executor(upstream):
+    """
+    Get the thread pool for an upstream, creating it on first use.
+
+    Args:
+        upstream: Upstream name, e.g. "google_calendar"
+
+    Returns:
+        ThreadPoolExecutor whose threads are named after the upstream
+    """
+    executor = _executors.get(upstream)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(upstream)
+            if executor is None:
+                executor = _executors[upstream] = ThreadPoolExecutor(
+                    max_workers=POOL_SIZES.get(upstream, DEFAULT_POOL_SIZE),
+                    thread_name_prefix=f"mcp-{upstream}",
+                )
+    return executor
+
+async def run_blocking(upstream, fn, *args, **kwargs):
+    """
+    Run a blocking function on the upstream's thread pool.
+
+    Args:
+        upstream: Upstream name selecting the pool
+        fn: Blocking callable
+        *args, **kwargs: Passed to fn
+
+    Returns:
+        What fn returns
+    """
+    queued_at = time.perf_counter()
+    QUEUED.inc(pool=upstream)
+
+    def run():
+        QUEUED.dec(pool=upstream)
+        WAIT.observe(time.perf_counter() - queued_at, pool=upstream)
+        ACTIVE.inc(pool=upstream)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            ACTIVE.dec(pool=upstream)
+
+    future = get_executor(upstream).submit(run)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # A call cancelled while still queued never reaches run()
+        if future.cancel():
+            QUEUED.dec(pool=upstream)
+        raise
+
+def _thread_http(credentials):
+    """Authorized HTTP object of the current pool thread for these credentials."""
+    cache = getattr(_local, "http", None)
+    if cache is None:
+        cache = _local.http = {}
+    http = cache.get(id(credentials))
+    if http is None:
+        import google_auth_httplib2
+        import httplib2
+        http = cache[id(credentials)] = google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http())
+    return http
+
+def _execute(request, credentials=None):
+    if credentials is None:
+        credentials = getattr(getattr(request, "http", None), "credentials", None)
+    if credentials is None:
+        return request.execute()
+    return request.execute(http=_thread_http(credentials))
+
+async def execute(upstream, operation, request, credentials=None):
+    """
+    Execute a googleapiclient request on the upstream's thread pool.
+
+    Args:
+        upstream: Upstream name, e.g. "google_calendar"
+        operation: Operation name for metrics, e.g. "events.list"
+        request: Unexecuted googleapiclient HttpRequest or BatchHttpRequest
+        credentials: Credentials to authorize with; by default those of the
+            request's own HTTP object (a batch has none of its own)
+
+    Returns:
+        The decoded response
+    """
+    def call():
+        with track_upstream(upstream, operation):
+            return _execute(request, credentials)
+
+    return await run_blocking(upstream, call)
@@ -0,0 +1,116 @@
+"""
+Non-blocking, structured logging for the server.
+
+Log calls only put the record on an in-memory queue; a background listener
+thread formats it and writes it to stderr. stdout is never used, because in
+stdio mode it carries the MCP protocol.
+
+Records can carry structured fields through ``extra``, e.g.
+``logger.info("tool call", extra={"tool": name, "latency_ms": 12.3, "outcome": "ok"})``.
+They are appended to the line as key=value pairs, or emitted as JSON objects
+with MCP_LOG_FORMAT=json.
+
+Levels:
+- MCP_LOG_LEVEL: root level (default INFO)
+- MCP_LOG_LEVELS: per-module overrides, e.g. "adapter.weather=DEBUG,transport.rpc=WARNING"
+  ("mcp.tools" and "mcp.upstream" carry the per-call lines)
+"""
+
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+# Library loggers that are too chatty at INFO for a per-request hot path
+DEFAULT_LEVELS = {"httpx": "WARNING"}
+
+# Structured fields recognised on log records, in output order
+FIELDS = ("tool", "upstream", "operation", "latency_ms", "outcome", "caller")
+
+_listener = None
+
+class StructuredFormatter(logging.Formatter):
+    """Text lines with structured fields appended as key=value pairs."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = [f"{name}={getattr(record, name)}" for name in FIELDS if hasattr(record, name)]
+        return f"{line} {' '.join(fields)}" if fields else line
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in FIELDS:
+            if hasattr(record, name):
+                entry[name] = getattr(record, name)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def parse_levels(spec):
+    """
+    Parse per-module level overrides.
+
+    Args:
+        spec: Comma-separated "module=LEVEL" pairs
+
+    Returns:
+        Dict mapping logger names to level names
+    """
+    levels = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def setup_logging(level=None, levels=None, fmt=None):
+    """
+    Route all logging through a queue to a stderr writer thread.
+
+    Safe to call more than once; later calls only update the levels.
+
+    Args:
+        level: Root level name (defaults to MCP_LOG_LEVEL or INFO)
+        levels: Per-logger level overrides (defaults to MCP_LOG_LEVELS)
+        fmt: "text" or "json" (defaults to MCP_LOG_FORMAT or text)
+    """
+    global _listener
+
+    root = logging.getLogger()
+    root.setLevel((level or os.environ.get("MCP_LOG_LEVEL", "INFO")).upper())
+    overrides = dict(DEFAULT_LEVELS)
+    overrides.update(levels if levels is not None else parse_levels(os.environ.get("MCP_LOG_LEVELS")))
+    for name, name_level in overrides.items():
+        logging.getLogger(name).setLevel(name_level)
+
+    if _listener is not None:
+        return
+
+    fmt = fmt or os.environ.get("MCP_LOG_FORMAT", "text")
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else StructuredFormatter())
+
+    log_queue = queue.SimpleQueue()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    # Flush what is still queued when the process exits
+    atexit.register(_listener.stop)
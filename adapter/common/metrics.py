@@ -0,0 +1,251 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Tools and adapters record into the module-level REGISTRY; the HTTP transport
+renders it at /metrics. Metrics are thread-safe so that adapter calls running
+in worker threads can record as well.
+
+track_tool and track_upstream also log each call with structured fields, to
+the "mcp.tools" (INFO) and "mcp.upstream" (DEBUG, WARNING on failure) loggers.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+tool_logger = logging.getLogger("mcp.tools")
+upstream_logger = logging.getLogger("mcp.upstream")
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow upstream calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class _Metric:
+    """Base class for a metric family with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted((key, (list(state[0]), state[1], state[2])) for key, state in self._values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.label_names, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, label_names=()):
+        return self.register(Counter(name, documentation, label_names))
+
+    def gauge(self, name, documentation, label_names=()):
+        return self.register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self):
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            The exposition text, ending with a newline
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Process-wide registry
+REGISTRY = MetricsRegistry()
+
+TOOL_CALLS = REGISTRY.counter("mcp_tool_calls_total", "Tool calls completed", ["tool"])
+TOOL_ERRORS = REGISTRY.counter("mcp_tool_errors_total", "Tool calls that raised or returned an error status", ["tool"])
+TOOL_IN_FLIGHT = REGISTRY.gauge("mcp_tool_in_flight", "Tool calls currently executing", ["tool"])
+TOOL_LATENCY = REGISTRY.histogram("mcp_tool_latency_seconds", "Tool call latency in seconds", ["tool"])
+
+UPSTREAM_CALLS = REGISTRY.counter("mcp_upstream_requests_total", "Upstream API requests completed", ["upstream", "operation"])
+UPSTREAM_ERRORS = REGISTRY.counter("mcp_upstream_errors_total", "Upstream API requests that failed", ["upstream", "operation"])
+UPSTREAM_LATENCY = REGISTRY.histogram("mcp_upstream_latency_seconds", "Upstream API request latency in seconds", ["upstream", "operation"])
+
+@contextmanager
+def track_tool(tool, caller=None):
+    """
+    Record call count, errors, in-flight calls and latency for one tool call.
+
+    Yields a dict; set its "error" key to True to count a call that returned
+    an error result without raising.
+
+    Args:
+        tool: Tool name
+        caller: Name of the API token making the call, for the log line
+    """
+    TOOL_IN_FLIGHT.inc(tool=tool)
+    outcome = {"error": False}
+    start = time.perf_counter()
+    try:
+        yield outcome
+    except BaseException:
+        outcome["error"] = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        TOOL_LATENCY.observe(elapsed, tool=tool)
+        TOOL_CALLS.inc(tool=tool)
+        if outcome["error"]:
+            TOOL_ERRORS.inc(tool=tool)
+        TOOL_IN_FLIGHT.dec(tool=tool)
+        if tool_logger.isEnabledFor(logging.INFO):
+            tool_logger.info("tool call", extra={
+                "tool": tool,
+                "caller": caller,
+                "latency_ms": round(elapsed * 1000, 2),
+                "outcome": "error" if outcome["error"] else "ok",
+            })
+
+@contextmanager
+def track_upstream(upstream, operation):
+    """
+    Record count, errors and latency for one upstream API request.
+
+    Args:
+        upstream: Upstream service, e.g. "google_calendar", "google_directory", "nws"
+        operation: Operation name, e.g. "events.insert", "users.get", "alerts"
+    """
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        UPSTREAM_ERRORS.inc(upstream=upstream, operation=operation)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        UPSTREAM_LATENCY.observe(elapsed, upstream=upstream, operation=operation)
+        UPSTREAM_CALLS.inc(upstream=upstream, operation=operation)
+        level = logging.WARNING if failed else logging.DEBUG
+        if upstream_logger.isEnabledFor(level):
+            upstream_logger.log(level, "upstream call", extra={
+                "upstream": upstream,
+                "operation": operation,
+                "latency_ms": round(elapsed * 1000, 2),
+                "outcome": "error" if failed else "ok",
+            })
@@ -0,0 +1,97 @@
+"""
+Helpers for JSON state files shared between server processes.
+
+With several HTTP workers, each process keeps its own in-memory copy of files
+such as the fallback contacts list and the name aliases. The file on disk is
+the source of truth:
+- readers reload their copy whenever the file's signature (mtime, size) changes
+- writers take an exclusive lock, reload the latest copy, apply their change and
+  replace the file atomically, so concurrent writers never lose updates
+"""
+
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager, contextmanager
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no fcntl
+    fcntl = None
+
+def file_signature(path):
+    """
+    Get a cheap signature that changes whenever the file is rewritten.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Tuple of (mtime in ns, size), or None if the file does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+@contextmanager
+def file_lock(path):
+    """
+    Hold an exclusive inter-process lock for a shared file.
+
+    The lock is taken on a sidecar "<path>.lock" file so that atomic replaces
+    of the data file do not invalidate it. Without fcntl this is a no-op.
+
+    Args:
+        path: Path to the shared file
+    """
+    if fcntl is None:
+        yield
+        return
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+@asynccontextmanager
+async def async_file_lock(path):
+    """
+    Hold file_lock(path) from a coroutine, e.g. across upstream calls.
+
+    Waiting for the lock happens on a worker thread, so the event loop keeps
+    running while another process holds it. Like file_lock, it is not
+    re-entrant: do not take file_lock(path) again while holding it.
+
+    Args:
+        path: Path to the shared file
+    """
+    if fcntl is None:
+        yield
+        return
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.lock", "a") as lock_file:
+        await asyncio.to_thread(fcntl.flock, lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def atomic_write_json(path, data):
+    """
+    Write JSON to a file so that readers never observe a partial write.
+
+    Args:
+        path: Destination path
+        data: JSON-serializable data
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
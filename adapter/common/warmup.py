@@ -0,0 +1,95 @@
+"""
+Startup warmup for the HTTP transport.
+
+Pays the one-time costs of the first calendar and contacts calls (reading
+the token files, refreshing credentials, building the Google API services,
+loading the contacts and alias files and importing the tool modules) before
+the server reports ready. Warmup never starts the browser OAuth flow; an
+upstream without stored credentials is reported as unavailable.
+
+A step that raises keeps the server from reporting ready: /ready answers
+503 with status "failed", and failed steps are retried every
+MCP_WARMUP_RETRY_DELAY seconds until they succeed.
+"""
+
+import asyncio
+import os
+import time
+
+RETRY_DELAY = float(os.environ.get("MCP_WARMUP_RETRY_DELAY", "30"))
+
+def _load_contact_files():
+    from adapter.contacts.fallback import ensure_fallback_contacts_file, load_fuzzy_matching
+    from adapter.contacts.resolution import load_name_aliases
+    ensure_fallback_contacts_file()
+    load_name_aliases()
+    load_fuzzy_matching()
+    return True
+
+def _import_tools():
+    import tools.calendar
+    import tools.contacts
+    import tools.weather
+    return True
+
+def _calendar_service():
+    from adapter.calendar.auth import get_calendar_service
+    return get_calendar_service(interactive=False) is not None
+
+def _directory_service():
+    from adapter.contacts.directory_api import get_directory_service
+    return get_directory_service(interactive=False) is not None
+
+# (name, blocking function) pairs; a function returns False if its upstream is unavailable
+WARMUP_STEPS = [
+    ("contact_files", _load_contact_files),
+    ("tool_modules", _import_tools),
+    ("calendar_service", _calendar_service),
+    ("directory_service", _directory_service),
+]
+
+class Warmup:
+    """Runs the warmup steps once and records whether the process is ready."""
+
+    def __init__(self, steps=None, retry_delay=RETRY_DELAY):
+        self.steps = WARMUP_STEPS if steps is None else steps
+        self.retry_delay = retry_delay
+        self.ready = False
+        self.failed = False
+        self.results = {}
+
+    async def _run_step(self, name, step):
+        start = time.perf_counter()
+        try:
+            status = "ok" if await asyncio.to_thread(step) is not False else "unavailable"
+        except Exception as e:
+            status = f"error: {e}"
+        self.results[name] = {"status": status, "seconds": round(time.perf_counter() - start, 3)}
+        return not status.startswith("error")
+
+    async def run(self):
+        """
+        Run every step in a worker thread, so the event loop keeps serving
+        /health and /ready meanwhile. A failing step does not stop the others;
+        the process becomes ready once every step has run without error.
+        """
+        pending = list(self.steps)
+        while True:
+            pending = [(name, step) for name, step in pending if not await self._run_step(name, step)]
+            if not pending:
+                break
+            self.failed = True
+            await asyncio.sleep(self.retry_delay)
+        self.failed = False
+        self.ready = True
+
+    def status(self):
+        """
+        Returns:
+            Dict with "status" ("ready", "warming_up" or "failed") and per-step results
+        """
+        if self.ready:
+            status = "ready"
+        else:
+            status = "failed" if self.failed else "warming_up"
+        return {"status": status, "steps": dict(self.results)}
@@ -2,30 +2,46 @@
 Google Directory API adapter for contact management.
 """
 
+import logging
 import os
 import json
-from googleapiclient.discovery import build
 from ..common.auth import get_credentials
+from ..common.discovery import build_service
+from ..common.executor import execute, run_blocking
+
+logger = logging.getLogger(__name__)
 
 # If modifying these scopes, delete the token.pickle file
 SCOPES = ['https://www.googleapis.com/auth/admin.directory.user.readonly']
 
-def get_directory_service():
+# Service built on first use from the bundled discovery document and reused;
+# its authorized HTTP refreshes the access token by itself when it expires
+_service = None
+
+def get_directory_service(interactive=True):
     """
     Get an authenticated Google Directory API service.
     
+    Args:
+        interactive: Run the browser OAuth flow if there are no valid credentials
+    
     Returns:
         Directory API service or None if authentication fails
     """
-    creds = get_credentials(SCOPES)
+    global _service
+    
+    if _service is not None:
+        return _service
+    
+    creds = get_credentials(SCOPES, interactive=interactive)
     if not creds:
         return None
     
     try:
-        service = build('admin', 'directory_v1', credentials=creds)
-        return service
+        _service = build_service('admin', 'directory_v1', creds)
+        return _service
     except Exception as e:
-        print(f"Error building directory service: {e}")
+        logger.error(f"Error building directory service: {e}")
         return None
 
 async def lookup_contact_in_directory(query):
@@ -40,13 +56,13 @@ async def lookup_contact_in_directory(query):
     """
     try:
         # Get the directory service
-        service = get_directory_service()
+        service = await run_blocking("google_directory", get_directory_service)
         if not service:
             return None
         
         # Try to find the user by email first
         try:
-            user = service.users().get(userKey=query).execute()
+            user = await execute("google_directory", "users.get", service.users().get(userKey=query))
             name = user.get('name', {}).get('fullName', 'Unknown')
             email = user.get('primaryEmail', '')
             
@@ -61,11 +77,11 @@ async def lookup_contact_in_directory(query):
             pass
         
         # Search for the user by name
-        results = service.users().list(
+        results = await execute("google_directory", "users.list", service.users().list(
             customer='my_customer',
             query=f"name:{query}* OR email:{query}*",
             maxResults=1
-        ).execute()
+        ))
         
         users = results.get('users', [])
         
@@ -82,44 +98,64 @@ async def lookup_contact_in_directory(query):
                 }
     
     except Exception as e:
-        print(f"Error looking up contact in directory: {e}")
+        logger.error(f"Error looking up contact in directory: {e}")
     
     return None
 
+# Largest page users.list allows
+DIRECTORY_PAGE_SIZE = 500
+# Only the parts of each user a contact is built from
+DIRECTORY_LIST_FIELDS = "nextPageToken,users(name/fullName,primaryEmail)"
+
+async def iter_directory_contacts():
+    """
+    Yield contacts from the Google Directory, one result page at a time.
+    
+    Yields:
+        Contact dicts with "name", "email" and "source" ("directory")
+    
+    Raises:
+        Exception: Errors from the Directory API
+    """
+    # Get the directory service
+    service = await run_blocking("google_directory", get_directory_service)
+    if not service:
+        return
+    
+    params = {'customer': 'my_customer', 'maxResults': DIRECTORY_PAGE_SIZE, 'orderBy': 'email',
+              'fields': DIRECTORY_LIST_FIELDS}
+    while True:
+        results = await execute("google_directory", "users.list", service.users().list(**params))
+        
+        # Process each user
+        for user in results.get('users', []):
+            name = user.get('name', {}).get('fullName', 'Unknown')
+            email = user.get('primaryEmail', '')
+            
+            if email:  # Only include users with email addresses
+                yield {
+                    "name": name,
+                    "email": email,
+                    "source": "directory"
+                }
+        
+        if not results.get('nextPageToken'):
+            break
+        params['pageToken'] = results['nextPageToken']
+
 async def list_directory_contacts():
     """
     List all contacts from the Google Directory.
     
     Returns:
-        List of contacts from the directory
+        List of contacts from the directory (those fetched before an error, if one occurs)
     """
     directory_contacts = []
     
     try:
-        # Get the directory service
-        service = get_directory_service()
-        if service:
-            # Search for all users in the domain
-            results = service.users().list(
-                customer='my_customer',
-                maxResults=100,
-                orderBy='email'
-            ).execute()
-            
-            users = results.get('users', [])
-            
-            # Process each user
-            for user in users:
-                name = user.get('name', {}).get('fullName', 'Unknown')
-                email = user.get('primaryEmail', '')
-                
-                if email:  # Only include users with email addresses
-                    directory_contacts.append({
-                        "name": name,
-                        "email": email,
-                        "source": "directory"
-                    })
+        async for contact in iter_directory_contacts():
+            directory_contacts.append(contact)
     except Exception as e:
-        print(f"Error fetching directory contacts: {e}")
+        logger.error(f"Error fetching directory contacts: {e}")
     
     return directory_contacts
@@ -2,35 +2,54 @@
 Fallback contacts management for when Directory API is unavailable.
 """
 
+import logging
 import os
 import json
+from adapter.common.executor import run_blocking
+from adapter.common.shared_file import atomic_write_json, file_lock, file_signature
 
-# Try to import fuzzywuzzy, but provide fallback if not available
-try:
-    from fuzzywuzzy import fuzz, process
-    FUZZY_MATCHING_AVAILABLE = True
-except ImportError:
-    print("Warning: fuzzywuzzy package not found. Fuzzy matching will be disabled.")
-    FUZZY_MATCHING_AVAILABLE = False
-    
-    # Create dummy functions to prevent errors
-    class DummyFuzz:
-        @staticmethod
-        def token_sort_ratio(a, b):
-            return 100 if a.lower() == b.lower() else 0
-    
-    class DummyProcess:
-        @staticmethod
-        def extract(query, choices, scorer=None, limit=5):
-            # Simple exact matching as fallback
-            results = []
-            for choice in choices:
-                if query.lower() in choice.lower():
-                    results.append((choice, 100))
-            return results[:limit]
-    
-    fuzz = DummyFuzz()
-    process = DummyProcess()
+logger = logging.getLogger(__name__)
+
+# Dummy matchers used when fuzzywuzzy is not installed
+class DummyFuzz:
+    @staticmethod
+    def token_sort_ratio(a, b):
+        return 100 if a.lower() == b.lower() else 0
+
+class DummyProcess:
+    @staticmethod
+    def extract(query, choices, scorer=None, limit=5):
+        # Simple exact matching as fallback
+        results = []
+        for choice in choices:
+            if query.lower() in choice.lower():
+                results.append((choice, 100))
+        return results[:limit]
+
+# fuzzywuzzy is imported on first use (see load_fuzzy_matching) to keep startup fast
+FUZZY_MATCHING_AVAILABLE = None
+fuzz = None
+process = None
+
+def load_fuzzy_matching():
+    """
+    Import fuzzywuzzy on first use, providing fallbacks if it is not available.
+    
+    Returns:
+        bool: True if fuzzy matching is available, False otherwise
+    """
+    global FUZZY_MATCHING_AVAILABLE, fuzz, process
+    
+    if FUZZY_MATCHING_AVAILABLE is None:
+        try:
+            from fuzzywuzzy import fuzz, process
+            FUZZY_MATCHING_AVAILABLE = True
+        except ImportError:
+            logger.warning("fuzzywuzzy package not found. Fuzzy matching will be disabled.")
+            FUZZY_MATCHING_AVAILABLE = False
+            fuzz = DummyFuzz()
+            process = DummyProcess()
+    return FUZZY_MATCHING_AVAILABLE
 
 # Default fallback contacts
 DEFAULT_FALLBACK_CONTACTS = [
@@ -46,92 +65,96 @@ FALLBACK_CONTACTS = DEFAULT_FALLBACK_CONTACTS.copy()
 # Path to save fallback contacts
 FALLBACK_CONTACTS_PATH = os.path.join(os.path.dirname(__file__), "../../secrets/fallback-contacts.json")
 
+# Thread pool the locked read-modify-write of the file runs on, off the event loop
+FILE_POOL = "contact_files"
+
 # Threshold for fuzzy matching
 FUZZY_MATCH_THRESHOLD = 70
 
+# Signature of the fallback contacts file when FALLBACK_CONTACTS was last synced with it
+_loaded_signature = None
+
 # Function to ensure fallback contacts file exists and is properly initialized
 def ensure_fallback_contacts_file():
     """
     Ensures that the fallback contacts file exists and is properly initialized.
     If the file doesn't exist, creates it with default contacts.
     If the file exists but is invalid, resets it with default contacts.
+    The file is only re-read when it has changed since it was last loaded,
+    e.g. because another server process saved it.
     
     Returns:
         bool: True if the file exists and is valid, False otherwise
     """
-    global FALLBACK_CONTACTS
+    global FALLBACK_CONTACTS, _loaded_signature
     
     try:
-        # Ensure the secrets directory exists
-        os.makedirs(os.path.dirname(FALLBACK_CONTACTS_PATH), exist_ok=True)
+        signature = file_signature(FALLBACK_CONTACTS_PATH)
+        if signature is not None and signature == _loaded_signature:
+            # Unchanged since we last loaded or saved it
+            return True
         
-        if os.path.exists(FALLBACK_CONTACTS_PATH):
+        if signature is not None:
             # File exists, try to load it
             try:
                 with open(FALLBACK_CONTACTS_PATH, 'r') as f:
                     loaded_contacts = json.load(f)
-                    if isinstance(loaded_contacts, list):
-                        FALLBACK_CONTACTS = loaded_contacts
-                        print(f"Loaded {len(FALLBACK_CONTACTS)} fallback contacts from {FALLBACK_CONTACTS_PATH}")
-                        return True
-                    else:
-                        print(f"Invalid format in {FALLBACK_CONTACTS_PATH}, using default contacts")
-                        # File exists but has invalid format, reset it
-                        with open(FALLBACK_CONTACTS_PATH, 'w') as f:
-                            json.dump(FALLBACK_CONTACTS, f, indent=2)
-                        print(f"Reset fallback contacts file with default contacts")
-                        return True
+                if isinstance(loaded_contacts, list):
+                    FALLBACK_CONTACTS = loaded_contacts
+                    _loaded_signature = signature
+                    _clear_contact_cache()
+                    logger.info(f"Loaded {len(FALLBACK_CONTACTS)} fallback contacts from {FALLBACK_CONTACTS_PATH}")
+                    return True
+                else:
+                    logger.warning(f"Invalid format in {FALLBACK_CONTACTS_PATH}, using default contacts")
+                    # File exists but has invalid format, reset it
+                    _write_fallback_contacts()
+                    logger.warning(f"Reset fallback contacts file with default contacts")
+                    return True
             except Exception as e:
-                print(f"Error loading fallback contacts from {FALLBACK_CONTACTS_PATH}: {e}")
+                logger.error(f"Error loading fallback contacts from {FALLBACK_CONTACTS_PATH}: {e}")
                 # File exists but has errors, reset it
-                with open(FALLBACK_CONTACTS_PATH, 'w') as f:
-                    json.dump(FALLBACK_CONTACTS, f, indent=2)
-                print(f"Reset fallback contacts file with default contacts due to error")
+                _write_fallback_contacts()
+                logger.warning(f"Reset fallback contacts file with default contacts due to error")
                 return True
         else:
             # File doesn't exist, create it
-            with open(FALLBACK_CONTACTS_PATH, 'w') as f:
-                json.dump(FALLBACK_CONTACTS, f, indent=2)
-            print(f"Created new fallback contacts file with default contacts")
+            _write_fallback_contacts()
+            logger.info(f"Created new fallback contacts file with default contacts")
             return True
     except Exception as e:
-        print(f"Error ensuring fallback contacts file: {e}")
+        logger.error(f"Error ensuring fallback contacts file: {e}")
         return False
 
-# Initialize fallback contacts on module import
-try:
-    ensure_fallback_contacts_file()
-except Exception as e:
-    print(f"Error initializing fallback contacts: {e}")
+def _write_fallback_contacts():
+    """Atomically write FALLBACK_CONTACTS to disk and remember the file's signature."""
+    global _loaded_signature
+    
+    atomic_write_json(FALLBACK_CONTACTS_PATH, FALLBACK_CONTACTS)
+    _loaded_signature = file_signature(FALLBACK_CONTACTS_PATH)
+
+def _clear_contact_cache():
+    """Drop cached contact lookups that may refer to outdated fallback contacts."""
+    # Import here to avoid circular imports
+    from .resolution import contact_cache
+    contact_cache.clear()
 
 def save_fallback_contacts():
     """
     Save the current fallback contacts to the JSON file in secrets directory.
-    Creates the file if it doesn't exist.
+    Creates the file if it doesn't exist. The file is replaced atomically so
+    other server processes never read a partially written list.
     
     Returns:
         bool: True if successful, False otherwise
     """
     try:
-        # Ensure the secrets directory exists
-        os.makedirs(os.path.dirname(FALLBACK_CONTACTS_PATH), exist_ok=True)
-        
-        with open(FALLBACK_CONTACTS_PATH, 'w') as f:
-            json.dump(FALLBACK_CONTACTS, f, indent=2)
-        print(f"Saved {len(FALLBACK_CONTACTS)} fallback contacts to {FALLBACK_CONTACTS_PATH}")
+        _write_fallback_contacts()
+        logger.info(f"Saved {len(FALLBACK_CONTACTS)} fallback contacts to {FALLBACK_CONTACTS_PATH}")
         return True
     except Exception as e:
-        print(f"Error saving fallback contacts to {FALLBACK_CONTACTS_PATH}: {e}")
-        # Try to recreate the file with current contacts
-        try:
-            os.makedirs(os.path.dirname(FALLBACK_CONTACTS_PATH), exist_ok=True)
-            with open(FALLBACK_CONTACTS_PATH, 'w') as f:
-                json.dump(FALLBACK_CONTACTS, f, indent=2)
-            print(f"Successfully recreated fallback contacts file after error")
-            return True
-        except Exception as e2:
-            print(f"Failed to recreate fallback contacts file: {e2}")
-            return False
+        logger.error(f"Error saving fallback contacts to {FALLBACK_CONTACTS_PATH}: {e}")
+        return False
 
 def get_all_fallback_contacts():
     """
@@ -194,26 +217,30 @@ async def add_fallback_contact(name: str, email: str):
     Returns:
         Dictionary with status and the new contact information
     """
+    return await run_blocking(FILE_POOL, _add_fallback_contact, name, email)
+
+def _add_fallback_contact(name: str, email: str):
+    """Add a contact under the file lock; runs on a worker thread."""
     global FALLBACK_CONTACTS
     
-    # Ensure the fallback contacts file exists before proceeding
-    ensure_fallback_contacts_file()
+    # Hold the file lock so concurrent writers in other processes cannot interleave,
+    # and work on the latest contacts from disk
+    with file_lock(FALLBACK_CONTACTS_PATH):
+        ensure_fallback_contacts_file()
     
-    # Create the new contact
-    new_contact = {
-        "name": name,
-        "email": email
-    }
+        # Create the new contact
+        new_contact = {
+            "name": name,
+            "email": email
+        }
     
-    # Add to the fallback contacts list
-    FALLBACK_CONTACTS.append(new_contact)
+        # Add to the fallback contacts list
+        FALLBACK_CONTACTS.append(new_contact)
     
-    # Save the updated contacts to file
-    save_success = save_fallback_contacts()
+        # Save the updated contacts to file
+        save_success = save_fallback_contacts()
     
-    # Import here to avoid circular imports
-    from .resolution import contact_cache
-    contact_cache.clear()
+    _clear_contact_cache()
     
     return {
         "status": "success" if save_success else "warning",
@@ -236,40 +263,44 @@ async def edit_fallback_contact(contact_id: int, new_name: str = None, new_email
     Returns:
         Dictionary with status and the updated contact information
     """
+    return await run_blocking(FILE_POOL, _edit_fallback_contact, contact_id, new_name, new_email)
+
+def _edit_fallback_contact(contact_id: int, new_name: str = None, new_email: str = None):
+    """Edit a contact under the file lock; runs on a worker thread."""
     global FALLBACK_CONTACTS
     
-    # Ensure the fallback contacts file exists before proceeding
-    ensure_fallback_contacts_file()
+    # Hold the file lock so concurrent writers in other processes cannot interleave,
+    # and work on the latest contacts from disk
+    with file_lock(FALLBACK_CONTACTS_PATH):
+        ensure_fallback_contacts_file()
     
-    # Check if the contact ID is valid
-    if contact_id < 0 or contact_id >= len(FALLBACK_CONTACTS):
-        return {
-            "status": "error",
-            "message": f"Invalid contact ID: {contact_id}. Valid range is 0-{len(FALLBACK_CONTACTS)-1}"
-        }
+        # Check if the contact ID is valid
+        if contact_id < 0 or contact_id >= len(FALLBACK_CONTACTS):
+            return {
+                "status": "error",
+                "message": f"Invalid contact ID: {contact_id}. Valid range is 0-{len(FALLBACK_CONTACTS)-1}"
+            }
     
-    # Get the current contact
-    current_contact = FALLBACK_CONTACTS[contact_id]
+        # Get the current contact
+        current_contact = FALLBACK_CONTACTS[contact_id]
     
-    # Create a copy for comparison
-    old_contact = {
-        "name": current_contact.get("name", ""),
-        "email": current_contact.get("email", "")
-    }
+        # Create a copy for comparison
+        old_contact = {
+            "name": current_contact.get("name", ""),
+            "email": current_contact.get("email", "")
+        }
     
-    # Update the contact with new values if provided
-    if new_name is not None:
-        current_contact["name"] = new_name
+        # Update the contact with new values if provided
+        if new_name is not None:
+            current_contact["name"] = new_name
     
-    if new_email is not None:
-        current_contact["email"] = new_email
+        if new_email is not None:
+            current_contact["email"] = new_email
     
-    # Save the updated contacts to file
-    save_success = save_fallback_contacts()
+        # Save the updated contacts to file
+        save_success = save_fallback_contacts()
     
-    # Import here to avoid circular imports
-    from .resolution import contact_cache
-    contact_cache.clear()
+    _clear_contact_cache()
     
     return {
         "status": "success" if save_success else "warning",
@@ -291,30 +322,34 @@ async def delete_fallback_contact(contact_id: int):
     Returns:
         Dictionary with status and the deleted contact information
     """
+    return await run_blocking(FILE_POOL, _delete_fallback_contact, contact_id)
+
+def _delete_fallback_contact(contact_id: int):
+    """Delete a contact under the file lock; runs on a worker thread."""
     global FALLBACK_CONTACTS
     
-    # Ensure the fallback contacts file exists before proceeding
-    ensure_fallback_contacts_file()
+    # Hold the file lock so concurrent writers in other processes cannot interleave,
+    # and work on the latest contacts from disk
+    with file_lock(FALLBACK_CONTACTS_PATH):
+        ensure_fallback_contacts_file()
     
-    # Check if the contact ID is valid
-    if contact_id < 0 or contact_id >= len(FALLBACK_CONTACTS):
-        return {
-            "status": "error",
-            "message": f"Invalid contact ID: {contact_id}. Valid range is 0-{len(FALLBACK_CONTACTS)-1}"
-        }
+        # Check if the contact ID is valid
+        if contact_id < 0 or contact_id >= len(FALLBACK_CONTACTS):
+            return {
+                "status": "error",
+                "message": f"Invalid contact ID: {contact_id}. Valid range is 0-{len(FALLBACK_CONTACTS)-1}"
+            }
     
-    # Get the contact to be deleted
-    deleted_contact = FALLBACK_CONTACTS[contact_id]
+        # Get the contact to be deleted
+        deleted_contact = FALLBACK_CONTACTS[contact_id]
     
-    # Remove the contact from the list
-    FALLBACK_CONTACTS.pop(contact_id)
+        # Remove the contact from the list
+        FALLBACK_CONTACTS.pop(contact_id)
     
-    # Save the updated contacts to file
-    save_success = save_fallback_contacts()
+        # Save the updated contacts to file
+        save_success = save_fallback_contacts()
     
-    # Import here to avoid circular imports
-    from .resolution import contact_cache
-    contact_cache.clear()
+    _clear_contact_cache()
     
     return {
         "status": "success" if save_success else "warning",
@@ -342,7 +377,7 @@ def fuzzy_match_contacts(name, contact_list):
     # Extract just the names for matching
     names = [contact["name"] for contact in contact_list]
     
-    if FUZZY_MATCHING_AVAILABLE:
+    if load_fuzzy_matching():
         # Use fuzzy matching if available
         # Find the best matches using process.extract which returns multiple matches
         fuzzy_matches = process.extract(name, names, scorer=fuzz.token_sort_ratio, limit=5)
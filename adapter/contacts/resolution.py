@@ -2,9 +2,14 @@
 Contact resolution and caching functionality.
 """
 
+import logging
 import os
 import json
 import re
+from adapter.common.executor import run_blocking
+from adapter.common.shared_file import atomic_write_json, file_lock, file_signature
+
+logger = logging.getLogger(__name__)
 
 # In-memory cache for contacts and aliases
 contact_cache = {}
@@ -12,45 +17,66 @@ contact_cache = {}
 # Path to name aliases file
 NAME_ALIASES_PATH = os.path.join(os.path.dirname(__file__), "../../secrets/name-aliases.json")
 
+# Thread pool the locked read-modify-write of the file runs on, off the event loop
+FILE_POOL = "contact_files"
+
 # Global variable to store name aliases
 name_aliases = {}
 
-# Load name aliases from file if it exists
-try:
-    if os.path.exists(NAME_ALIASES_PATH):
-        with open(NAME_ALIASES_PATH, 'r') as f:
-            loaded_aliases = json.load(f)
+# Signature of the name aliases file when name_aliases was last synced with it
+_aliases_signature = None
+
+def load_name_aliases():
+    """
+    Load name aliases from file, creating an empty file if it doesn't exist.
+    The file is only re-read when it has changed since it was last loaded,
+    e.g. because another server process saved it.
+    """
+    global name_aliases, _aliases_signature
+    
+    try:
+        signature = file_signature(NAME_ALIASES_PATH)
+        if signature is not None and signature == _aliases_signature:
+            return
+        
+        if signature is not None:
+            with open(NAME_ALIASES_PATH, 'r') as f:
+                loaded_aliases = json.load(f)
             if isinstance(loaded_aliases, dict):
                 name_aliases = loaded_aliases
-                print(f"Loaded {len(name_aliases)} name aliases from {NAME_ALIASES_PATH}")
+                logger.info(f"Loaded {len(name_aliases)} name aliases from {NAME_ALIASES_PATH}")
             else:
-                print(f"Invalid format in {NAME_ALIASES_PATH}, using empty aliases")
-    else:
-        print(f"No name aliases file found at {NAME_ALIASES_PATH}, using empty aliases")
-        # Create an empty aliases file
-        os.makedirs(os.path.dirname(NAME_ALIASES_PATH), exist_ok=True)
-        with open(NAME_ALIASES_PATH, 'w') as f:
-            json.dump({}, f, indent=2)
-        print(f"Created empty name aliases file at {NAME_ALIASES_PATH}")
-except Exception as e:
-    print(f"Error loading name aliases from {NAME_ALIASES_PATH}: {e}")
+                logger.warning(f"Invalid format in {NAME_ALIASES_PATH}, using empty aliases")
+            _aliases_signature = signature
+            # Cached lookups may have come from aliases that changed
+            contact_cache.clear()
+        else:
+            logger.info(f"No name aliases file found at {NAME_ALIASES_PATH}, using empty aliases")
+            # Create an empty aliases file
+            atomic_write_json(NAME_ALIASES_PATH, {})
+            _aliases_signature = file_signature(NAME_ALIASES_PATH)
+            logger.info(f"Created empty name aliases file at {NAME_ALIASES_PATH}")
+    except Exception as e:
+        logger.error(f"Error loading name aliases from {NAME_ALIASES_PATH}: {e}")
 
 def save_name_aliases():
     """
     Save the current name aliases to the JSON file in secrets directory.
-    Creates the file if it doesn't exist.
+    Creates the file if it doesn't exist. The file is replaced atomically so
+    other server processes never read a partially written mapping.
     
     Returns:
         bool: True if successful, False otherwise
     """
+    global _aliases_signature
+    
     try:
-        os.makedirs(os.path.dirname(NAME_ALIASES_PATH), exist_ok=True)
-        with open(NAME_ALIASES_PATH, 'w') as f:
-            json.dump(name_aliases, f, indent=2)
-        print(f"Saved {len(name_aliases)} name aliases to {NAME_ALIASES_PATH}")
+        atomic_write_json(NAME_ALIASES_PATH, name_aliases)
+        _aliases_signature = file_signature(NAME_ALIASES_PATH)
+        logger.info(f"Saved {len(name_aliases)} name aliases to {NAME_ALIASES_PATH}")
         return True
     except Exception as e:
-        print(f"Error saving name aliases to {NAME_ALIASES_PATH}: {e}")
+        logger.error(f"Error saving name aliases to {NAME_ALIASES_PATH}: {e}")
         return False
 
 def add_contact_to_cache(name, email):
@@ -103,6 +129,9 @@ async def resolve_contact(query):
             "source": "direct_email"
         }
     
+    # Pick up alias changes saved by other server processes
+    load_name_aliases()
+    
     # Check the cache
     if query_lower in contact_cache:
         email = contact_cache[query_lower]
@@ -154,6 +183,18 @@ async def add_name_alias(alias, email):
     Returns:
         Dictionary with status and the new alias information
     """
+    return await run_blocking(FILE_POOL, _add_name_alias_locked, alias, email)
+
+def _add_name_alias_locked(alias, email):
+    """Add an alias under the file lock; runs on a worker thread."""
+    # Hold the file lock so writers in other server processes cannot interleave,
+    # and apply the change to the latest aliases from disk
+    with file_lock(NAME_ALIASES_PATH):
+        load_name_aliases()
+        return _add_name_alias(alias, email)
+
+def _add_name_alias(alias, email):
+    """Add a name alias and save it; the caller holds the file lock."""
     global name_aliases
     
     # Normalize the alias
@@ -213,6 +254,18 @@ async def delete_name_alias(alias):
     Returns:
         Dictionary with status and the deleted alias information
     """
+    return await run_blocking(FILE_POOL, _delete_name_alias_locked, alias)
+
+def _delete_name_alias_locked(alias):
+    """Delete an alias under the file lock; runs on a worker thread."""
+    # Hold the file lock so writers in other server processes cannot interleave,
+    # and apply the change to the latest aliases from disk
+    with file_lock(NAME_ALIASES_PATH):
+        load_name_aliases()
+        return _delete_name_alias(alias)
+
+def _delete_name_alias(alias):
+    """Delete a name alias and save it; the caller holds the file lock."""
     global name_aliases
     
     # Normalize the alias
@@ -251,6 +304,8 @@ async def list_name_aliases():
     Returns:
         Dictionary with alias-email mappings
     """
+    load_name_aliases()
+    
     # Create a copy of the aliases to return
     aliases_list = []
     
@@ -277,11 +332,9 @@ async def list_all_contacts():
     
     directory_contacts = []
     try:
-        directory_result = await list_directory_contacts()
-        if directory_result and "contacts" in directory_result:
-            directory_contacts = directory_result["contacts"]
+        directory_contacts = await list_directory_contacts()
     except Exception as e:
-        print(f"Error fetching directory contacts: {e}")
+        logger.error(f"Error fetching directory contacts: {e}")
     
     # Get contacts from fallback
     from adapter.contacts.fallback import get_all_fallback_contacts
@@ -290,7 +343,7 @@ async def list_all_contacts():
     try:
         fallback_contacts = get_all_fallback_contacts()
     except Exception as e:
-        print(f"Error fetching fallback contacts: {e}")
+        logger.error(f"Error fetching fallback contacts: {e}")
     
     # Combine results
     return {
@@ -3,6 +3,6 @@ Weather adapter package for weather data integration.
 """
 
 # Export all weather-related functions
-from adapter.weather.client import make_nws_request
+from adapter.weather.client import make_nws_request, get_http_client, close_http_client
 from adapter.weather.alerts import fetch_alerts_from_api
 from adapter.weather.forecast import fetch_forecast_from_api
@@ -15,4 +15,4 @@ async def fetch_alerts_from_api(state: str) -> dict:
         Dictionary with weather alerts data or None if request failed
     """
     url = f"{NWS_API_BASE}/alerts/active/area/{state}"
-    return await make_nws_request(url)
+    return await make_nws_request(url, operation="alerts")
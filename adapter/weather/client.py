@@ -2,46 +2,100 @@
 Base client for weather API requests.
 """
 
+import asyncio
 import httpx
 import json
+import logging
+
+from adapter.common.metrics import UPSTREAM_ERRORS, track_upstream
+
+logger = logging.getLogger(__name__)
 
 NWS_API_BASE = "https://api.weather.gov"
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
 
-async def make_nws_request(url: str) -> dict | None:
-    """Make a request to the NWS API with proper error handling."""
-    print(f"[weather_adapter] Fetching URL: {url}")
+# Pooled client shared by every transport running on the current event loop
+_http_client = None
+_http_client_loop = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the pooled HTTP client for the running event loop.
+    
+    The client keeps connections to api.weather.gov alive between calls. It is
+    bound to the loop that created it, so a new one is made if the loop changes.
+    
+    Returns:
+        Shared httpx.AsyncClient instance
+    """
+    global _http_client, _http_client_loop
+    
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(timeout=30.0, follow_redirects=True)
+        _http_client_loop = loop
+    return _http_client
+
+async def close_http_client():
+    """Close the pooled HTTP client if it belongs to the running event loop."""
+    global _http_client, _http_client_loop
+    
+    if _http_client is not None and _http_client_loop is asyncio.get_running_loop():
+        await _http_client.aclose()
+    _http_client = None
+    _http_client_loop = None
+
+async def make_nws_request(url: str, operation: str = "request") -> dict | None:
+    """
+    Make a request to the NWS API with proper error handling.
+    
+    Args:
+        url: NWS API URL
+        operation: Operation name for upstream metrics (e.g. "points", "forecast", "alerts")
+    
+    Returns:
+        Parsed JSON response, or None if the request failed
+    """
+    with track_upstream("nws", operation):
+        data = await _fetch_nws(url)
+    if data is None:
+        UPSTREAM_ERRORS.inc(upstream="nws", operation=operation)
+    return data
+
+async def _fetch_nws(url: str) -> dict | None:
+    """Fetch and decode one NWS API URL, returning None on any failure."""
+    logger.debug("Fetching URL: %s", url)
     headers = {
         "User-Agent": USER_AGENT,
         "Accept": "application/geo+json",
         "Accept-Encoding": "gzip, deflate, br"
     }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=headers, timeout=30.0, follow_redirects=True)
-            print(f"[weather_adapter] Response status: {response.status_code}")
-            response.raise_for_status()
-            
-            # Get the raw text first to debug any JSON parsing issues
-            text_content = response.text
-            if not text_content.strip():
-                print("[weather_adapter] Error: Empty response received")
-                return None
-                
-            try:
-                json_data = response.json()
-                return json_data
-            except json.JSONDecodeError as json_err:
-                print(f"[weather_adapter] JSON parsing error: {json_err}")
-                print(f"[weather_adapter] Response content: {text_content[:200]}...")
-                return None
-                
-        except httpx.HTTPStatusError as http_err:
-            print(f"[weather_adapter] HTTP error: {http_err} (Status code: {http_err.response.status_code})")
-            return None
-        except httpx.RequestError as req_err:
-            print(f"[weather_adapter] Request error: {req_err}")
+    client = get_http_client()
+    try:
+        response = await client.get(url, headers=headers)
+        logger.debug("Response status: %s", response.status_code)
+        response.raise_for_status()
+        
+        # Get the raw text first to debug any JSON parsing issues
+        text_content = response.text
+        if not text_content.strip():
+            logger.error("Empty response received")
             return None
-        except Exception as e:
-            print(f"[weather_adapter] Unexpected exception: {e}")
+            
+        try:
+            json_data = response.json()
+            return json_data
+        except json.JSONDecodeError as json_err:
+            logger.error(f"JSON parsing error: {json_err}")
+            logger.error(f"Response content: {text_content[:200]}...")
             return None
+            
+    except httpx.HTTPStatusError as http_err:
+        logger.error(f"HTTP error: {http_err} (Status code: {http_err.response.status_code})")
+        return None
+    except httpx.RequestError as req_err:
+        logger.error(f"Request error: {req_err}")
+        return None
+    except Exception as e:
+        logger.error(f"Unexpected exception: {e}")
+        return None
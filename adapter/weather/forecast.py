@@ -17,7 +17,7 @@ async def fetch_forecast_from_api(latitude: float, longitude: float) -> dict:
     """
     # First, get the forecast URL for this location
     points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-    points_data = await make_nws_request(points_url)
+    points_data = await make_nws_request(points_url, operation="points")
     
     if not points_data or "properties" not in points_data:
         return None
@@ -28,4 +28,4 @@ async def fetch_forecast_from_api(latitude: float, longitude: float) -> dict:
         return None
     
     # Now fetch the actual forecast
-    return await make_nws_request(forecast_url)
+    return await make_nws_request(forecast_url, operation="forecast")
@@ -0,0 +1 @@
+"""End-to-end benchmarks for the stdio and HTTP transports."""
@@ -0,0 +1,237 @@
+"""
+Local stand-ins for Google Calendar, Google Directory and api.weather.gov.
+
+install() swaps them into the adapters of the current process, so every tool
+runs its real code path without network access or credentials. Google calls
+block for the configured latency, like the real client's .execute(); NWS calls
+wait asynchronously, like httpx.
+"""
+
+import asyncio
+import copy
+import datetime
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+import httplib2
+import httpx
+from googleapiclient.errors import HttpError
+
+class _Request:
+    """Mimics a googleapiclient HttpRequest: the call happens in execute()."""
+
+    def __init__(self, latency, fn):
+        self._latency = latency
+        self._fn = fn
+        self.headers = {}
+
+    def execute(self, **kwargs):
+        time.sleep(self._latency)
+        return self._fn()
+
+class FakeEvents:
+    """In-memory implementation of the Calendar v3 events collection."""
+
+    def __init__(self, latency, seed_events=50):
+        self.latency = latency
+        self._events = {}
+        self._changes = {}  # event id -> change sequence number, for syncToken
+        self._sequence = 0
+        self._lock = threading.RLock()
+        now = datetime.datetime.now(datetime.timezone.utc)
+        for i in range(seed_events):
+            start = now + datetime.timedelta(hours=i + 1)
+            self._store({
+                "id": f"seed{i}",
+                "summary": f"Seed meeting {i}",
+                "description": "Weekly sync with the team " * 4,
+                "location": "Room 101",
+                "start": {"dateTime": start.isoformat()},
+                "end": {"dateTime": (start + datetime.timedelta(minutes=30)).isoformat()},
+                "attendees": [{"email": f"person{j}@example.com", "responseStatus": "needsAction"} for j in range(5)],
+            })
+
+    def _store(self, body):
+        event = copy.deepcopy(body)
+        event.setdefault("id", uuid.uuid4().hex)
+        event["htmlLink"] = f"https://calendar.example.com/event?eid={event['id']}"
+        event["etag"] = f'"{time.time_ns()}"'
+        event["status"] = "confirmed"
+        with self._lock:
+            self._events[event["id"]] = event
+            self._sequence += 1
+            self._changes[event["id"]] = self._sequence
+        return copy.deepcopy(event)
+
+    def _get(self, eventId):
+        with self._lock:
+            event = self._events.get(eventId)
+        if event is None:
+            raise LookupError(f"Event {eventId} not found")
+        return copy.deepcopy(event)
+
+    def _patch(self, eventId, body, etag=None):
+        with self._lock:
+            current = self._get(eventId)
+            if etag is not None and etag != current["etag"]:
+                raise HttpError(httplib2.Response({"status": 412}), b'{"error": {"message": "Precondition Failed"}}')
+            return self._store({**current, **body})
+
+    def _delete(self, eventId):
+        with self._lock:
+            self._events.pop(eventId, None)
+            self._sequence += 1
+            self._changes[eventId] = self._sequence
+        return ""
+
+    def _list(self, q=None, maxResults=250, syncToken=None, **kwargs):
+        with self._lock:
+            sync_token = str(self._sequence)
+            if syncToken is not None:
+                # Only what changed since the token; deleted events come back cancelled
+                since = int(syncToken)
+                changed = [event_id for event_id, seq in self._changes.items() if seq > since]
+                events = [copy.deepcopy(self._events.get(event_id) or {"id": event_id, "status": "cancelled"})
+                          for event_id in changed]
+                return {"kind": "calendar#events", "items": events, "nextSyncToken": sync_token}
+            events = [copy.deepcopy(e) for e in self._events.values()]
+        if q:
+            events = [e for e in events if q.lower() in (e.get("summary", "") + e.get("description", "")).lower()]
+        events.sort(key=lambda e: e["start"].get("dateTime", e["start"].get("date", "")))
+        return {"kind": "calendar#events", "items": events[:maxResults], "nextSyncToken": sync_token}
+
+    def insert(self, calendarId, body, **kwargs):
+        return _Request(self.latency, lambda: self._store(body))
+
+    def get(self, calendarId, eventId, **kwargs):
+        return _Request(self.latency, lambda: self._get(eventId))
+
+    def update(self, calendarId, eventId, body, **kwargs):
+        return _Request(self.latency, lambda: self._store(dict(body, id=eventId)))
+
+    def patch(self, calendarId, eventId, body, **kwargs):
+        request = _Request(self.latency, None)
+        request._fn = lambda: self._patch(eventId, body, request.headers.get("If-Match"))
+        return request
+
+    def delete(self, calendarId, eventId, **kwargs):
+        return _Request(self.latency, lambda: self._delete(eventId))
+
+    def list(self, calendarId, **kwargs):
+        return _Request(self.latency, lambda: self._list(**kwargs))
+
+class FakeCalendarService:
+    def __init__(self, latency):
+        self._events = FakeEvents(latency)
+
+    def events(self):
+        return self._events
+
+class FakeUsers:
+    """Directory users collection with a fixed set of people."""
+
+    def __init__(self, latency, count=100):
+        self.latency = latency
+        self._users = [
+            {"primaryEmail": f"user{i}@example.com", "name": {"fullName": f"User Number{i}"}}
+            for i in range(count)
+        ]
+
+    def _get(self, userKey):
+        for user in self._users:
+            if user["primaryEmail"] == userKey:
+                return user
+        raise LookupError(f"User {userKey} not found")
+
+    def _list(self, query=None, maxResults=100, **kwargs):
+        users = self._users
+        if query:
+            term = query.split(":", 1)[-1].split("*", 1)[0].lower()
+            users = [u for u in users if term in u["name"]["fullName"].lower() or term in u["primaryEmail"]]
+        return {"users": users[:maxResults]}
+
+    def get(self, userKey, **kwargs):
+        return _Request(self.latency, lambda: self._get(userKey))
+
+    def list(self, **kwargs):
+        return _Request(self.latency, lambda: self._list(**kwargs))
+
+class FakeDirectoryService:
+    def __init__(self, latency):
+        self._users = FakeUsers(latency)
+
+    def users(self):
+        return self._users
+
+def nws_transport(latency):
+    """httpx transport answering the NWS endpoints the weather adapter uses."""
+    alert = {
+        "properties": {
+            "event": "Winter Storm Warning",
+            "areaDesc": "Northern Mountains",
+            "severity": "Severe",
+            "description": "Heavy snow expected. " * 40,
+            "instruction": "Avoid travel. " * 10,
+        }
+    }
+    periods = [
+        {"name": f"Period {i}", "temperature": 50 + i, "temperatureUnit": "F",
+         "windSpeed": "10 mph", "windDirection": "NW", "detailedForecast": "Partly cloudy. " * 5}
+        for i in range(14)
+    ]
+
+    async def handler(request):
+        await asyncio.sleep(latency)
+        path = request.url.path
+        if path.startswith("/alerts"):
+            return httpx.Response(200, json={"features": [alert] * 10})
+        if path.startswith("/points"):
+            return httpx.Response(200, json={"properties": {"forecast": "https://api.weather.gov/gridpoints/TOP/31,80/forecast"}})
+        if path.endswith("/forecast"):
+            return httpx.Response(200, json={"properties": {"periods": periods}})
+        return httpx.Response(404, json={})
+
+    return httpx.MockTransport(handler)
+
+def install(latency=0.02, state_dir=None):
+    """
+    Point the adapters of this process at the fakes.
+
+    Args:
+        latency: Seconds each upstream call takes
+        state_dir: Directory for the contacts, aliases and idempotency files
+            (a fresh temporary directory by default)
+
+    Returns:
+        The state directory in use
+    """
+    from adapter.calendar import auth as calendar_auth
+    from adapter.calendar import mirror
+    from adapter.contacts import directory_api, fallback, resolution
+    from adapter.weather import client as weather_client
+    from middleware.idempotency import store as idempotency_store
+
+    state_dir = state_dir or tempfile.mkdtemp(prefix="mcp-bench-")
+    os.makedirs(state_dir, exist_ok=True)
+    fallback.FALLBACK_CONTACTS_PATH = os.path.join(state_dir, "fallback-contacts.json")
+    resolution.NAME_ALIASES_PATH = os.path.join(state_dir, "name-aliases.json")
+    idempotency_store.path = os.path.join(state_dir, "idempotency-keys.json")
+    mirror.MIRROR_PATH = os.path.join(state_dir, "calendar-mirror.json")
+
+    calendar_auth._service = FakeCalendarService(latency)
+    directory_api._service = FakeDirectoryService(latency)
+
+    transport = nws_transport(latency)
+    clients = {}
+
+    def get_http_client():
+        loop = asyncio.get_running_loop()
+        if loop not in clients:
+            clients[loop] = httpx.AsyncClient(transport=transport)
+        return clients[loop]
+
+    weather_client.get_http_client = get_http_client
+    return state_dir
@@ -0,0 +1,362 @@
+"""
+Benchmark every tool over stdio and HTTP /rpc against local fakes.
+
+The HTTP server runs in this process (uvicorn on a free local port); the stdio
+server is spawned as a subprocess and driven over its pipes with concurrent
+JSON-RPC requests. Both use the fakes in benchmarks/fakes.py, so results do not
+depend on Google or NWS.
+
+For each transport and concurrency level, every tool is called
+--requests times with that many calls in flight. The report has p50/p95/p99
+latency, throughput and response size per tool, and is written as JSON so runs
+from different commits can be compared (--compare).
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --concurrency 1,8,32 --requests 200 --output before.json
+    python -m benchmarks.run --output after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import itertools
+import json
+import logging
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Admission limits would measure the rate limiter instead of the transport
+BENCH_ENV = {
+    "MCP_RATE_LIMIT": "1000000",
+    "MCP_RATE_BURST": "1000000",
+    "MCP_UPSTREAM_RATE_LIMITS": json.dumps({
+        name: {"rate": 1000000, "burst": 1000000} for name in ("google_calendar", "google_directory", "nws")
+    }),
+    "MCP_WARMUP": "0",
+}
+
+TOKEN = "bench-token"
+
+_counter = itertools.count()
+
+def _unique():
+    return next(_counter)
+
+# (tool, arguments or a function returning fresh arguments), in run order.
+# Contact writes come before delete_contact so there is always a contact to delete.
+WORKLOAD = [
+    ("get_weather_alerts", {"state": "CO"}),
+    ("get_weather_forecast", {"latitude": 39.74, "longitude": -104.99}),
+    ("add_calendar_event", lambda: {
+        "summary": f"Bench event {_unique()}",
+        "start_time": "2030-01-01T10:00:00-05:00",
+        "end_time": "2030-01-01T11:00:00-05:00",
+        "attendees": ["user1@example.com", "user2@example.com"],
+    }),
+    ("smart_add_calendar_event", lambda: {
+        "summary": f"Bench smart event {_unique()}",
+        "start_time": "2030-01-02T10:00:00-05:00",
+        "end_time": "2030-01-02T11:00:00-05:00",
+        "attendee_names": ["User Number3"],
+    }),
+    ("list_calendar_events", {"max_results": 25}),
+    ("update_calendar_event", lambda: {"event_id": "seed0", "description": f"Updated {_unique()}"}),
+    ("find_and_update_calendar_event", lambda: {"title": "Seed meeting 1", "new_description": f"Updated {_unique()}"}),
+    ("find_and_delete_calendar_event", {"title": "Bench event"}),
+    ("delete_calendar_event", {"event_id": "does-not-exist"}),
+    ("current_time", {}),
+    ("current_date", {}),
+    ("current_timezone", {}),
+    ("search_contact", {"name": "User Number1"}),
+    ("select_contact_from_results", {
+        "contact_id": 1,
+        "search_results": {"success": True, "contacts": [{"id": 1, "name": "User Number1", "email": "user1@example.com"}]},
+    }),
+    ("create_name_alias", lambda: {"alias": f"bench alias {_unique()}", "email": "user1@example.com"}),
+    ("list_name_aliases", {}),
+    ("add_new_contact", lambda: {"name": f"Bench Person {_unique()}", "email": f"bench{_unique()}@example.com"}),
+    ("edit_contact", lambda: {"contact_id": 0, "new_name": f"Edited {_unique()}"}),
+    ("list_contacts", {}),
+    ("delete_contact", {"contact_id": 0}),
+    ("hello_world", {"name": "bench"}),
+    ("get_version", {}),
+    ("system_info", {}),
+]
+
+def _arguments(spec):
+    return spec() if callable(spec) else spec
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def summarize(latencies, sizes, errors, elapsed):
+    """Summary statistics for one batch of calls (latencies in seconds)."""
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed > 0 else None,
+        "mean_bytes": round(sum(sizes) / len(sizes), 1),
+    }
+
+class StdioClient:
+    """Concurrent JSON-RPC client for a stdio server subprocess."""
+
+    def __init__(self, proc):
+        self.proc = proc
+        self.pending = {}
+        self.ids = itertools.count(1)
+        self.reader = asyncio.create_task(self._read())
+
+    @classmethod
+    async def start(cls, latency, state_dir):
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "benchmarks.stdio_server", str(latency), state_dir,
+            cwd=ROOT,
+            env={**os.environ, **BENCH_ENV},
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            limit=1 << 26,
+        )
+        client = cls(proc)
+        await client.request("initialize", {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {},
+            "clientInfo": {"name": "benchmark", "version": "1.0"},
+        })
+        client.send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        return client
+
+    async def _read(self):
+        while True:
+            line = await self.proc.stdout.readline()
+            if not line:
+                break
+            try:
+                message = json.loads(line)
+            except ValueError:
+                # Stray output from adapters is not part of the protocol
+                continue
+            future = self.pending.pop(message.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result((message, len(line)))
+        for future in self.pending.values():
+            future.set_exception(RuntimeError("stdio server exited"))
+
+    def send(self, message):
+        self.proc.stdin.write(json.dumps(message).encode("utf-8") + b"\n")
+
+    async def request(self, method, params):
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        await self.proc.stdin.drain()
+        return await future
+
+    async def call(self, tool, arguments):
+        message, size = await self.request("tools/call", {"name": tool, "arguments": arguments})
+        failed = "error" in message or message.get("result", {}).get("isError", False)
+        return failed, size
+
+    async def close(self):
+        self.proc.stdin.close()
+        await self.proc.wait()
+        self.reader.cancel()
+
+class HttpClient:
+    """Client for the in-process HTTP server's /rpc endpoint."""
+
+    def __init__(self, base_url, max_connections):
+        import httpx
+        self.ids = itertools.count(1)
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Authorization": f"Bearer {TOKEN}"},
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=60,
+        )
+
+    async def call(self, tool, arguments):
+        response = await self.client.post("/rpc", json={
+            "jsonrpc": "2.0", "id": next(self.ids), "method": "tools/call",
+            "params": {"name": tool, "arguments": arguments},
+        })
+        failed = response.status_code != 200 or "error" in response.json()
+        return failed, len(response.content)
+
+    async def close(self):
+        await self.client.aclose()
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@contextlib.asynccontextmanager
+async def http_server(latency, state_dir):
+    """Run the HTTP transport in this process against the fakes."""
+    import uvicorn
+
+    import server
+    from benchmarks import fakes
+    from transport.auth import TokenTable
+
+    # Per-call log lines would be part of what is measured
+    logging.getLogger().setLevel(logging.WARNING)
+    fakes.install(latency=latency, state_dir=state_dir)
+    tokens = TokenTable()
+    tokens.add("bench", ["*"], token=TOKEN)
+    app = server.create_http_app(server.create_mcp_server(), tokens=tokens)
+    port = _free_port()
+    uvicorn_server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.create_task(uvicorn_server.serve())
+    while not uvicorn_server.started:
+        await asyncio.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        uvicorn_server.should_exit = True
+        await task
+
+async def run_tool(client, tool, spec, requests, concurrency):
+    """Call one tool `requests` times with `concurrency` calls in flight."""
+    latencies, sizes = [], []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            failed, size = await client.call(tool, _arguments(spec))
+            latencies.append(time.perf_counter() - start)
+            sizes.append(size)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, sizes, errors, time.perf_counter() - start)
+
+async def run_transport(client, levels, requests, progress):
+    results = {}
+    for concurrency in levels:
+        per_tool = {}
+        total_start = time.perf_counter()
+        for tool, spec in WORKLOAD:
+            per_tool[tool] = await run_tool(client, tool, spec, requests, concurrency)
+            progress(f"  c={concurrency:<3} {tool:<32} p50 {per_tool[tool]['p50_ms']:>8.2f} ms  "
+                     f"p99 {per_tool[tool]['p99_ms']:>8.2f} ms  {per_tool[tool]['throughput_rps']} rps")
+        elapsed = time.perf_counter() - total_start
+        calls = sum(r["calls"] for r in per_tool.values())
+        results[str(concurrency)] = {
+            "throughput_rps": round(calls / elapsed, 1),
+            "errors": sum(r["errors"] for r in per_tool.values()),
+            "tools": per_tool,
+        }
+    return results
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run(args, progress):
+    levels = [int(c) for c in args.concurrency.split(",")]
+    report = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "concurrency": levels,
+            "requests_per_tool": args.requests,
+            "upstream_latency_ms": args.upstream_latency,
+            "result_cache": args.cache,
+        },
+        "transports": {},
+    }
+    latency = args.upstream_latency / 1000
+    transports = args.transports.split(",")
+
+    if "stdio" in transports:
+        progress("stdio")
+        client = await StdioClient.start(latency, tempfile.mkdtemp(prefix="mcp-bench-stdio-"))
+        try:
+            report["transports"]["stdio"] = await run_transport(client, levels, args.requests, progress)
+        finally:
+            await client.close()
+
+    if "http" in transports:
+        progress("http /rpc")
+        async with http_server(latency, tempfile.mkdtemp(prefix="mcp-bench-http-")) as base_url:
+            client = HttpClient(base_url, max(levels))
+            try:
+                report["transports"]["http"] = await run_transport(client, levels, args.requests, progress)
+            finally:
+                await client.close()
+    return report
+
+def compare(report, baseline, progress):
+    """Print p50/p99 changes per transport, level and tool against a baseline report."""
+    for transport, levels in report["transports"].items():
+        for level, result in levels.items():
+            base = baseline.get("transports", {}).get(transport, {}).get(level)
+            if not base:
+                continue
+            progress(f"{transport} c={level}: {base['throughput_rps']} -> {result['throughput_rps']} rps")
+            for tool, stats in result["tools"].items():
+                old = base["tools"].get(tool)
+                if old:
+                    progress(f"  {tool:<32} p50 {old['p50_ms']:>8.2f} -> {stats['p50_ms']:>8.2f} ms  "
+                             f"p99 {old['p99_ms']:>8.2f} -> {stats['p99_ms']:>8.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MCP tools over stdio and HTTP against local fakes")
+    parser.add_argument("--transports", default="stdio,http", help="Comma-separated transports to run")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=50, help="Calls per tool at each concurrency level")
+    parser.add_argument("--upstream-latency", type=float, default=20, help="Latency of each fake upstream call in ms")
+    parser.add_argument("--cache", action="store_true", help="Keep the tool result cache enabled")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results.json"), help="Where to write the JSON report")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    # Settings are read at import time, in this process and in the stdio server
+    if not args.cache:
+        BENCH_ENV["MCP_CACHE_MAX_ENTRIES"] = "0"
+    os.environ.update(BENCH_ENV)
+    sys.path.insert(0, ROOT)
+
+    def progress(line):
+        print(line, file=sys.stderr, flush=True)
+
+    # Adapters print to stdout; keep it for the report path only
+    with contextlib.redirect_stdout(sys.stderr if os.environ.get("MCP_BENCH_VERBOSE") else open(os.devnull, "w")):
+        report = asyncio.run(run(args, progress))
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    progress(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f), progress)
+
+if __name__ == "__main__":
+    main()
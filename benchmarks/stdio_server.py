@@ -0,0 +1,24 @@
+"""
+stdio server wired to the fakes, spawned by the benchmark runner.
+
+Usage: python -m benchmarks.stdio_server <latency seconds> <state dir>
+"""
+
+import logging
+import sys
+
+from benchmarks import fakes
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.02
+    state_dir = sys.argv[2] if len(sys.argv) > 2 else None
+
+    import server
+
+    # Per-call log lines would be part of what is measured
+    logging.getLogger().setLevel(logging.WARNING)
+    fakes.install(latency=latency, state_dir=state_dir)
+    server.create_mcp_server().run(transport="stdio")
+
+if __name__ == "__main__":
+    main()
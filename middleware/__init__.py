@@ -0,0 +1,9 @@
+"""Wrappers applied around every tool call, whichever transport invoked it."""
+
+from middleware.pipeline import tool_registrar, wrap_stream
+from middleware.instrumentation import instrument
+from middleware.admission import admission
+from middleware.singleflight import singleflight
+from middleware.idempotency import idempotency
+from middleware.result_cache import invalidate, result_cache
+from middleware.errors import AdmissionRejected, IdempotencyConflict
@@ -0,0 +1,233 @@
+"""
+Token-bucket admission control for tool calls.
+
+Every call takes a token from the bucket of the API token that made it (the
+stdio client counts as one caller) and from the bucket of each upstream API the
+tool uses. When a bucket is empty the call waits its turn, up to a bounded
+number of queued calls per bucket; beyond that it fails immediately with
+AdmissionRejected, which carries how long the caller should wait before
+retrying.
+
+A tool that makes many upstream requests per call (the bulk calendar tools)
+declares a "cost" option: a function of the call's arguments giving the
+number of upstream requests, which is charged to its upstream buckets
+instead of one token.
+
+Limits come from the environment:
+- MCP_RATE_LIMIT / MCP_RATE_BURST: calls per second and burst per API token
+- MCP_UPSTREAM_RATE_LIMITS: JSON overriding upstream limits, e.g.
+  {"google_calendar": {"rate": 5, "burst": 10}}
+- MCP_ADMISSION_QUEUE: calls allowed to wait per bucket
+"""
+
+import asyncio
+import functools
+import json
+import os
+import time
+
+from adapter.common.metrics import REGISTRY
+from middleware.base import call_tool, caller_name
+from middleware.errors import AdmissionRejected
+
+# Per API token
+TOKEN_RATE = float(os.environ.get("MCP_RATE_LIMIT", "10"))
+TOKEN_BURST = float(os.environ.get("MCP_RATE_BURST", "20"))
+
+# Per upstream, shared by all callers; kept below the Google per-user quotas
+UPSTREAM_LIMITS = {
+    "google_calendar": {"rate": 10.0, "burst": 20.0},
+    "google_directory": {"rate": 5.0, "burst": 10.0},
+    "nws": {"rate": 5.0, "burst": 10.0},
+}
+UPSTREAM_LIMITS.update(json.loads(os.environ.get("MCP_UPSTREAM_RATE_LIMITS", "{}")))
+
+MAX_QUEUE = int(os.environ.get("MCP_ADMISSION_QUEUE", "32"))
+
+ADMITTED = REGISTRY.counter("mcp_admission_admitted_total", "Calls admitted by a bucket", ["kind", "key"])
+REJECTED = REGISTRY.counter("mcp_admission_rejected_total", "Calls rejected because a bucket's queue was full", ["kind", "key"])
+QUEUED = REGISTRY.gauge("mcp_admission_queued", "Calls waiting for a bucket token", ["kind", "key"])
+AVAILABLE = REGISTRY.gauge("mcp_admission_tokens", "Tokens available in a bucket when last used", ["kind", "key"])
+
+class TokenBucket:
+    """
+    Token bucket with a bounded wait queue.
+
+    Waiting calls reserve a token up front (the balance goes negative), so
+    they are admitted in arrival order and the queue length is the deficit.
+    """
+
+    def __init__(self, kind, key, rate, burst, max_queue=MAX_QUEUE):
+        self.kind = kind
+        self.key = key
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_queue = max_queue
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _capped(self, tokens):
+        return min(tokens, max(self.burst, 1))
+
+    def reserve(self, tokens=1):
+        """
+        Take tokens, queueing behind earlier reservations if necessary.
+
+        A request for more than the burst is charged the burst, so it can
+        still be admitted once the bucket is full.
+
+        Args:
+            tokens: Number of tokens the call costs
+
+        Returns:
+            Seconds to wait before the call may proceed (0 if admitted now)
+
+        Raises:
+            AdmissionRejected: If the queue is full
+        """
+        self._refill()
+        tokens = self._capped(tokens)
+        deficit = tokens - self.tokens
+        if deficit > self.max_queue:
+            REJECTED.inc(kind=self.kind, key=self.key)
+            raise AdmissionRejected(self.kind, self.key, (deficit - self.max_queue) / self.rate)
+        self.tokens -= tokens
+        ADMITTED.inc(kind=self.kind, key=self.key)
+        AVAILABLE.set(max(self.tokens, 0), kind=self.kind, key=self.key)
+        return max(deficit, 0) / self.rate
+
+    def release(self, tokens=1):
+        """Return reserved tokens whose call never ran."""
+        self.tokens = min(self.burst, self.tokens + self._capped(tokens))
+
+    async def acquire(self, tokens=1):
+        """Reserve tokens and wait until they are due."""
+        delay = self.reserve(tokens)
+        if delay <= 0:
+            return
+        QUEUED.inc(kind=self.kind, key=self.key)
+        try:
+            await asyncio.sleep(delay)
+        except BaseException:
+            self.release(tokens)
+            raise
+        finally:
+            QUEUED.dec(kind=self.kind, key=self.key)
+
+_buckets = {}
+
+def get_bucket(kind, key):
+    """
+    Get the bucket for an API token ("token") or upstream ("upstream").
+
+    Args:
+        kind: "token" or "upstream"
+        key: Token name or upstream name
+
+    Returns:
+        TokenBucket, or None if the upstream has no configured limit
+    """
+    bucket = _buckets.get((kind, key))
+    if bucket is None:
+        if kind == "token":
+            rate, burst = TOKEN_RATE, TOKEN_BURST
+        else:
+            limit = UPSTREAM_LIMITS.get(key)
+            if not limit:
+                return None
+            rate, burst = limit["rate"], limit.get("burst", limit["rate"])
+        bucket = _buckets[(kind, key)] = TokenBucket(kind, key, rate, burst)
+    return bucket
+
+def _upstreams(options):
+    upstreams = options.get("upstream") or ()
+    if isinstance(upstreams, str):
+        upstreams = (upstreams,)
+    return upstreams
+
+async def admit(upstreams=(), cost=1):
+    """
+    Take a token for the current caller and cost tokens for each upstream,
+    waiting if needed.
+
+    Args:
+        upstreams: Names of the upstream APIs the call uses
+        cost: Number of upstream requests the call makes
+
+    Raises:
+        AdmissionRejected: If a bucket's queue is full; tokens already taken
+            for the call are handed back
+    """
+    charges = [(get_bucket("token", caller_name()), 1)] + [(get_bucket("upstream", u), cost) for u in upstreams]
+    acquired = []
+    try:
+        for bucket, tokens in charges:
+            if bucket is None:
+                continue
+            await bucket.acquire(tokens)
+            acquired.append((bucket, tokens))
+    except AdmissionRejected:
+        # The call will not run, so hand back what it already took
+        for bucket, tokens in acquired:
+            bucket.release(tokens)
+        raise
+
+def _cost(options, args, kwargs):
+    cost = options.get("cost")
+    if cost is None:
+        return 1
+    try:
+        return max(int(cost(*args, **kwargs)), 1)
+    except (TypeError, ValueError):
+        # Invalid arguments are reported by the tool itself
+        return 1
+
+def admission(name, fn, options):
+    """
+    Admit a tool's calls through the caller's and its upstreams' buckets.
+
+    Args:
+        name: Tool name
+        fn: Tool function
+        options: Tool options; "upstream" names the upstream API (or a tuple
+            of them) the tool calls, and "cost" optionally maps the call's
+            arguments to its number of upstream requests
+
+    Returns:
+        Async wrapper around fn
+    """
+    upstreams = _upstreams(options)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        await admit(upstreams, _cost(options, args, kwargs))
+        return await call_tool(fn, *args, **kwargs)
+
+    return wrapper
+
+def admission_stream(name, stream, options):
+    """
+    Admit a streamed tool call like a regular one, before its first item.
+
+    Args:
+        name: Tool name
+        stream: Async generator function yielding the tool's result items
+        options: Tool options, as for admission()
+
+    Returns:
+        Async generator function wrapping stream
+    """
+    upstreams = _upstreams(options)
+
+    @functools.wraps(stream)
+    async def wrapper(*args, **kwargs):
+        await admit(upstreams, _cost(options, args, kwargs))
+        async for item in stream(*args, **kwargs):
+            yield item
+
+    return wrapper
@@ -0,0 +1,38 @@
+"""Helpers shared by tool call layers."""
+
+import inspect
+
+from transport.auth import current_principal
+
+def caller_name():
+    """Name of the API token making the current call ("stdio" for the stdio transport)."""
+    principal = current_principal.get()
+    return principal.name if principal is not None else "stdio"
+
+async def call_tool(fn, *args, **kwargs):
+    """Call a sync or async tool function and return its result."""
+    result = fn(*args, **kwargs)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+# Write counter per tag, bumped by result_cache.invalidate()
+_generations = {}
+
+def tag_generations(tags):
+    """
+    Current write generation of each tag.
+
+    Two snapshots differ if a write to one of the tags happened in between.
+
+    Args:
+        tags: Tags such as "calendar" or "contacts"
+
+    Returns:
+        Tuple of generation numbers, in the order of tags
+    """
+    return tuple(_generations.get(tag, 0) for tag in tags)
+
+def bump_generation(tag):
+    """Record a write to tag."""
+    _generations[tag] = _generations.get(tag, 0) + 1
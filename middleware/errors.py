@@ -0,0 +1,13 @@
+"""Errors raised by tool call layers; the transports map them onto their own error formats."""
+
+class AdmissionRejected(Exception):
+    """Raised when a call cannot be admitted; retry_after is in seconds."""
+
+    def __init__(self, kind, key, retry_after):
+        super().__init__(f"Rate limit exceeded for {kind} '{key}', retry after {retry_after:.1f}s")
+        self.kind = kind
+        self.key = key
+        self.retry_after = retry_after
+
+class IdempotencyConflict(ValueError):
+    """Raised when an idempotency key is reused with different arguments."""
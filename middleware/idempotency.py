@@ -0,0 +1,260 @@
+"""
+Idempotency keys for tools that create, update or delete.
+
+Tools registered with ``idempotent=True`` accept an optional
+``idempotency_key`` argument. The first successful call with a key stores its
+result; a retry with the same key returns the stored result without calling
+the tool again. Reusing a key with different arguments is rejected with
+IdempotencyConflict.
+
+Results are kept in a bounded JSON file in the secrets directory, shared by
+all server processes, and expire after MCP_IDEMPOTENCY_TTL seconds.
+
+Before calling the tool, a call claims its key by writing a pending marker
+under the file lock. A retry that lands on another worker while the first
+call is still running waits for its result (up to MCP_IDEMPOTENCY_WAIT
+seconds, then it is rejected) instead of repeating the change. A marker left
+by a worker that died is taken over after MCP_IDEMPOTENCY_PENDING_TTL seconds.
+"""
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+import os
+import json
+import time
+import weakref
+from typing import Annotated, Optional
+
+from pydantic import Field
+
+from adapter.common.executor import run_blocking
+from adapter.common.metrics import REGISTRY
+from adapter.common.shared_file import atomic_write_json, file_lock, file_signature
+from middleware.base import call_tool, caller_name
+from middleware.errors import IdempotencyConflict
+from middleware.instrumentation import is_error_result
+from middleware.singleflight import call_key
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_PATH = os.path.join(os.path.dirname(__file__), "../secrets/idempotency-keys.json")
+IDEMPOTENCY_TTL = float(os.environ.get("MCP_IDEMPOTENCY_TTL", str(24 * 3600)))
+IDEMPOTENCY_MAX_KEYS = int(os.environ.get("MCP_IDEMPOTENCY_MAX_KEYS", "1000"))
+IDEMPOTENCY_PENDING_TTL = float(os.environ.get("MCP_IDEMPOTENCY_PENDING_TTL", "300"))
+IDEMPOTENCY_WAIT = float(os.environ.get("MCP_IDEMPOTENCY_WAIT", "30"))
+POLL_INTERVAL = 0.1  # Seconds between checks of a key another worker is running
+
+# Thread pool the store's file I/O runs on
+STORE_POOL = "idempotency"
+
+REPLAYS = REGISTRY.counter("mcp_idempotency_replays_total", "Calls answered from a stored idempotent result", ["tool"])
+WAITS = REGISTRY.counter("mcp_idempotency_waits_total", "Calls that waited for the same key running in another worker", ["tool"])
+
+KEY_ANNOTATION = Annotated[
+    Optional[str],
+    Field(description="Optional client-chosen key; retries with the same key return the first result instead of repeating the change"),
+]
+
+class IdempotencyStore:
+    """
+    Bounded store of recent results, kept in a JSON file shared between processes.
+
+    Entries are {"fingerprint", "created", "result"}, or {"fingerprint",
+    "created", "pending": True} while the call that claimed the key runs.
+    Methods do blocking file I/O; the idempotency layer calls them on a
+    worker thread.
+    """
+
+    def __init__(self, path=IDEMPOTENCY_PATH, ttl=IDEMPOTENCY_TTL, max_keys=IDEMPOTENCY_MAX_KEYS,
+                 pending_ttl=IDEMPOTENCY_PENDING_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.pending_ttl = pending_ttl
+        self._entries = {}
+        self._signature = None
+
+    def _load(self):
+        signature = file_signature(self.path)
+        if signature == self._signature:
+            return
+        entries = {}
+        if signature is not None:
+            try:
+                with open(self.path, 'r') as f:
+                    entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable idempotency store {self.path}: {e}")
+        self._entries = entries if isinstance(entries, dict) else {}
+        self._signature = signature
+
+    def _live(self, entry, now):
+        if entry is None:
+            return False
+        ttl = self.pending_ttl if entry.get("pending") else self.ttl
+        return entry["created"] + ttl >= now
+
+    def _write(self, entries):
+        # Called with the file lock held
+        now = time.time()
+        entries = {k: v for k, v in entries.items() if self._live(v, now)}
+        if len(entries) > self.max_keys:
+            newest = sorted(entries.items(), key=lambda item: item[1]["created"])[-self.max_keys:]
+            entries = dict(newest)
+        atomic_write_json(self.path, entries)
+        self._entries = entries
+        self._signature = file_signature(self.path)
+
+    def get(self, key):
+        """
+        Look up an unexpired entry.
+
+        Args:
+            key: Store key
+
+        Returns:
+            Entry dict with "fingerprint" and "result" (or "pending"), or None
+        """
+        self._load()
+        entry = self._entries.get(key)
+        return entry if self._live(entry, time.time()) else None
+
+    def claim(self, key, fingerprint):
+        """
+        Claim a key for a call about to run, unless it is already taken.
+
+        Args:
+            key: Store key
+            fingerprint: Fingerprint of the call's tool and arguments
+
+        Returns:
+            None if the key was claimed, otherwise the existing entry (a
+            stored result or another call's pending marker)
+        """
+        with file_lock(self.path):
+            self._load()
+            entry = self._entries.get(key)
+            if self._live(entry, time.time()):
+                return entry
+            entries = dict(self._entries)
+            entries[key] = {"fingerprint": fingerprint, "created": time.time(), "pending": True}
+            self._write(entries)
+            return None
+
+    def release(self, key):
+        """Drop a pending claim whose call failed, so a retry can run it."""
+        with file_lock(self.path):
+            self._load()
+            if not (self._entries.get(key) or {}).get("pending"):
+                return
+            entries = dict(self._entries)
+            del entries[key]
+            self._write(entries)
+
+    def put(self, key, fingerprint, result):
+        """
+        Store a result, dropping expired entries and the oldest beyond max_keys.
+
+        Args:
+            key: Store key
+            fingerprint: Fingerprint of the call's tool and arguments
+            result: JSON-serializable tool result
+        """
+        with file_lock(self.path):
+            self._load()
+            entries = dict(self._entries)
+            entries[key] = {"fingerprint": fingerprint, "result": result, "created": time.time()}
+            self._write(entries)
+
+store = IdempotencyStore()
+
+def call_fingerprint(name, args, kwargs):
+    """Fingerprint of a tool call's name and normalized arguments."""
+    return hashlib.sha256("\0".join(call_key(name, args, kwargs)).encode("utf-8")).hexdigest()
+
+async def _release(key):
+    try:
+        await run_blocking(STORE_POOL, store.release, key)
+    except OSError as e:
+        # The claim expires after IDEMPOTENCY_PENDING_TTL anyway
+        logger.warning(f"Could not release idempotency key {key}: {e}")
+
+def idempotency(name, fn, options):
+    """
+    Add an optional idempotency_key argument to a tool.
+
+    Args:
+        name: Tool name
+        fn: Tool function
+        options: Tool options; applies when "idempotent" is true
+
+    Returns:
+        fn unchanged for other tools, otherwise an async wrapper whose
+        signature has the extra idempotency_key parameter
+    """
+    if not options.get("idempotent"):
+        return fn
+
+    # Calls with the same key in this process run one at a time; a lock goes
+    # away once no call holds or waits for it
+    locks = weakref.WeakValueDictionary()
+
+    @functools.wraps(fn)
+    async def wrapper(*args, idempotency_key=None, **kwargs):
+        if not idempotency_key:
+            return await call_tool(fn, *args, **kwargs)
+
+        key = f"{caller_name()}:{idempotency_key}"
+        fingerprint = call_fingerprint(name, args, kwargs)
+        lock = locks.get(key)
+        if lock is None:
+            lock = locks[key] = asyncio.Lock()
+        async with lock:
+            deadline = time.monotonic() + IDEMPOTENCY_WAIT
+            while True:
+                try:
+                    entry = await run_blocking(STORE_POOL, store.claim, key, fingerprint)
+                except OSError as e:
+                    logger.warning(f"Idempotency store unavailable, calling {name} without it: {e}")
+                    return await call_tool(fn, *args, **kwargs)
+                if entry is None:
+                    break
+                if entry["fingerprint"] != fingerprint:
+                    raise IdempotencyConflict(
+                        f"Idempotency key '{idempotency_key}' was already used with different arguments"
+                    )
+                if not entry.get("pending"):
+                    REPLAYS.inc(tool=name)
+                    return entry["result"]
+                # Another worker is running this call; wait for its result
+                if time.monotonic() >= deadline:
+                    raise IdempotencyConflict(
+                        f"A call with idempotency key '{idempotency_key}' is still in progress; retry later"
+                    )
+                WAITS.inc(tool=name)
+                await asyncio.sleep(POLL_INTERVAL)
+
+            try:
+                result = await call_tool(fn, *args, **kwargs)
+            except BaseException:
+                await _release(key)
+                raise
+            if is_error_result(result):
+                await _release(key)
+                return result
+            try:
+                await run_blocking(STORE_POOL, store.put, key, fingerprint, result)
+            except (OSError, TypeError, ValueError) as e:
+                logger.warning(f"Could not store idempotent result for {name}: {e}")
+                await _release(key)
+            return result
+
+    signature = inspect.signature(fn)
+    wrapper.__signature__ = signature.replace(parameters=[
+        *signature.parameters.values(),
+        inspect.Parameter("idempotency_key", inspect.Parameter.KEYWORD_ONLY, default=None, annotation=KEY_ANNOTATION),
+    ])
+    return wrapper
@@ -0,0 +1,51 @@
+"""Per-tool call metrics."""
+
+import functools
+
+from adapter.common.metrics import track_tool
+from middleware.base import call_tool, caller_name
+
+def is_error_result(result):
+    """Whether a tool returned an error payload instead of raising."""
+    return isinstance(result, dict) and result.get("status") == "error"
+
+def instrument(name, fn, options):
+    """
+    Record calls, errors, in-flight count and latency for a tool.
+
+    Args:
+        name: Tool name used as the metric label
+        fn: Tool function (sync or async)
+        options: Tool options (unused)
+
+    Returns:
+        Async wrapper around fn
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        with track_tool(name, caller_name()) as outcome:
+            result = await call_tool(fn, *args, **kwargs)
+            outcome["error"] = is_error_result(result)
+            return result
+
+    return wrapper
+
+def instrument_stream(name, stream, options):
+    """
+    Record a streamed tool call, from opening the stream until it closes.
+
+    Args:
+        name: Tool name used as the metric label
+        stream: Async generator function yielding the tool's result items
+        options: Tool options (unused)
+
+    Returns:
+        Async generator function wrapping stream
+    """
+    @functools.wraps(stream)
+    async def wrapper(*args, **kwargs):
+        with track_tool(name, caller_name()):
+            async for item in stream(*args, **kwargs):
+                yield item
+
+    return wrapper
@@ -0,0 +1,68 @@
+"""
+Tool registration through a pipeline of call wrappers.
+
+Each layer is a function ``layer(name, fn, options) -> fn`` that returns an
+async wrapper around the tool. Layers are applied so that the first one in the
+list is the outermost. Wrappers keep the tool's signature and docstring
+(functools.wraps), which FastMCP uses to build the tool's input schema.
+
+Streaming variants of tools (async generator functions, see
+transport/streaming.py) go through STREAM_LAYERS with the options the tool
+was registered with, so a stream is metered and rate limited like a call.
+"""
+
+from middleware.admission import admission, admission_stream
+from middleware.idempotency import idempotency
+from middleware.instrumentation import instrument, instrument_stream
+from middleware.result_cache import result_cache
+from middleware.singleflight import singleflight
+
+# Outermost first
+DEFAULT_LAYERS = [instrument, idempotency, result_cache, singleflight, admission]
+STREAM_LAYERS = [instrument_stream, admission_stream]
+
+def tool_registrar(mcp, layers=None):
+    """
+    Build a replacement for ``@mcp.tool()`` that wraps tools in the pipeline.
+
+    Args:
+        mcp: FastMCP server to register tools with
+        layers: Wrapper layers, outermost first (defaults to DEFAULT_LAYERS)
+
+    Returns:
+        A ``tool(**options)`` decorator factory. Options are passed to every
+        layer, which reads the ones it understands, and are kept on the
+        registered function as ``tool_options``.
+    """
+    layers = DEFAULT_LAYERS if layers is None else layers
+
+    def tool(**options):
+        def decorator(fn):
+            name = options.get("name", fn.__name__)
+            wrapped = fn
+            for layer in reversed(layers):
+                wrapped = layer(name, wrapped, options)
+            wrapped.tool_options = options
+            mcp.add_tool(wrapped, name=name)
+            return wrapped
+        return decorator
+
+    return tool
+
+def wrap_stream(name, stream, options, layers=None):
+    """
+    Wrap a tool's streaming variant in the stream pipeline.
+
+    Args:
+        name: Tool name
+        stream: Async generator function yielding the tool's result items
+        options: The tool's registration options
+        layers: Stream layers, outermost first (defaults to STREAM_LAYERS)
+
+    Returns:
+        Wrapped async generator function
+    """
+    layers = STREAM_LAYERS if layers is None else layers
+    for layer in reversed(layers):
+        stream = layer(name, stream, options)
+    return stream
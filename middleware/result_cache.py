@@ -0,0 +1,134 @@
+"""
+Per-tool result cache for read-only tools.
+
+Tools registered with ``ttl=<seconds>`` keep recent results, keyed by their
+normalized arguments, in a size-bounded LRU. Each read tool names the data it
+depends on with ``tags``; a write tool lists the tags it changes with
+``invalidates``, and a successful write drops every cached entry with one of
+those tags.
+
+A read that started before a write to one of its tags does not store its
+result, so a cache entry is never older than the last write that affects it.
+Caches are per process; other workers' entries age out with their TTL.
+"""
+
+import functools
+import os
+import time
+from collections import OrderedDict
+
+from adapter.common.metrics import REGISTRY
+from middleware.base import bump_generation, call_tool, tag_generations
+from middleware.instrumentation import is_error_result
+from middleware.singleflight import call_key
+
+MAX_ENTRIES = int(os.environ.get("MCP_CACHE_MAX_ENTRIES", "256"))
+
+HITS = REGISTRY.counter("mcp_cache_hits_total", "Tool calls answered from the result cache", ["tool"])
+MISSES = REGISTRY.counter("mcp_cache_misses_total", "Tool calls that missed the result cache", ["tool"])
+INVALIDATIONS = REGISTRY.counter("mcp_cache_invalidations_total", "Cache invalidations caused by writes", ["tag"])
+ENTRIES = REGISTRY.gauge("mcp_cache_entries", "Entries held in a tool's result cache", ["tool"])
+
+class ResultCache:
+    """TTL + LRU cache of one tool's results."""
+
+    def __init__(self, name, ttl, tags=(), max_entries=MAX_ENTRIES):
+        self.name = name
+        self.ttl = ttl
+        self.tags = tuple(tags)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, result = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            ENTRIES.set(len(self._entries), tool=self.name)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, result):
+        self._entries[key] = (time.monotonic() + self.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        ENTRIES.set(len(self._entries), tool=self.name)
+
+    def clear(self):
+        self._entries.clear()
+        ENTRIES.set(0, tool=self.name)
+
+# Caches by tag
+_caches_by_tag = {}
+
+def invalidate(*tags):
+    """
+    Drop cached results that depend on any of the given tags.
+
+    Args:
+        *tags: Tags such as "calendar", "contacts" or "aliases"
+    """
+    for tag in tags:
+        bump_generation(tag)
+        INVALIDATIONS.inc(tag=tag)
+        for cache in _caches_by_tag.get(tag, ()):
+            cache.clear()
+
+def result_cache(name, fn, options):
+    """
+    Cache a read tool's results, or invalidate caches after a write tool.
+
+    Args:
+        name: Tool name
+        fn: Tool function
+        options: Tool options; "ttl" (seconds) and "tags" enable caching,
+            "invalidates" lists the tags a successful call changes
+
+    Returns:
+        fn unchanged if neither applies, otherwise an async wrapper
+    """
+    ttl = options.get("ttl")
+    invalidates = tuple(options.get("invalidates") or ())
+
+    if invalidates:
+        @functools.wraps(fn)
+        async def write_wrapper(*args, **kwargs):
+            try:
+                result = await call_tool(fn, *args, **kwargs)
+            except Exception:
+                # The write may have partly gone through
+                invalidate(*invalidates)
+                raise
+            if not is_error_result(result):
+                invalidate(*invalidates)
+            return result
+
+        return write_wrapper
+
+    if not ttl:
+        return fn
+
+    cache = ResultCache(name, ttl, options.get("tags") or ())
+    for tag in cache.tags:
+        _caches_by_tag.setdefault(tag, []).append(cache)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        key = call_key(name, args, kwargs)
+        entry = cache.get(key)
+        if entry is not None:
+            HITS.inc(tool=name)
+            return entry[1]
+
+        MISSES.inc(tool=name)
+        generations = tag_generations(cache.tags)
+        result = await call_tool(fn, *args, **kwargs)
+        if not is_error_result(result) and generations == tag_generations(cache.tags):
+            cache.put(key, result)
+        return result
+
+    return wrapper
@@ -0,0 +1,72 @@
+"""
+Coalescing of identical concurrent calls to read-only tools.
+
+While a call is in flight, further calls to the same tool with the same
+arguments wait for its result instead of making their own upstream request.
+Only tools registered with ``read_only=True`` are coalesced.
+
+The key includes the write generation of the tool's ``tags``, so a call that
+starts after a write to one of them never joins a call that started before it
+and would return (and let the result cache store) pre-write data.
+"""
+
+import asyncio
+import functools
+import json
+
+from adapter.common.metrics import REGISTRY
+from middleware.base import call_tool, tag_generations
+
+HITS = REGISTRY.counter("mcp_singleflight_hits_total", "Calls that joined an identical in-flight call", ["tool"])
+MISSES = REGISTRY.counter("mcp_singleflight_misses_total", "Calls that started a new upstream call", ["tool"])
+
+def call_key(name, args, kwargs):
+    """
+    Build a key identifying a tool call by its normalized arguments.
+
+    Keyword order does not matter; values are compared by their JSON form.
+
+    Args:
+        name: Tool name
+        args: Positional arguments
+        kwargs: Keyword arguments
+
+    Returns:
+        Hashable key
+    """
+    return (name, json.dumps([args, kwargs], sort_keys=True, default=str, separators=(",", ":")))
+
+def singleflight(name, fn, options):
+    """
+    Share one in-flight call among identical concurrent calls to a read-only tool.
+
+    Args:
+        name: Tool name
+        fn: Tool function
+        options: Tool options; coalescing applies when "read_only" is true,
+            and "tags" names the data the tool reads
+
+    Returns:
+        fn unchanged for tools that are not read-only, otherwise an async wrapper
+    """
+    if not options.get("read_only"):
+        return fn
+
+    tags = tuple(options.get("tags") or ())
+    in_flight = {}
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        key = (call_key(name, args, kwargs), tag_generations(tags))
+        task = in_flight.get(key)
+        if task is None:
+            MISSES.inc(tool=name)
+            task = asyncio.ensure_future(call_tool(fn, *args, **kwargs))
+            in_flight[key] = task
+            task.add_done_callback(lambda _: in_flight.pop(key, None))
+        else:
+            HITS.inc(tool=name)
+        # Shielded so that one caller going away does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    return wrapper
@@ -1,202 +1,217 @@
 #!/usr/bin/env python
 """Enhanced MCP Server with dual transport support (HTTP and stdio).
 Supports both remote API access and Claude Desktop integration.
+
+Startup is kept lean for Claude Desktop, which spawns a fresh stdio process:
+tool modules (and the Google/fuzzy-matching libraries behind them) are
+imported on a tool's first call, and FastAPI is only imported when an HTTP
+transport is started.
 """
 import asyncio
 import logging
+import math
 import platform
 import sys
-import threading
+from contextlib import asynccontextmanager
 from typing import List, Optional
 
-from fastapi import FastAPI, Request, Security, Depends, HTTPException
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from mcp.server.fastmcp import FastMCP
-import uvicorn
-
-# Import all tools
-from tools.weather import get_forecast, get_alerts
-from tools.calendar import create_event, delete_event, list_events, find_and_delete_event, update_event, find_and_update_event
-from tools.calendar.smart_create_event import smart_create_event
-from tools.contacts.search_person import search_person
-from tools.contacts.select_contact import select_contact
-from tools.contacts.add_name_alias import add_name_alias
-from tools.contacts.add_contact import add_contact
-from tools.time import get_current_time, get_current_date, get_timezone
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+
+from adapter.common.log import setup_logging
+from middleware import tool_registrar
+from middleware.base import call_tool
+from transport.auth import TokenTable
+
+# Configure logging: queued, written to stderr by a background thread (stdout is
+# the MCP channel in stdio mode). Levels via MCP_LOG_LEVEL and MCP_LOG_LEVELS.
+setup_logging()
 logger = logging.getLogger(__name__)
 
 import os
-import json
 
 # Define the port and API token for HTTP transport
 PORT = 6921  # Default port, can be changed via command line
 API_TOKEN = os.environ.get("MCP_API_TOKEN", "ROCKY_MCP_TOKEN_2025")  # Get from env var with fallback
+BATCH_CONCURRENCY = int(os.environ.get("MCP_BATCH_CONCURRENCY", "8"))  # Max concurrent entries per JSON-RPC batch
+GRACEFUL_SHUTDOWN_TIMEOUT = 30  # Seconds in-flight requests get to finish on shutdown or reload
+WARMUP_ENABLED = os.environ.get("MCP_WARMUP", "1").lower() not in ("0", "false", "no")  # Warm up before reporting ready
+METRICS_PUBLIC = os.environ.get("MCP_METRICS_PUBLIC", "").lower() in ("1", "true", "yes")  # Serve /metrics without a token
+COMPRESSION_ENABLED = os.environ.get("MCP_COMPRESSION", "1").lower() not in ("0", "false", "no")  # gzip/brotli responses
 
-# Define security scheme for Swagger UI
-security = HTTPBearer()
+# Accepted API tokens (MCP_API_TOKENS, or API_TOKEN with full access)
+TOKENS = TokenTable.from_env(API_TOKEN)
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)):
-    """
-    Verify the authorization token.
-    This function is used by FastAPI to show the Authorize button in Swagger UI.
-    The actual authentication is handled by the middleware.
-    """
-    if credentials.credentials != API_TOKEN:
-        raise HTTPException(status_code=401, detail="Invalid authorization token")
-    return credentials.credentials
 
+def streaming_tools():
+    """Tools whose result items can be streamed over HTTP.
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    """Simple Middleware to authenticate API requests using token from headers."""
-
-    async def dispatch(self, request: Request, call_next):
-        # Skip authentication for root path, health endpoint, documentation, and RPC endpoint (handled by dependency)
-        path = request.url.path
-        if path == "/" or path.startswith("/health") or path.startswith("/docs") or path.startswith("/redoc") or path.startswith("/openapi.json") or path.startswith("/rpc"):
-            return await call_next(request)
-
-        # Get token from header
-        auth_header = request.headers.get("Authorization", "")
-
-        if not auth_header or not auth_header.startswith("Bearer "):
-            logger.warning("Missing or invalid authorization token")
-            return JSONResponse(
-                {"detail": "Invalid or missing authorization token"},
-                status_code=401,
-            )
+    Maps tool names to async generators that take the same arguments as the
+    tool and yield items as each upstream result page arrives. Tools whose
+    upstream returns everything in one response (e.g. weather alerts) are not
+    listed: streaming them would not bound memory.
+    """
+    from tools.calendar import iter_events
+    from tools.contacts import iter_contacts
 
-        token = auth_header.replace("Bearer ", "")
-        if token != API_TOKEN:
-            logger.warning("Invalid authorization token")
-            return JSONResponse(
-                {"detail": "Invalid authorization token"},
-                status_code=401,
-            )
-        logger.info("Authorization token is valid")
-        # Token is valid, proceed with the request
-        return await call_next(request)
+    return {
+        "list_calendar_events": iter_events,
+        "list_contacts": iter_contacts,
+    }
 
 
 def create_mcp_server():
     """Factory function to create MCP server with all tools."""
     mcp = FastMCP("MCP Server")
+    tool = tool_registrar(mcp)
 
     # Weather tools 
-    @mcp.tool()
+    @tool(upstream="nws", read_only=True, ttl=60)
     async def get_weather_alerts(state: str) -> str:
         """Get weather alerts for a US state."""
+        from tools.weather import get_alerts
         return await get_alerts(state)
 
-    @mcp.tool()
+    @tool(upstream="nws", read_only=True, ttl=600)
     async def get_weather_forecast(latitude: float, longitude: float) -> str:
         """Get weather forecast for a location."""
+        from tools.weather import get_forecast
         return await get_forecast(latitude, longitude)
 
     # Calendar tools
-    @mcp.tool()
+    @tool(upstream="google_calendar", idempotent=True, invalidates=("calendar",))
     async def add_calendar_event(summary: str, start_time: str, end_time: str, description: str = "", location: str = None, attendees: list = None) -> dict:
         """Create a new Google Calendar event with optional location and attendees."""
+        from tools.calendar import create_event
         return await create_event(summary, start_time, end_time, description, location, attendees)
 
-    @mcp.tool()
+    @tool(upstream="google_calendar", idempotent=True, invalidates=("calendar",))
     async def delete_calendar_event(event_id: str) -> dict:
         """Delete a Google Calendar event by its ID."""
+        from tools.calendar import delete_event
         return await delete_event(event_id)
         
     # Time tools
-    @mcp.tool()
+    @tool()
     async def current_time() -> str:
         """Get the current date and time."""
+        from tools.time import get_current_time
         return get_current_time()
 
-    @mcp.tool()
+    @tool()
     async def current_date() -> str:
         """Get the current date."""
+        from tools.time import get_current_date
         return get_current_date()
 
-    @mcp.tool()
+    @tool()
     async def current_timezone() -> str:
         """Get the current timezone."""
+        from tools.time import get_timezone
         return get_timezone()
 
-    @mcp.tool()
+    @tool(upstream="google_calendar", idempotent=True, invalidates=("calendar",))
     async def find_and_update_calendar_event(title: str = None, description: str = None, start_date: str = None, 
                                            new_title: str = None, new_start_time: str = None, new_end_time: str = None, 
                                            new_description: str = None, new_location: str = None,
                                            add_attendees: list = None, remove_attendees: list = None) -> dict:
         """Find and update a calendar event based on search criteria, with support for location and attendees management."""
+        from tools.calendar import find_and_update_event
         return await find_and_update_event(title, description, start_date, new_title, new_start_time, new_end_time, 
                                           new_description, new_location, add_attendees, remove_attendees)
 
-    @mcp.tool()
+    @tool(upstream="google_calendar", read_only=True, ttl=30, tags=("calendar",))
     async def list_calendar_events(max_results: int = 10, search_query: str = None, time_min: str = None, time_max: str = None) -> dict:
         """List calendar events with optional filtering."""
+        from tools.calendar import list_events
         return await list_events(max_results, search_query, time_min, time_max)
 
-    @mcp.tool()
+    @tool(upstream="google_calendar", idempotent=True, invalidates=("calendar",))
     async def find_and_delete_calendar_event(title: str = None, description: str = None, start_date: str = None) -> dict:
         """Find and delete a calendar event based on search criteria (title, description, date)."""
+        from tools.calendar import find_and_delete_event
         return await find_and_delete_event(title, description, start_date)
 
-    @mcp.tool()
+    @tool(upstream="google_calendar", idempotent=True, invalidates=("calendar",))
     async def update_calendar_event(event_id: str, title: str = None, start_time: str = None, end_time: str = None, 
                                 description: str = None, location: str = None, add_attendees: list = None, remove_attendees: list = None) -> dict:
         """Update an existing calendar event by its ID, with support for location and attendees management."""
+        from tools.calendar import update_event
         return await update_event(event_id, title, start_time, end_time, description, location, add_attendees, remove_attendees)
 
+    @tool(upstream="google_calendar", idempotent=True, invalidates=("calendar",),
+          cost=lambda events: len(events))
+    async def bulk_create_calendar_events(events: list) -> dict:
+        """Create many calendar events at once. Each item has summary, start_time, end_time and optional description, location and attendees (emails)."""
+        from tools.calendar import bulk_create_events
+        return await bulk_create_events(events)
+
+    @tool(upstream="google_calendar", idempotent=True, invalidates=("calendar",),
+          cost=lambda updates: len(updates))
+    async def bulk_update_calendar_events(updates: list) -> dict:
+        """Update many calendar events at once. Each item has event_id and any of title, start_time, end_time, description, location and attendees (replaces the list)."""
+        from tools.calendar import bulk_update_events
+        return await bulk_update_events(updates)
+
+    @tool(upstream="google_calendar", idempotent=True, invalidates=("calendar",),
+          cost=lambda event_ids: len(event_ids))
+    async def bulk_delete_calendar_events(event_ids: list) -> dict:
+        """Delete many calendar events by ID at once."""
+        from tools.calendar import bulk_delete_events
+        return await bulk_delete_events(event_ids)
+
 
     # Contact tools
-    @mcp.tool()
+    @tool(upstream="google_directory", read_only=True)
     async def search_contact(name: str) -> list:
         """Search for a contact by name."""
+        from tools.contacts import search_person
         return await search_person(name)
         
-    @mcp.tool()
+    @tool()
     async def select_contact_from_results(contact_id: int, search_results: dict) -> dict:
         """Select a specific contact from previous search results by ID."""
-        return await select_contact(contact_id, search_results)
+        from tools.contacts import select_contact
+        return select_contact(contact_id, search_results)
         
-    @mcp.tool()
+    @tool(idempotent=True, invalidates=("aliases",))
     async def create_name_alias(alias: str, email: str) -> dict:
         """Create a name alias for quick reference (e.g., 'my manager' -> 'manager@company.com')."""
-        return await add_name_alias(alias, email)
+        from tools.contacts import add_name_alias
+        # Returns a coroutine, or a dict straight away when the input is invalid
+        return await call_tool(add_name_alias, alias, email)
         
-    @mcp.tool()
+    @tool(idempotent=True, invalidates=("contacts",))
     async def add_new_contact(name: str, email: str) -> dict:
         """Add a new fallback contact with the given name and email."""
+        from tools.contacts import add_contact
         return await add_contact(name, email)
         
-    @mcp.tool()
+    @tool(read_only=True, ttl=300, tags=("aliases",))
     async def list_name_aliases() -> dict:
         """List all currently defined name aliases and their corresponding email addresses."""
         from tools.contacts import list_name_aliases
         return await list_name_aliases()
 
-    @mcp.tool()
+    @tool(upstream="google_directory", read_only=True, ttl=60, tags=("contacts",))
     async def list_contacts() -> dict:
         """List all available contacts from both directory and fallback sources."""
         from tools.contacts import list_contacts as get_contacts
         return await get_contacts()
 
-    @mcp.tool()
+    @tool(idempotent=True, invalidates=("contacts",))
     async def edit_contact(contact_id: int, new_name: str = None, new_email: str = None) -> dict:
         """Edit an existing fallback contact by ID."""
         from tools.contacts import edit_contact as edit_fallback_contact
         return await edit_fallback_contact(contact_id, new_name, new_email)
         
-    @mcp.tool()
+    @tool(idempotent=True, invalidates=("contacts",))
     async def delete_contact(contact_id: int) -> dict:
         """Delete a fallback contact by ID."""
         from tools.contacts import delete_contact as delete_fallback_contact
         return await delete_fallback_contact(contact_id)
 
     # Smart calendar tools
-    @mcp.tool()
+    @tool(upstream=("google_directory", "google_calendar"), idempotent=True, invalidates=("calendar",))
     async def smart_add_calendar_event(summary: str, start_time: str, end_time: str, 
                                     description: str = "", location: str = None, 
                                     attendee_names: list = None) -> dict:
@@ -206,10 +221,11 @@ def create_mcp_server():
         Instead of requiring email addresses, you can provide names that will be resolved to emails.
         Any names that cannot be automatically resolved will be returned as unresolved_attendees.
         """
+        from tools.calendar.smart_create_event import smart_create_event
         return await smart_create_event(summary, start_time, end_time, description, location, attendee_names)
 
     # Example tools from simple-mcp-server
-    @mcp.tool()
+    @tool()
     async def hello_world(name: str = "World", delay: int = 0) -> dict:
         """A simple hello world tool that returns a greeting.
 
@@ -225,13 +241,13 @@ def create_mcp_server():
             await asyncio.sleep(delay)
         return {"message": f"Hello, {name}!"}
 
-    @mcp.tool()
+    @tool()
     def get_version() -> dict:
         """Get server version information."""
         logger.info("get_version called")
         return {"version": "1.0.0", "name": "MCP Server", "api_version": "FastMCP 2.5.1"}
 
-    @mcp.tool()
+    @tool()
     def system_info() -> dict:
         """Get basic system information."""
         logger.info("system_info called")
@@ -245,11 +261,58 @@ def create_mcp_server():
     return mcp
 
 
-def run_http_server(port=PORT):
-    """Run HTTP server in a separate thread."""
-    mcp_http = create_mcp_server()
-    logger.info(f"Starting HTTP server on port {port}")
-    
+def create_http_app(mcp, batch_concurrency=BATCH_CONCURRENCY, tokens=None):
+    """Create the FastAPI app that serves the tools of an existing MCP server.
+
+    The app dispatches into the given server's tool registry, so it can share
+    one registry (and its warm caches) with the stdio transport.
+    """
+    from fastapi import FastAPI, Request, Security
+    from fastapi.responses import JSONResponse, PlainTextResponse, Response
+    from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+    from adapter.common.warmup import Warmup
+    from adapter.contacts.fallback import ensure_fallback_contacts_file
+    from adapter.contacts.resolution import load_name_aliases
+    from adapter.weather.client import close_http_client
+    from adapter.calendar.client import close_calendar_client
+    from adapter.calendar.mirror import get_mirror, run_sync_loop
+    from adapter.calendar.watch import WEBHOOK_PATH, get_watch, run_watch_loop
+    from middleware import invalidate
+    from adapter.common.metrics import REGISTRY
+    from transport.auth import EXEMPT_PATHS, AuthMiddleware
+    from transport.compression import CompressionMiddleware
+    from transport.rpc import PARSE_ERROR, RATE_LIMITED, RpcDispatcher, RpcError, error_response
+    from transport.serialization import RpcJSONResponse, loads
+    from transport.streaming import negotiate_stream_format, streaming_response
+
+    # Define security scheme for Swagger UI. Verification itself is done once per
+    # request by AuthMiddleware, so this only documents the Authorize button.
+    security = HTTPBearer(auto_error=False)
+
+    dispatcher = RpcDispatcher(mcp, batch_concurrency=batch_concurrency, streams=streaming_tools())
+
+    warmup = Warmup() if WARMUP_ENABLED else Warmup(steps=[])
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # Shared state files are needed by every contacts call, so load them before serving
+        ensure_fallback_contacts_file()
+        load_name_aliases()
+        # The rest of the warmup runs in the background; /ready reports when it is done
+        warmup_task = asyncio.create_task(warmup.run())
+        # Keeps the local calendar mirror fresh so list/search calls rarely wait
+        sync_task = asyncio.create_task(run_sync_loop())
+        # Registers and renews the calendar watch channel when a webhook URL is configured
+        watch_task = asyncio.create_task(run_watch_loop())
+        yield
+        warmup_task.cancel()
+        sync_task.cancel()
+        watch_task.cancel()
+        # Release pooled upstream connections owned by this event loop
+        await close_http_client()
+        await close_calendar_client()
+
     # Create FastAPI app with metadata for documentation
     app = FastAPI(
         title="MCP Server API",
@@ -257,11 +320,19 @@ def run_http_server(port=PORT):
         version="1.0.0",
         docs_url="/docs",
         redoc_url="/redoc",
-        openapi_url="/openapi.json"
+        openapi_url="/openapi.json",
+        lifespan=lifespan
     )
     
     # Add authentication middleware
-    app.add_middleware(AuthMiddleware)
+    # Google cannot send a bearer token; the webhook checks its channel token instead
+    exempt_paths = EXEMPT_PATHS | {WEBHOOK_PATH}
+    if METRICS_PUBLIC:
+        exempt_paths |= {"/metrics"}
+    app.add_middleware(AuthMiddleware, tokens=tokens if tokens is not None else TOKENS, exempt_paths=exempt_paths)
+    # Outermost, so every response (including 401s and streams) is negotiated
+    if COMPRESSION_ENABLED:
+        app.add_middleware(CompressionMiddleware)
     
     # Create a root path handler
     @app.get("/",
@@ -281,7 +352,9 @@ def run_http_server(port=PORT):
             "version": "1.0.0",
             "description": "MCP Server with HTTP API for calendar, weather, contacts, and time tools",
             "documentation": "/docs",
-            "health": "/health"
+            "health": "/health",
+            "ready": "/ready",
+            "metrics": "/metrics"
         }
     
     # Create a health check endpoint
@@ -299,35 +372,113 @@ def run_http_server(port=PORT):
         """
         return {"status": "ok", "message": "MCP Server is running"}
     
+    # Create a readiness probe, separate from the liveness check above
+    @app.get("/ready",
+             summary="Readiness Check",
+             description="Check if the MCP Server has finished warming up and can take traffic",
+             tags=["System"])
+    async def readiness_check():
+        """Returns whether the MCP Server is warmed up.
+        
+        Responds 503 until credentials, Google API services, contact files and
+        tool modules are loaded, then 200. Upstreams without stored credentials
+        are listed as "unavailable" but do not hold readiness back; a step that
+        fails keeps the status at "failed" (503) until a retry succeeds.
+        This endpoint is not authenticated; load balancers should route
+        traffic only to instances that return 200.
+        
+        Returns:
+            JSONResponse: Readiness status and the outcome of each warmup step
+        """
+        return JSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
+    
+    # Create a metrics endpoint
+    @app.get("/metrics",
+             summary="Metrics",
+             description="Tool and upstream API metrics in Prometheus text format",
+             tags=["System"],
+             response_class=PlainTextResponse)
+    async def metrics():
+        """Returns per-tool and per-upstream call metrics.
+        
+        Includes call and error counts, in-flight calls and latency histograms
+        for every tool, and request counts, errors and latency for Google
+        Calendar, Google Directory and NWS calls. Counts are per process.
+        Requires a Bearer token unless MCP_METRICS_PUBLIC is set.
+        
+        Returns:
+            PlainTextResponse: Metrics in the Prometheus text exposition format
+        """
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+    
+    # Receive calendar change notifications from Google
+    @app.post(WEBHOOK_PATH, include_in_schema=False)
+    async def calendar_notification(request: Request):
+        """Invalidates cached calendar results and syncs the mirror on a change ping.
+        
+        Authenticated by the channel token Google echoes in X-Goog-Channel-Token.
+        The initial "sync" message of a new channel only needs acknowledging.
+        """
+        state = get_watch().verify(request.headers)
+        if state is None:
+            return Response(status_code=403)
+        if state != "sync":
+            invalidate("calendar")
+            mirror = get_mirror()
+            if mirror is not None:
+                mirror.request_sync()
+        return Response(status_code=200)
+    
     # Create an authenticated JSON-RPC endpoint
     @app.post("/rpc",
               summary="JSON-RPC API Endpoint",
               description="Main API endpoint for MCP Server JSON-RPC requests",
               tags=["API"])
-    async def rpc_endpoint(request: Request, token: str = Depends(verify_token)):
+    async def rpc_endpoint(request: Request, credentials: Optional[HTTPAuthorizationCredentials] = Security(security)):
         """Handle JSON-RPC requests for the MCP Server.
         
         This endpoint requires authentication via Bearer token in the Authorization header.
+        Tokens may be restricted to a subset of methods by their scopes.
         Supports standard JSON-RPC 2.0 format with method, params, and id fields.
         
         Available methods:
-        - get_version: Returns the MCP Server version information
-        - list_tools: Returns a list of available tools
+        - tools/call: Call a tool with params {"name": ..., "arguments": {...}}
+        - tools/list (or list_tools): Returns a list of available tools
+        - <tool name>: Call a tool directly, passing params as its arguments
+        
+        A JSON array of requests is handled as a JSON-RPC batch: entries run
+        concurrently (up to the configured batch concurrency) and responses
+        are returned in request order.
+        
+        Streaming: for list_calendar_events and list_contacts,
+        send "Accept: application/x-ndjson" (one JSON frame per line) or
+        "Accept: text/event-stream" (SSE) to receive result items as they are
+        produced. Each item arrives as {"id": ..., "item": ...}, followed by a
+        final frame with the JSON-RPC result ({"count": n}) or error.
+        
+        Rate limits: calls are admitted per API token and per upstream API.
+        Calls beyond a bucket's queue fail with error code -32002 and
+        data.retry_after (seconds); a single request also gets HTTP 429 with
+        a Retry-After header.
         
         Calendar Tools:
-        - create_calendar_event: Create a new calendar event
+        - add_calendar_event: Create a new calendar event
+        - smart_add_calendar_event: Create event with attendee name resolution
         - update_calendar_event: Update an existing calendar event
         - delete_calendar_event: Delete a calendar event by ID
         - find_and_update_calendar_event: Find and update events by criteria
         - find_and_delete_calendar_event: Find and delete events by criteria
         - list_calendar_events: List upcoming calendar events
-        - smart_create_calendar_event: Create event with attendee name resolution
         
         Contact Tools:
-        - search_person: Search for a person in the directory
-        - select_contact: Select a contact from search results
-        - add_name_alias: Add a personal alias for a contact
-        - add_contact: Add a new contact to the fallback contacts
+        - search_contact: Search for a person in the directory
+        - select_contact_from_results: Select a contact from search results
+        - create_name_alias: Add a personal alias for a contact
+        - list_name_aliases: List all defined name aliases
+        - list_contacts: List directory and fallback contacts
+        - add_new_contact: Add a new contact to the fallback contacts
+        - edit_contact: Edit a fallback contact
+        - delete_contact: Delete a fallback contact
         
         Time Tools:
         - current_time: Get the current date and time
@@ -336,71 +487,135 @@ def run_http_server(port=PORT):
         
         Weather Tools:
         - get_weather_forecast: Get weather forecast for a location
-        - get_weather_alerts: Get weather alerts for a location
+        - get_weather_alerts: Get weather alerts for a US state
         
         Args:
             request (Request): The incoming HTTP request with JSON-RPC payload
             
         Returns:
-            JSONResponse: A JSON-RPC 2.0 formatted response
+            RpcJSONResponse: A JSON-RPC 2.0 formatted response (or a StreamingResponse
+            when a streaming format was negotiated)
         """
         
         # Authentication already handled by middleware
-        # Process the JSON-RPC request
         body = await request.body()
-        # Convert the body to a string if it's bytes
-        if isinstance(body, bytes):
-            body_str = body.decode('utf-8')
-        else:
-            body_str = body
             
         # Parse the JSON-RPC request
         try:
-            data = json.loads(body_str)
-            method = data.get('method')
-            params = data.get('params', {})
-            request_id = data.get('id')
-            
-            # Call the appropriate MCP method
-            if method == 'get_version':
-                return JSONResponse({
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "version": "1.0.0",
-                        "name": "MCP Server"
-                    }
-                })
-            elif method == 'list_tools':
-                tools = await mcp_http.list_tools()
-                return JSONResponse({
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": tools
-                })
+            data = loads(body)
+        except ValueError as e:
+            logger.error(f"Error parsing JSON-RPC request: {e}")
+            return RpcJSONResponse(
+                error_response(None, RpcError(PARSE_ERROR, "Parse error")),
+                status_code=400,
+            )
+
+        response = None
+        stream_format = negotiate_stream_format(request.headers.get("accept", ""))
+        if stream_format is not None:
+            try:
+                items = await dispatcher.open_stream(data)
+            except RpcError as e:
+                response = error_response(data.get("id"), e)
             else:
-                # For other methods, we'll need to implement them
-                return JSONResponse({
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "error": {
-                        "code": -32601,
-                        "message": f"Method '{method}' not found"
-                    }
-                })
-        except Exception as e:
-            logger.error(f"Error processing JSON-RPC request: {e}")
-            return JSONResponse({
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {
-                    "code": -32700,
-                    "message": "Parse error"
-                }
-            }, status_code=400)
+                if items is not None:
+                    return streaming_response(stream_format, data["id"], items)
+
+        if response is None:
+            response = await dispatcher.handle_payload(data)
+        if response is None:
+            # Notifications get no response body
+            return Response(status_code=204)
+        error = response.get("error") if isinstance(response, dict) else None
+        if error is not None and error["code"] == RATE_LIMITED:
+            # Single rejected call: let HTTP clients back off without parsing the body
+            retry_after = math.ceil(error["data"]["retry_after"])
+            return RpcJSONResponse(response, status_code=429, headers={"Retry-After": str(max(retry_after, 1))})
+        return RpcJSONResponse(response)
+
+    return app
+
+
+def create_app():
+    """App factory used by uvicorn worker processes ("server:create_app").
+
+    Each worker builds its own tool registry and HTTP app. Settings reach the
+    workers through the environment (MCP_BATCH_CONCURRENCY, MCP_API_TOKENS, ...).
+    """
+    return create_http_app(create_mcp_server())
+
+
+def run_http_server(port=PORT, batch_concurrency=BATCH_CONCURRENCY, workers=1, http2=False, certfile=None, keyfile=None):
+    """Run HTTP server only.
+
+    With workers > 1, uvicorn binds the socket once and pre-forks that many
+    worker processes, each created from create_app(). Sending SIGHUP to the
+    parent process restarts the workers one at a time (graceful reload).
+
+    Per-process state policy: the fallback contacts and name aliases files on
+    disk are the source of truth. Each worker reloads its in-memory copy when
+    the file changes, and writes take an inter-process file lock and replace
+    the file atomically (see adapter/common/shared_file.py). In-memory lookup
+    caches are per worker and are cleared whenever those files change.
+
+    With http2=True the app is served by hypercorn instead, so clients can
+    multiplex many RPCs over one connection: HTTP/2 over TLS (ALPN) when
+    certfile/keyfile are given, otherwise cleartext h2c alongside HTTP/1.1.
+    """
+    if http2:
+        run_http2_server(port=port, batch_concurrency=batch_concurrency, certfile=certfile, keyfile=keyfile)
+        return
+
+    import uvicorn
+
+    if workers > 1:
+        # Workers re-import this module, so pass settings through the environment
+        os.environ["MCP_BATCH_CONCURRENCY"] = str(batch_concurrency)
+        logger.info(f"Starting HTTP server on port {port} with {workers} workers")
+        uvicorn.run(
+            "server:create_app",
+            factory=True,
+            host="0.0.0.0",
+            port=port,
+            workers=workers,
+            app_dir=os.path.dirname(os.path.abspath(__file__)),
+            timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT,
+            log_config=None,
+        )
+        return
+
+    mcp_http = create_mcp_server()
+    app = create_http_app(mcp_http, batch_concurrency=batch_concurrency)
+    logger.info(f"Starting HTTP server on port {port}")
     
     # Run the FastAPI app with uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # log_config=None leaves uvicorn's loggers on the queued root handler
+    uvicorn.run(app, host="0.0.0.0", port=port, timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT, log_config=None)
+
+
+def run_http2_server(port=PORT, batch_concurrency=BATCH_CONCURRENCY, certfile=None, keyfile=None):
+    """Run the HTTP app under hypercorn with HTTP/2 enabled."""
+    try:
+        from hypercorn.asyncio import serve
+        from hypercorn.config import Config
+    except ImportError:
+        raise RuntimeError("HTTP/2 serving requires hypercorn (pip install hypercorn)")
+
+    config = Config()
+    config.bind = [f"0.0.0.0:{port}"]
+    config.graceful_timeout = GRACEFUL_SHUTDOWN_TIMEOUT
+    # A Logger (rather than a stream) keeps hypercorn on the queued root handler
+    config.errorlog = logging.getLogger("hypercorn.error")
+    if certfile:
+        config.certfile = certfile
+        config.keyfile = keyfile
+        # Advertised through ALPN; h2 is preferred when the client offers it
+        config.alpn_protocols = ["h2", "http/1.1"]
+
+    mcp_http = create_mcp_server()
+    app = create_http_app(mcp_http, batch_concurrency=batch_concurrency)
+    logger.info(f"Starting HTTP/2 server on port {port} ({'TLS' if certfile else 'h2c'})")
+    asyncio.run(serve(app, config))
 
 
 def run_stdio_server():
@@ -410,6 +625,42 @@ def run_stdio_server():
     mcp_stdio.run(transport="stdio")
 
 
+async def serve_both(port=PORT, batch_concurrency=BATCH_CONCURRENCY):
+    """Serve stdio and HTTP from one event loop and one tool registry.
+
+    Both transports call into the same FastMCP instance, so adapter caches,
+    loaded contact files and pooled upstream connections are shared instead
+    of being built twice on two loops. The HTTP server shuts down when the
+    stdio client disconnects; if HTTP fails to start, stdio keeps running.
+    """
+    import uvicorn
+
+    mcp = create_mcp_server()
+    app = create_http_app(mcp, batch_concurrency=batch_concurrency)
+    http_server = uvicorn.Server(uvicorn.Config(app, host="0.0.0.0", port=port, log_config=None))
+
+    async def serve_http():
+        logger.info(f"Starting HTTP server on port {port}")
+        try:
+            await http_server.serve()
+        except SystemExit:
+            # uvicorn exits the process when it cannot bind; keep stdio alive
+            logger.error(f"HTTP server on port {port} failed to start; continuing with stdio only")
+
+    http_task = asyncio.create_task(serve_http())
+    try:
+        logger.info("Starting stdio server")
+        await mcp.run_stdio_async()
+    finally:
+        http_server.should_exit = True
+        await http_task
+
+
+def run_both_servers(port=PORT, batch_concurrency=BATCH_CONCURRENCY):
+    """Run stdio and HTTP transports together in a single event loop."""
+    asyncio.run(serve_both(port=port, batch_concurrency=batch_concurrency))
+
+
 if __name__ == "__main__":
     # Parse command line arguments
     import argparse
@@ -418,23 +669,34 @@ if __name__ == "__main__":
     parser.add_argument("--http-only", action="store_true", help="Run with HTTP transport only")
     parser.add_argument("--stdio-only", action="store_true", help="Run with stdio transport only")
     parser.add_argument("--port", type=int, default=PORT, help=f"HTTP port (default: {PORT})")
+    parser.add_argument("--batch-concurrency", type=int, default=BATCH_CONCURRENCY,
+                        help=f"Max concurrent calls per JSON-RPC batch (default: {BATCH_CONCURRENCY})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of HTTP worker processes (requires --http-only, default: 1)")
+    parser.add_argument("--http2", action="store_true",
+                        help="Serve HTTP/2 through hypercorn (requires --http-only)")
+    parser.add_argument("--certfile", help="TLS certificate for --http2 (h2 over TLS; h2c without)")
+    parser.add_argument("--keyfile", help="TLS private key for --http2")
     args = parser.parse_args()
+    if args.workers > 1 and not args.http_only:
+        parser.error("--workers requires --http-only")
+    if args.http2 and not args.http_only:
+        parser.error("--http2 requires --http-only")
+    if args.http2 and args.workers > 1:
+        parser.error("--http2 does not support --workers")
+    if bool(args.certfile) != bool(args.keyfile):
+        parser.error("--certfile and --keyfile must be given together")
     
     if args.http_only:
         # HTTP only
         logger.info("Starting MCP Server with HTTP transport only")
-        run_http_server(port=args.port)
+        run_http_server(port=args.port, batch_concurrency=args.batch_concurrency, workers=args.workers,
+                        http2=args.http2, certfile=args.certfile, keyfile=args.keyfile)
     elif args.stdio_only:
         # Stdio only
         logger.info("Starting MCP Server with stdio transport only")
         run_stdio_server()
     else:
-        # BOTH simultaneously
+        # BOTH simultaneously, sharing one event loop and tool registry
         logger.info("Starting MCP Server with BOTH transports")
-
-        # Start HTTP server in background thread
-        http_thread = threading.Thread(target=lambda: run_http_server(port=args.port), daemon=True)
-        http_thread.start()
-
-        # Run stdio in main thread
-        run_stdio_server()
+        run_both_servers(port=args.port, batch_concurrency=args.batch_concurrency)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+"""
+Tests for bulk calendar operations.
+A stand-in backend answers batch() calls, so no network access or
+credentials are needed; the multipart parser is fed crafted responses.
+"""
+import asyncio
+
+import httpx
+from mcp.server.fastmcp import FastMCP
+
+from adapter.calendar import batch as calendar_batch
+from adapter.calendar import events as calendar_events
+from adapter.calendar.client import CalendarApiError, _parse_batch_response
+from middleware import tool_registrar
+from middleware.admission import TokenBucket, _buckets
+
+def _multipart(parts, boundary="batch_abc"):
+    """Build a batch response from (content_id, status_line, body) parts."""
+    text = ""
+    for content_id, status_line, body in parts:
+        text += (f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-item{content_id}>\r\n\r\n"
+                 f"HTTP/1.1 {status_line}\r\nContent-Type: application/json\r\n\r\n{body}\r\n")
+    text += f"--{boundary}--\r\n"
+    return httpx.Response(200, headers={"content-type": f"multipart/mixed; boundary={boundary}"}, text=text)
+
+def test_parse_batch_response():
+    """Parts are matched to requests by Content-ID, whatever order they arrive in."""
+    response = _multipart([
+        (2, "404 Not Found", '{"error": {"message": "Not Found"}}'),
+        (0, "200 OK", '{"id": "e0"}'),
+        (1, "204 No Content", ""),
+        (3, "502 Bad Gateway", "<html>upstream down</html>"),
+    ])
+    results = _parse_batch_response(response, 5)
+    assert results[0] == (200, {"id": "e0"})
+    assert results[1] == (204, None)
+    assert results[2] == (404, {"error": {"message": "Not Found"}})
+    assert results[3] == (502, {"error": {"message": "<html>upstream down</html>"}})
+    # No part for the last request; it is reported as not sent
+    assert results[4] == (None, None)
+
+def test_parse_batch_response_without_boundary():
+    try:
+        _parse_batch_response(httpx.Response(502, text="Bad Gateway"), 1)
+    except CalendarApiError as e:
+        assert e.status_code == 502
+    else:
+        raise AssertionError("response without a boundary was accepted")
+
+class FakeBatchCalendar:
+    """batch() over an in-memory calendar; the first batch can apply its operations and then fail."""
+
+    def __init__(self, fail_first=False):
+        self.events = {}
+        self.fail_first = fail_first
+        self.sent = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def batch(self, operations):
+        self.sent.append([operation["method"] for operation in operations])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            results = [self._run(operation) for operation in operations]
+        finally:
+            self.in_flight -= 1
+        if self.fail_first:
+            # The operations were applied, but the response is lost
+            self.fail_first = False
+            raise ConnectionError("connection reset")
+        return results
+
+    def _run(self, operation):
+        method = operation["method"]
+        if method == "insert":
+            event_id = operation["body"].get("id") or f"generated{len(self.events)}"
+            if event_id in self.events:
+                return 409, {"message": "The requested identifier already exists.", "reason": "duplicate"}
+            self.events[event_id] = dict(operation["body"], id=event_id)
+            return 200, self.events[event_id]
+        if method == "get":
+            return 200, self.events[operation["event_id"]]
+        if method == "delete":
+            if self.events.pop(operation["event_id"], None) is None:
+                return 410, {"message": "Resource has been deleted", "reason": "deleted"}
+            return 204, None
+        raise ValueError(method)
+
+def _backend(monkeypatch, backend):
+    monkeypatch.setattr(calendar_batch, "get_backend", lambda: backend)
+    monkeypatch.setattr(calendar_batch, "BACKOFF_BASE", 0)
+    monkeypatch.setattr(calendar_events, "get_mirror", lambda: None)
+    return backend
+
+def _event(n):
+    return {"summary": f"event {n}", "start_time": "2026-01-01T10:00:00Z", "end_time": "2026-01-01T11:00:00Z"}
+
+def test_create_retried_after_lost_response_makes_no_duplicates(monkeypatch):
+    """Events created by a batch whose response was lost are fetched, not created again."""
+    backend = _backend(monkeypatch, FakeBatchCalendar(fail_first=True))
+    result = asyncio.run(calendar_batch.send_bulk_create_request([_event(1), _event(2)]))
+
+    assert result["status"] == "success"
+    assert len(backend.events) == 2
+    assert sorted(item["event_id"] for item in result["results"]) == sorted(backend.events)
+    assert backend.sent == [["insert", "insert"], ["insert", "insert"], ["get", "get"]]
+
+def test_insert_without_id_is_not_retried(monkeypatch):
+    backend = _backend(monkeypatch, FakeBatchCalendar(fail_first=True))
+    body = {"summary": "no id", "start": {}, "end": {}}
+    results, batches = asyncio.run(calendar_batch.run_batch([{"method": "insert", "body": body}]))
+
+    assert batches == 1
+    assert results[0][0] is None
+    assert len(backend.events) == 1
+
+def test_batch_requests_are_bounded(monkeypatch):
+    backend = _backend(monkeypatch, FakeBatchCalendar())
+    monkeypatch.setattr(calendar_batch, "BATCH_CONCURRENCY", 2)
+    events = [_event(n) for n in range(5 * calendar_batch.BATCH_LIMIT)]
+    result = asyncio.run(calendar_batch.send_bulk_create_request(events))
+
+    assert result["succeeded"] == len(events)
+    assert result["batches"] == 5
+    assert backend.max_in_flight == 2
+
+def test_invalid_items_fail_individually(monkeypatch):
+    """Malformed items get their own error; the rest of the call goes ahead."""
+    backend = _backend(monkeypatch, FakeBatchCalendar())
+    backend.events["e1"] = {"id": "e1"}
+
+    created = asyncio.run(calendar_batch.send_bulk_create_request(["not an event", _event(1)]))
+    assert created["status"] == "partial"
+    assert [item["status"] for item in created["results"]] == ["error", "success"]
+
+    updated = asyncio.run(calendar_batch.send_bulk_update_request([None, {"title": "no id"}]))
+    assert updated["status"] == "error"
+    assert [item["index"] for item in updated["results"]] == [0, 1]
+
+    deleted = asyncio.run(calendar_batch.send_bulk_delete_request([{"id": "e1"}, "e1"]))
+    assert [item["status"] for item in deleted["results"]] == ["error", "success"]
+
+def test_delete_retried_after_lost_response_succeeds(monkeypatch):
+    """A 410 on a retried delete means the lost attempt deleted it; on a first attempt it is an error."""
+    backend = _backend(monkeypatch, FakeBatchCalendar(fail_first=True))
+    backend.events["e1"] = {"id": "e1"}
+    deleted = asyncio.run(calendar_batch.send_bulk_delete_request(["e1"]))
+
+    assert deleted["status"] == "success"
+    assert backend.sent == [["delete"], ["delete"]]
+
+    missing = asyncio.run(calendar_batch.send_bulk_delete_request(["e1"]))
+    assert missing["status"] == "error"
+    assert missing["results"][0]["status_code"] == 410
+
+def test_bulk_call_charged_per_item(monkeypatch):
+    """A bulk call takes one upstream token per item, not one per call."""
+    bucket = TokenBucket("upstream", "bulk_test", rate=0.001, burst=10, max_queue=0)
+    monkeypatch.setitem(_buckets, ("upstream", "bulk_test"), bucket)
+    tool = tool_registrar(FastMCP("test"))
+
+    @tool(upstream="bulk_test", cost=lambda event_ids: len(event_ids))
+    async def bulk_delete(event_ids: list) -> dict:
+        return {"status": "success"}
+
+    asyncio.run(bulk_delete(event_ids=["a", "b", "c"]))
+    assert round(bucket.tokens) == 7
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Tests for the native Calendar client.
+Requests go to an httpx mock transport and the credential cache holds a
+stand-in credentials object, so no network access or secrets are needed.
+"""
+import asyncio
+import json
+
+import httpx
+
+from adapter.calendar import auth as calendar_auth
+from adapter.calendar.client import CalendarApiError, CalendarClient
+
+class FakeCredentials:
+    """Credentials whose refresh hands out the next numbered token."""
+
+    def __init__(self, refresh_token="refresh"):
+        self.token = "token0"
+        self.refresh_token = refresh_token
+        self.valid = True
+        self.refreshes = 0
+
+    def refresh(self, request):
+        self.refreshes += 1
+        self.token = f"token{self.refreshes}"
+
+def _credentials(monkeypatch, creds):
+    monkeypatch.setattr(calendar_auth, "_credentials", creds)
+    monkeypatch.setattr(calendar_auth, "_save_credentials", lambda creds: None)
+    return creds
+
+def _client(rejected):
+    """Client whose API answers 401 to the given tokens and 200 to any other."""
+    seen = []
+
+    def handler(request):
+        token = request.headers["Authorization"].removeprefix("Bearer ")
+        seen.append(token)
+        if token in rejected:
+            return httpx.Response(401, json={"error": {"message": "Invalid Credentials"}})
+        return httpx.Response(200, json={"id": "e1"})
+
+    return CalendarClient(httpx.AsyncClient(transport=httpx.MockTransport(handler))), seen
+
+def test_rejected_token_is_refreshed_and_retried(monkeypatch):
+    creds = _credentials(monkeypatch, FakeCredentials())
+    client, seen = _client(rejected={"token0"})
+
+    assert asyncio.run(client.get_event("e1")) == {"id": "e1"}
+    assert seen == ["token0", "token1"]
+    assert creds.refreshes == 1
+
+def test_concurrent_rejections_share_one_refresh(monkeypatch):
+    """Calls rejected with the same token refresh it once, and the shared token is never cleared."""
+    creds = _credentials(monkeypatch, FakeCredentials())
+    clients = [_client(rejected={"token0"})[0] for _ in range(3)]
+
+    async def scenario():
+        return await asyncio.gather(*(client.get_event("e1") for client in clients))
+
+    assert asyncio.run(scenario()) == [{"id": "e1"}] * 3
+    assert creds.refreshes == 1
+    assert creds.token == "token1"
+
+def test_unrefreshable_token_raises(monkeypatch):
+    _credentials(monkeypatch, FakeCredentials(refresh_token=None))
+    client, seen = _client(rejected={"token0"})
+
+    try:
+        asyncio.run(client.get_event("e1"))
+    except CalendarApiError as e:
+        assert e.status_code == 401
+    else:
+        raise AssertionError("rejected credentials were used")
+    assert seen == ["token0"]
+
+def test_freebusy_query(monkeypatch):
+    _credentials(monkeypatch, FakeCredentials())
+    sent = []
+
+    def handler(request):
+        sent.append(request)
+        return httpx.Response(200, json={"calendars": {"primary": {"busy": []}}})
+
+    client = CalendarClient(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    body = {"timeMin": "2026-01-01T00:00:00Z", "timeMax": "2026-01-02T00:00:00Z", "items": [{"id": "primary"}]}
+    assert asyncio.run(client.freebusy_query(body, fields="calendars")) == {"calendars": {"primary": {"busy": []}}}
+
+    request = sent[0]
+    assert (request.method, request.url.path) == ("POST", "/calendar/v3/freeBusy")
+    assert request.url.params["fields"] == "calendars"
+    assert json.loads(request.content) == body
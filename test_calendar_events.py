@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Tests for single-event updates.
+A stand-in backend keeps one event with an ETag, so no network access or
+credentials are needed.
+"""
+import asyncio
+
+from adapter.calendar import events as calendar_events
+from adapter.calendar.client import CalendarApiError
+
+class FakeCalendar:
+    """One event whose ETag changes on every write; someone else edits it on the first concurrent_edits fetches."""
+
+    def __init__(self, concurrent_edits=0):
+        self.event = {"id": "e1", "etag": '"1"', "attendees": [{"email": "a@example.com"}]}
+        self.concurrent_edits = concurrent_edits
+        self.gets = 0
+        self.patches = 0
+
+    def _write(self, changes):
+        version = int(self.event["etag"].strip('"')) + 1
+        self.event = dict(self.event, **changes, etag=f'"{version}"')
+
+    async def get(self, event_id, fields=None):
+        self.gets += 1
+        event = dict(self.event)
+        if self.concurrent_edits:
+            # Another client changes the event right after this read
+            self.concurrent_edits -= 1
+            self._write({"attendees": self.event["attendees"] + [{"email": f"other{self.gets}@example.com"}]})
+        return event
+
+    async def patch(self, event_id, body, fields=None, etag=None):
+        self.patches += 1
+        if etag is not None and etag != self.event["etag"]:
+            raise CalendarApiError(412, "Precondition Failed")
+        self._write(body)
+        return dict(self.event)
+
+def _backend(monkeypatch, backend):
+    monkeypatch.setattr(calendar_events, "get_backend", lambda: backend)
+    monkeypatch.setattr(calendar_events, "get_mirror", lambda: None)
+    return backend
+
+def test_conflicting_patch_is_retried_on_fresh_copy(monkeypatch):
+    """A 412 refetches the event, so the other client's attendee is kept."""
+    backend = _backend(monkeypatch, FakeCalendar(concurrent_edits=1))
+    result = asyncio.run(calendar_events.send_update_event_request("e1", add_attendees=["b@example.com"]))
+
+    assert result["status"] == "success"
+    assert (backend.gets, backend.patches) == (2, 2)
+    assert [a["email"] for a in backend.event["attendees"]] == ["a@example.com", "other1@example.com", "b@example.com"]
+
+def test_gives_up_after_max_patch_attempts(monkeypatch):
+    """An event that changes on every attempt fails after MAX_PATCH_ATTEMPTS patches."""
+    backend = _backend(monkeypatch, FakeCalendar(concurrent_edits=calendar_events.MAX_PATCH_ATTEMPTS))
+    result = asyncio.run(calendar_events.send_update_event_request("e1", remove_attendees=["a@example.com"]))
+
+    assert result["status"] == "error"
+    assert "412" in result["message"]
+    assert backend.patches == calendar_events.MAX_PATCH_ATTEMPTS
+    assert "a@example.com" in [a["email"] for a in backend.event["attendees"]]
+
+def test_plain_field_change_is_one_unguarded_patch(monkeypatch):
+    backend = _backend(monkeypatch, FakeCalendar(concurrent_edits=1))
+    result = asyncio.run(calendar_events.send_update_event_request("e1", title="Renamed"))
+
+    assert result["status"] == "success"
+    assert (backend.gets, backend.patches) == (0, 1)
+    assert backend.event["summary"] == "Renamed"
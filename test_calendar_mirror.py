@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Tests for the local calendar mirror.
+A stand-in backend serves events.list pages, so no network access or
+credentials are needed.
+"""
+import asyncio
+import os
+
+from adapter.calendar import mirror as calendar_mirror
+
+def _event(event_id, updated="2026-01-01T00:00:00.000Z"):
+    return {"id": event_id, "updated": updated, "summary": event_id,
+            "start": {"dateTime": "2026-01-01T10:00:00Z"}, "end": {"dateTime": "2026-01-01T11:00:00Z"}}
+
+class FakeCalendar:
+    """events.list with sync tokens; a page can be held back to let writes land mid-sync."""
+
+    def __init__(self, events):
+        self.events = {event["id"]: event for event in events}
+        self.delta = []
+        self.hold = None
+        self.time_zone = "UTC"
+
+    async def list(self, fields=None, syncToken=None, **params):
+        if self.hold is not None:
+            await self.hold.wait()
+        items = list(self.delta) if syncToken else list(self.events.values())
+        self.delta = []
+        return {"items": items, "nextSyncToken": "token", "timeZone": self.time_zone}
+
+def _mirror(monkeypatch, tmp_path, events):
+    backend = FakeCalendar(events)
+    monkeypatch.setattr(calendar_mirror, "get_backend", lambda: backend)
+    return backend, calendar_mirror.CalendarMirror(path=str(tmp_path / "calendar-mirror.json"))
+
+def test_writes_during_sync_are_kept(monkeypatch, tmp_path):
+    """Creates and deletes applied while a sync fetches pages survive the sync."""
+    backend, mirror = _mirror(monkeypatch, tmp_path, [_event("e1"), _event("e3")])
+
+    async def scenario():
+        await mirror.sync()
+        backend.hold = asyncio.Event()
+        backend.delta = [_event("e1", updated="2026-01-02T00:00:00.000Z")]
+        sync = asyncio.ensure_future(mirror.sync())
+        await asyncio.sleep(0.01)
+        await mirror.apply([_event("e2")], deleted_ids=["e3"])
+        backend.hold.set()
+        await sync
+
+    asyncio.run(scenario())
+    assert sorted(mirror.events) == ["e1", "e2"]
+    assert mirror.events["e1"]["updated"] == "2026-01-02T00:00:00.000Z"
+
+def test_empty_delta_does_not_rewrite_file(monkeypatch, tmp_path):
+    """A sync that receives no changes leaves the persisted mirror alone."""
+    backend, mirror = _mirror(monkeypatch, tmp_path, [_event("e1")])
+    asyncio.run(mirror.sync())
+    before = os.stat(mirror.path).st_mtime_ns
+
+    assert asyncio.run(mirror.sync()) == 0
+    assert os.stat(mirror.path).st_mtime_ns == before
+
+    backend.delta = [_event("e2")]
+    assert asyncio.run(mirror.sync()) == 1
+    reloaded = calendar_mirror.CalendarMirror(path=mirror.path)
+    asyncio.run(reloaded.load())
+    assert sorted(reloaded.events) == ["e1", "e2"]
+
+def test_search_matches_partial_terms(monkeypatch, tmp_path):
+    """Search terms match inside words, as the API's q parameter does."""
+    meeting = dict(_event("e1"), summary="Weekly Meeting", description="Budget review")
+    lunch = dict(_event("e2"), summary="Lunch", attendees=[{"email": "meetup@example.com"}])
+    other = dict(_event("e3"), summary="Standup")
+    _, mirror = _mirror(monkeypatch, tmp_path, [meeting, lunch, other])
+    asyncio.run(mirror.sync())
+
+    assert [e["id"] for e in mirror.query("meet")] == ["e1", "e2"]
+    assert [e["id"] for e in mirror.query("MEET budg")] == ["e1"]
+    assert mirror.query("meet standup") == []
+
+def test_all_day_events_use_calendar_time_zone(monkeypatch, tmp_path):
+    """An all-day event covers its day in the calendar's time zone, not in UTC."""
+    holiday = dict(_event("e1"), start={"date": "2026-01-05"}, end={"date": "2026-01-06"})
+    backend, mirror = _mirror(monkeypatch, tmp_path, [holiday])
+    backend.time_zone = "America/Los_Angeles"
+    asyncio.run(mirror.sync())
+
+    # 2026-01-05 03:00 UTC is still January 4th in Los Angeles
+    assert mirror.query(time_min="2026-01-04T20:00:00Z", time_max="2026-01-05T03:00:00Z") == []
+    assert [e["id"] for e in mirror.query(time_min="2026-01-06T02:00:00Z", time_max="2026-01-06T03:00:00Z")] == ["e1"]
+
+    reloaded = calendar_mirror.CalendarMirror(path=mirror.path)
+    asyncio.run(reloaded.load())
+    assert reloaded.time_zone == "America/Los_Angeles"
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Tests for listing calendar events from the API.
+A stand-in backend serves events.list pages and the mirror is turned off, so
+no network access or credentials are needed.
+"""
+import asyncio
+
+from adapter.calendar import queries as calendar_queries
+
+def _event(n):
+    return {"id": f"e{n}", "summary": f"event {n}",
+            "start": {"dateTime": "2026-01-01T10:00:00Z"}, "end": {"dateTime": "2026-01-01T11:00:00Z"}}
+
+class PagedCalendar:
+    """events.list over a fixed set of events, returning at most page_size per page."""
+
+    def __init__(self, count, page_size):
+        self.events = [_event(n) for n in range(count)]
+        self.page_size = page_size
+        self.requests = []
+
+    async def list(self, fields=None, **params):
+        self.requests.append(dict(params, fields=fields))
+        start = int(params.get("pageToken", 0))
+        end = start + min(params["maxResults"], self.page_size)
+        page = {"items": self.events[start:end]}
+        if end < len(self.events):
+            page["nextPageToken"] = str(end)
+        return page
+
+def _backend(monkeypatch, backend):
+    monkeypatch.setattr(calendar_queries, "get_backend", lambda: backend)
+    monkeypatch.setattr(calendar_queries, "get_mirror", lambda: None)
+    return backend
+
+def _collect(**kwargs):
+    async def collect():
+        return [event async for event in calendar_queries.iter_calendar_events(
+            time_min="2026-01-01T00:00:00Z", time_max="2026-01-02T00:00:00Z", **kwargs)]
+
+    return asyncio.run(collect())
+
+def test_follows_page_tokens_and_caps_page_size(monkeypatch):
+    """Short pages are followed with their token, asking only for the events still needed."""
+    backend = _backend(monkeypatch, PagedCalendar(count=10, page_size=3))
+    events = _collect(max_results=7)
+
+    assert [event["id"] for event in events] == [f"e{n}" for n in range(7)]
+    assert [r["maxResults"] for r in backend.requests] == [7, 4, 1]
+    assert [r.get("pageToken") for r in backend.requests] == [None, "3", "6"]
+    assert {r["fields"] for r in backend.requests} == {calendar_queries.LIST_FIELDS}
+
+def test_without_limit_reads_every_page(monkeypatch):
+    backend = _backend(monkeypatch, PagedCalendar(count=5, page_size=2))
+    events = _collect(max_results=None, search_query="event")
+
+    assert len(events) == 5
+    assert [r["maxResults"] for r in backend.requests] == [calendar_queries.MAX_PAGE_SIZE] * 3
+    assert backend.requests[0]["q"] == "event"
+    assert backend.requests[-1]["pageToken"] == "4"
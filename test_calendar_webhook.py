@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""
+Tests for the calendar push-notification webhook.
+A local stand-in for Google registers watch channels and posts change
+notifications to the HTTP app the way the Calendar API does, so no network
+access or credentials are needed.
+"""
+import asyncio
+import time
+
+from starlette.testclient import TestClient
+
+import server
+from adapter.calendar import mirror as calendar_mirror
+from adapter.calendar import watch as calendar_watch
+from middleware.result_cache import INVALIDATIONS
+
+class FakeGoogle:
+    """Stand-in for the Calendar API's watch endpoints and notification sender."""
+
+    def __init__(self, ttl=7 * 24 * 3600):
+        self.ttl = ttl
+        self.channels = {}
+        self.stopped = []
+
+    async def watch(self, body):
+        await asyncio.sleep(0.01)
+        expiration = int((time.time() + self.ttl) * 1000)
+        self.channels[body["id"]] = dict(body, expiration=expiration)
+        return {"id": body["id"], "resourceId": "primary-events", "expiration": str(expiration)}
+
+    async def stop_channel(self, body):
+        self.stopped.append(body["id"])
+        self.channels.pop(body["id"], None)
+
+    def notify(self, client, channel_id, state="exists", token=None):
+        channel = self.channels[channel_id]
+        return client.post(calendar_watch.WEBHOOK_PATH, headers={
+            "X-Goog-Channel-ID": channel_id,
+            "X-Goog-Channel-Token": channel["token"] if token is None else token,
+            "X-Goog-Resource-ID": "primary-events",
+            "X-Goog-Resource-State": state,
+            "X-Goog-Message-Number": "1",
+        })
+
+class RecordingMirror:
+    def __init__(self):
+        self.sync_requests = 0
+
+    def request_sync(self):
+        self.sync_requests += 1
+
+def _setup(monkeypatch, tmp_path, ttl=7 * 24 * 3600):
+    google = FakeGoogle(ttl)
+    watch = calendar_watch.CalendarWatch(address="https://example.com/calendar/notifications",
+                                         path=str(tmp_path / "calendar-watch.json"))
+    mirror = RecordingMirror()
+    monkeypatch.setattr(calendar_watch, "get_backend", lambda: google)
+    monkeypatch.setattr(calendar_watch, "_watch", watch)
+    monkeypatch.setattr(calendar_mirror, "get_mirror", lambda: mirror)
+    return google, watch, mirror
+
+def test_register_and_reuse_channel(monkeypatch, tmp_path):
+    """A live channel is registered once and reused by later checks and other processes."""
+    google, watch, _ = _setup(monkeypatch, tmp_path)
+    channel = asyncio.run(watch.ensure_channel())
+    assert list(google.channels) == [channel["id"]]
+    assert google.channels[channel["id"]]["address"] == watch.address
+    assert asyncio.run(watch.ensure_channel()) == channel
+
+    other_process = calendar_watch.CalendarWatch(address=watch.address, path=watch.path)
+    assert other_process.current_channel() == channel
+    assert other_process.token == watch.token
+
+def test_concurrent_workers_share_one_channel(monkeypatch, tmp_path):
+    """Workers registering at the same time end up with a single channel and token."""
+    google, watch, _ = _setup(monkeypatch, tmp_path)
+    workers = [watch] + [calendar_watch.CalendarWatch(address=watch.address, path=watch.path) for _ in range(3)]
+
+    async def register_all():
+        return await asyncio.gather(*(worker.ensure_channel() for worker in workers))
+
+    channels = asyncio.run(register_all())
+    assert len(google.channels) == 1
+    assert all(channel == channels[0] for channel in channels)
+    assert len({worker.token for worker in workers}) == 1
+    assert google.channels[channels[0]["id"]]["token"] == watch.token
+
+def test_channel_renewed_before_expiry(monkeypatch, tmp_path):
+    """A channel inside the renewal margin is replaced and the old one stopped."""
+    google, watch, _ = _setup(monkeypatch, tmp_path, ttl=calendar_watch.RENEW_MARGIN / 2)
+    first = asyncio.run(watch.ensure_channel())
+    google.ttl = 7 * 24 * 3600
+    second = asyncio.run(watch.ensure_channel())
+    assert second["id"] != first["id"]
+    assert google.stopped == [first["id"]]
+    assert list(google.channels) == [second["id"]]
+
+def test_notification_invalidates_and_syncs(monkeypatch, tmp_path):
+    """A change ping needs no bearer token, invalidates calendar caches and requests a sync."""
+    google, watch, mirror = _setup(monkeypatch, tmp_path)
+    channel = asyncio.run(watch.ensure_channel())
+    client = TestClient(server.create_http_app(server.create_mcp_server()))
+
+    before = INVALIDATIONS.value(tag="calendar")
+    assert google.notify(client, channel["id"], state="sync").status_code == 200
+    assert INVALIDATIONS.value(tag="calendar") == before
+    assert mirror.sync_requests == 0
+
+    assert google.notify(client, channel["id"]).status_code == 200
+    assert INVALIDATIONS.value(tag="calendar") == before + 1
+    assert mirror.sync_requests == 1
+
+def test_notification_with_wrong_token_rejected(monkeypatch, tmp_path):
+    """Notifications that do not carry the channel token are refused."""
+    google, watch, mirror = _setup(monkeypatch, tmp_path)
+    channel = asyncio.run(watch.ensure_channel())
+    client = TestClient(server.create_http_app(server.create_mcp_server()))
+
+    before = INVALIDATIONS.value(tag="calendar")
+    assert google.notify(client, channel["id"], token="forged").status_code == 403
+    assert INVALIDATIONS.value(tag="calendar") == before
+    assert mirror.sync_requests == 0
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Tests for negotiated response compression.
+The middleware wraps a small ASGI app and is driven with hand-built scopes;
+sent messages are collected in a list, so no server is needed.
+"""
+import asyncio
+import gzip
+import zlib
+
+import pytest
+
+from transport.compression import BROTLI_AVAILABLE, CompressionMiddleware, negotiate_encoding
+
+def _app(chunks, headers=()):
+    """ASGI app sending the given body chunks, the last without more_body."""
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json"), *headers]})
+        for n, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": n < len(chunks) - 1})
+    return app
+
+def _call(app, accept_encoding, minimum_size=100):
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(CompressionMiddleware(app, minimum_size=minimum_size)(scope, None, send))
+    return dict(sent[0]["headers"]), [message["body"] for message in sent[1:]]
+
+def test_negotiation_follows_q_values():
+    best = "br" if BROTLI_AVAILABLE else "gzip"
+    assert negotiate_encoding("gzip, br") == best
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.5") == "gzip"
+    assert negotiate_encoding("br;q=0, gzip") == "gzip"
+    assert negotiate_encoding("*") == best
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
+
+def test_small_response_is_sent_as_is_with_vary():
+    headers, bodies = _call(_app([b"x" * 99]), "gzip")
+    assert b"content-encoding" not in headers
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert bodies == [b"x" * 99]
+
+def test_response_without_acceptable_encoding_has_vary():
+    headers, bodies = _call(_app([b"x" * 500]), "identity")
+    assert b"content-encoding" not in headers
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert bodies == [b"x" * 500]
+
+def test_large_response_uses_negotiated_encoding():
+    body = b'{"items": [' + b'"x", ' * 200 + b"]}"
+
+    headers, bodies = _call(_app([body]), "gzip")
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert headers[b"content-length"] == str(len(bodies[0])).encode()
+    assert gzip.decompress(bodies[0]) == body
+
+@pytest.mark.skipif(not BROTLI_AVAILABLE, reason="brotli not installed")
+def test_brotli_preferred_when_accepted():
+    import brotli
+
+    body = b'{"items": [' + b'"x", ' * 200 + b"]}"
+    headers, bodies = _call(_app([body]), "gzip, br")
+    assert headers[b"content-encoding"] == b"br"
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert brotli.decompress(bodies[0]) == body
+
+def test_encoded_app_response_is_untouched():
+    headers, bodies = _call(_app([b"x" * 500], headers=[(b"content-encoding", b"gzip")]), "gzip")
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"vary" not in headers
+    assert bodies == [b"x" * 500]
+
+def test_streamed_chunks_are_flushed_one_by_one():
+    """Every compressed chunk decodes to its frame on arrival, before the stream ends."""
+    frames = [b'{"n": %d}\n' % n for n in range(3)]
+    headers, bodies = _call(_app(frames), "gzip", minimum_size=10_000)
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    decoder = zlib.decompressobj(31)
+    assert [decoder.decompress(chunk) for chunk in bodies[:-1]] == frames[:-1]
+    assert decoder.decompress(bodies[-1]) == frames[-1]
+    assert decoder.eof
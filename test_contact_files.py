@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Tests for writes to the shared contacts and alias files.
+The files live in a temporary directory; another holder of the file lock is
+simulated with a thread.
+"""
+import asyncio
+import threading
+
+from adapter.common.shared_file import file_lock
+from adapter.contacts import fallback, resolution
+
+def _hold_lock(path, seconds):
+    """Hold a file's lock on another thread, as another worker would."""
+    locked, release = threading.Event(), threading.Event()
+
+    def hold():
+        with file_lock(path):
+            locked.set()
+            release.wait(seconds)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    locked.wait()
+    return thread, release
+
+def _ticks_while(coro):
+    """Run coro and count how often the event loop got to run something else meanwhile."""
+    async def scenario():
+        ticks = 0
+        task = asyncio.ensure_future(coro)
+        while not task.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+        return task.result(), ticks
+
+    return asyncio.run(scenario())
+
+def test_contact_write_waits_for_lock_off_the_loop(monkeypatch, tmp_path):
+    path = str(tmp_path / "fallback-contacts.json")
+    monkeypatch.setattr(fallback, "FALLBACK_CONTACTS_PATH", path)
+    monkeypatch.setattr(fallback, "FALLBACK_CONTACTS", list(fallback.DEFAULT_FALLBACK_CONTACTS))
+    monkeypatch.setattr(fallback, "_loaded_signature", None)
+
+    thread, release = _hold_lock(path, 0.2)
+    try:
+        result, ticks = _ticks_while(fallback.add_fallback_contact("Ada", "ada@example.com"))
+    finally:
+        release.set()
+        thread.join()
+    assert result["status"] == "success"
+    assert ticks > 5
+    assert fallback.FALLBACK_CONTACTS[-1] == {"name": "Ada", "email": "ada@example.com"}
+
+def test_alias_write_waits_for_lock_off_the_loop(monkeypatch, tmp_path):
+    path = str(tmp_path / "name-aliases.json")
+    monkeypatch.setattr(resolution, "NAME_ALIASES_PATH", path)
+    monkeypatch.setattr(resolution, "name_aliases", {})
+    monkeypatch.setattr(resolution, "_aliases_signature", None)
+
+    thread, release = _hold_lock(path, 0.2)
+    try:
+        result, ticks = _ticks_while(resolution.add_name_alias("Ada", "ada@example.com"))
+    finally:
+        release.set()
+        thread.join()
+    assert result["status"] == "success"
+    assert ticks > 5
+
+    deleted = asyncio.run(resolution.delete_name_alias("ada"))
+    assert deleted["email"] == "ada@example.com"
+    assert resolution.name_aliases == {}
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+"""
+Tests for idempotency keys on write tools.
+Tools are registered through the real pipeline with the shared store pointed
+at a temporary file; the cross-process test runs two server-like processes
+against the same store.
+"""
+import asyncio
+import importlib
+import json
+import os
+import subprocess
+import sys
+import threading
+
+from mcp.server.fastmcp import FastMCP
+
+from middleware import IdempotencyConflict, tool_registrar
+from middleware.idempotency import IdempotencyStore, call_fingerprint, store
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The module, not the layer function the middleware package exports under the same name
+idempotency_module = importlib.import_module("middleware.idempotency")
+
+def _use_store(monkeypatch, tmp_path):
+    path = str(tmp_path / "idempotency-keys.json")
+    monkeypatch.setattr(store, "path", path)
+    monkeypatch.setattr(store, "_entries", {})
+    monkeypatch.setattr(store, "_signature", None)
+    return path
+
+def _counting_tool(result=None):
+    tool = tool_registrar(FastMCP("test"))
+    calls = []
+
+    @tool(idempotent=True)
+    async def record_write(value: str) -> dict:
+        calls.append(value)
+        return result or {"status": "success", "value": value, "call": len(calls)}
+
+    return record_write, calls
+
+def test_retry_replays_stored_result(monkeypatch, tmp_path):
+    """A retry with the same key returns the first result without calling the tool again."""
+    _use_store(monkeypatch, tmp_path)
+    record_write, calls = _counting_tool()
+
+    first = asyncio.run(record_write("a", idempotency_key="k1"))
+    again = asyncio.run(record_write("a", idempotency_key="k1"))
+    assert again == first
+    assert calls == ["a"]
+
+    asyncio.run(record_write("a"))
+    asyncio.run(record_write("a", idempotency_key="k2"))
+    assert calls == ["a", "a", "a"]
+
+def test_key_reused_with_different_arguments(monkeypatch, tmp_path):
+    """Reusing a key with other arguments is rejected."""
+    _use_store(monkeypatch, tmp_path)
+    record_write, calls = _counting_tool()
+
+    asyncio.run(record_write("a", idempotency_key="k1"))
+    try:
+        asyncio.run(record_write("b", idempotency_key="k1"))
+    except IdempotencyConflict:
+        pass
+    else:
+        raise AssertionError("conflicting reuse was accepted")
+    assert calls == ["a"]
+
+def test_error_result_not_stored(monkeypatch, tmp_path):
+    """A call that returned an error releases its key, so a retry runs again."""
+    _use_store(monkeypatch, tmp_path)
+    record_write, calls = _counting_tool(result={"status": "error", "message": "upstream failed"})
+
+    asyncio.run(record_write("a", idempotency_key="k1"))
+    asyncio.run(record_write("a", idempotency_key="k1"))
+    assert calls == ["a", "a"]
+    assert store.get("stdio:k1") is None
+
+def test_waits_for_call_running_in_another_worker(monkeypatch, tmp_path):
+    """A retry finding another worker's pending claim waits for and returns its result."""
+    path = _use_store(monkeypatch, tmp_path)
+    record_write, calls = _counting_tool()
+    other_worker = IdempotencyStore(path)
+    fingerprint = call_fingerprint("record_write", ("a",), {})
+    assert other_worker.claim("stdio:k1", fingerprint) is None
+
+    finish = threading.Timer(0.3, other_worker.put, ("stdio:k1", fingerprint, {"status": "success", "by": "other"}))
+    finish.start()
+    try:
+        assert asyncio.run(record_write("a", idempotency_key="k1")) == {"status": "success", "by": "other"}
+    finally:
+        finish.join()
+    assert calls == []
+
+def test_gives_up_waiting_for_stuck_call(monkeypatch, tmp_path):
+    """A pending claim that does not finish in time is rejected rather than run twice."""
+    path = _use_store(monkeypatch, tmp_path)
+    monkeypatch.setattr(idempotency_module, "IDEMPOTENCY_WAIT", 0.2)
+    record_write, calls = _counting_tool()
+    IdempotencyStore(path).claim("stdio:k1", call_fingerprint("record_write", ("a",), {}))
+
+    try:
+        asyncio.run(record_write("a", idempotency_key="k1"))
+    except IdempotencyConflict as e:
+        assert "in progress" in str(e)
+    else:
+        raise AssertionError("call ran while another worker held the key")
+    assert calls == []
+
+WORKER = """
+import asyncio, json, sys
+from mcp.server.fastmcp import FastMCP
+from middleware import tool_registrar
+from middleware.idempotency import store
+
+store.path, log_path = sys.argv[1], sys.argv[2]
+tool = tool_registrar(FastMCP("worker"))
+
+@tool(idempotent=True)
+async def record_write(value: str) -> dict:
+    with open(log_path, "a") as f:
+        f.write(value + "\\n")
+    await asyncio.sleep(0.5)
+    return {"status": "success", "value": value}
+
+print("ready", flush=True)
+sys.stdin.readline()
+print(json.dumps(asyncio.run(record_write("a", idempotency_key="k1"))), flush=True)
+"""
+
+def test_concurrent_retry_in_two_processes_runs_once(tmp_path):
+    """The same key sent to two workers at once performs the write once."""
+    store_path, log_path = str(tmp_path / "keys.json"), str(tmp_path / "writes.log")
+    workers = [
+        subprocess.Popen([sys.executable, "-c", WORKER, store_path, log_path], cwd=SERVER_DIR,
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        for _ in range(2)
+    ]
+    try:
+        for worker in workers:
+            assert worker.stdout.readline().strip() == "ready"
+        for worker in workers:
+            worker.stdin.write("go\n")
+            worker.stdin.flush()
+        results = [json.loads(worker.stdout.readline()) for worker in workers]
+    finally:
+        for worker in workers:
+            worker.stdin.close()
+            worker.wait(timeout=10)
+
+    assert results[0] == results[1] == {"status": "success", "value": "a"}
+    with open(log_path) as f:
+        assert f.read().splitlines() == ["a"]
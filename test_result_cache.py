@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+"""
+Tests for the read-only tool layers: result cache and singleflight.
+Tools are registered through the real pipeline on a throwaway FastMCP server
+and called directly, so no transport or upstream is involved.
+"""
+import asyncio
+import importlib
+import types
+
+from mcp.server.fastmcp import FastMCP
+
+from middleware import tool_registrar
+from middleware.result_cache import ResultCache
+from middleware.singleflight import HITS, MISSES, singleflight
+
+# The module, not the layer function the middleware package exports under the same name
+result_cache_module = importlib.import_module("middleware.result_cache")
+
+def _registrar():
+    return tool_registrar(FastMCP("test"))
+
+def _clock(monkeypatch):
+    """Replace the cache's clock with one the test advances by hand."""
+    clock = types.SimpleNamespace(now=1000.0)
+    clock.monotonic = lambda: clock.now
+    monkeypatch.setattr(result_cache_module, "time", clock)
+    return clock
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = _clock(monkeypatch)
+    tool = _registrar()
+    calls = []
+
+    @tool(read_only=True, ttl=30)
+    async def read_ttl_value(n: int):
+        calls.append(n)
+        return {"n": n, "call": len(calls)}
+
+    assert asyncio.run(read_ttl_value(1)) == {"n": 1, "call": 1}
+    clock.now += 29
+    assert asyncio.run(read_ttl_value(1)) == {"n": 1, "call": 1}
+    clock.now += 2
+    assert asyncio.run(read_ttl_value(1)) == {"n": 1, "call": 2}
+    assert calls == [1, 1]
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache("lru_test", ttl=60, max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") is not None  # "b" is now the least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a")[1] == 1
+    assert cache.get("c")[1] == 3
+
+def test_successful_write_invalidates_tagged_reads():
+    tool = _registrar()
+    state = {"v": 1}
+
+    @tool(read_only=True, ttl=60, tags=("inval",))
+    async def read_tagged_value():
+        return {"v": state["v"]}
+
+    @tool(read_only=True, ttl=60, tags=("other",))
+    async def read_untagged_value():
+        return {"v": state["v"]}
+
+    @tool(invalidates=("inval",))
+    async def write_tagged_value(v: int, fail: bool = False):
+        state["v"] = v
+        return {"status": "error", "message": "rejected"} if fail else {"status": "success"}
+
+    async def scenario():
+        await read_tagged_value()
+        await read_untagged_value()
+        # An error result means nothing changed, so the cache is kept
+        await write_tagged_value(2, fail=True)
+        kept = await read_tagged_value()
+        await write_tagged_value(3)
+        return kept, await read_tagged_value(), await read_untagged_value()
+
+    kept, fresh, other = asyncio.run(scenario())
+    assert kept == {"v": 1}
+    assert fresh == {"v": 3}
+    # Tools without the tag keep their entries
+    assert other == {"v": 1}
+
+def test_read_after_write_does_not_join_stale_flight():
+    """A read starting after a write gets fresh data, and the pre-write result is not cached."""
+    tool = _registrar()
+    state = {"v": "old"}
+    calls = []
+
+    @tool(read_only=True, ttl=60, tags=("race",))
+    async def read_race_value():
+        calls.append(state["v"])
+        value = state["v"]
+        await asyncio.sleep(0.05)
+        return {"v": value}
+
+    @tool(invalidates=("race",))
+    async def write_race_value(v: str):
+        state["v"] = v
+        return {"status": "success"}
+
+    async def scenario():
+        before = asyncio.ensure_future(read_race_value())
+        await asyncio.sleep(0.01)
+        await write_race_value("new")
+        after = await asyncio.gather(read_race_value(), read_race_value())
+        await before
+        return after, await read_race_value()
+
+    after, cached = asyncio.run(scenario())
+    assert after == [{"v": "new"}, {"v": "new"}]
+    assert cached == {"v": "new"}
+    # One flight before the write, one shared by both reads after it, then a cache hit
+    assert calls == ["old", "new"]
+
+def test_concurrent_identical_reads_share_one_call():
+    tool = tool_registrar(FastMCP("test"), layers=[singleflight])
+    calls = []
+
+    @tool(read_only=True)
+    async def read_shared_value(n: int):
+        calls.append(n)
+        await asyncio.sleep(0.02)
+        return {"n": n}
+
+    hits, misses = HITS.value(tool="read_shared_value"), MISSES.value(tool="read_shared_value")
+
+    async def scenario():
+        return await asyncio.gather(*(read_shared_value(1) for _ in range(5)), read_shared_value(2))
+
+    results = asyncio.run(scenario())
+    assert results == [{"n": 1}] * 5 + [{"n": 2}]
+    assert calls == [1, 2]
+    assert HITS.value(tool="read_shared_value") == hits + 4
+    assert MISSES.value(tool="read_shared_value") == misses + 2
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    tool = tool_registrar(FastMCP("test"), layers=[singleflight])
+    finished = []
+
+    @tool(read_only=True)
+    async def read_slow_value():
+        await asyncio.sleep(0.05)
+        finished.append(True)
+        return {"v": 1}
+
+    async def scenario():
+        first = asyncio.ensure_future(read_slow_value())
+        second = asyncio.ensure_future(read_slow_value())
+        await asyncio.sleep(0.01)
+        first.cancel()
+        result = await second
+        try:
+            await first
+        except asyncio.CancelledError:
+            pass
+        else:
+            raise AssertionError("the cancelled caller got a result")
+        return result
+
+    assert asyncio.run(scenario()) == {"v": 1}
+    assert finished == [True]
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Tests for JSON-RPC dispatch over the compiled tool table.
+Tools are registered on a bare FastMCP server, so calls run without the
+middleware pipeline.
+"""
+import asyncio
+
+from mcp.server.fastmcp import FastMCP
+
+from transport.auth import Principal, current_principal
+from transport.rpc import (
+    FORBIDDEN,
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    RpcDispatcher,
+    build_dispatch_table,
+)
+
+def _dispatcher(**kwargs):
+    mcp = FastMCP("test")
+
+    @mcp.tool()
+    async def echo(text: str, delay: float = 0) -> str:
+        await asyncio.sleep(delay)
+        return text
+
+    @mcp.tool()
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    return RpcDispatcher(mcp, **kwargs)
+
+def _request(request_id, method, params=None):
+    message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+    if params is not None:
+        message["params"] = params
+    return message
+
+def test_dispatch_table_compiles_every_tool():
+    mcp = FastMCP("test")
+
+    @mcp.tool()
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    table = build_dispatch_table(mcp)
+    assert list(table) == ["add"]
+    assert table["add"].is_async is False
+    assert asyncio.run(table["add"].call({"a": 1, "b": "2"})) == 3
+
+def test_call_forms():
+    """Tools answer both tools/call and a direct call by name."""
+    dispatcher = _dispatcher()
+    by_name = asyncio.run(dispatcher.handle(_request(1, "add", {"a": 1, "b": 2})))
+    via_call = asyncio.run(dispatcher.handle(_request(2, "tools/call", {"name": "add", "arguments": {"a": 1, "b": 2}})))
+    assert by_name == {"jsonrpc": "2.0", "id": 1, "result": 3}
+    assert via_call == {"jsonrpc": "2.0", "id": 2, "result": 3}
+
+    listed = asyncio.run(dispatcher.handle(_request(3, "tools/list")))
+    assert [tool["name"] for tool in listed["result"]["tools"]] == ["echo", "add"]
+
+def test_batch_keeps_request_order():
+    """Entries finishing out of order are still answered in request order."""
+    dispatcher = _dispatcher(batch_concurrency=3)
+    batch = [_request(n, "echo", {"text": str(n), "delay": 0.03 * (3 - n)}) for n in range(3)]
+    responses = asyncio.run(dispatcher.handle_payload(batch))
+    assert [(r["id"], r["result"]) for r in responses] == [(0, "0"), (1, "1"), (2, "2")]
+
+def test_notifications_get_no_response():
+    dispatcher = _dispatcher()
+    notification = {"jsonrpc": "2.0", "method": "echo", "params": {"text": "x"}}
+    assert asyncio.run(dispatcher.handle_payload(notification)) is None
+    assert asyncio.run(dispatcher.handle_payload([notification, notification])) is None
+
+    responses = asyncio.run(dispatcher.handle_payload([notification, _request(1, "echo", {"text": "y"})]))
+    assert responses == [{"jsonrpc": "2.0", "id": 1, "result": "y"}]
+
+def test_empty_batch_is_invalid():
+    response = asyncio.run(_dispatcher().handle_payload([]))
+    assert response["id"] is None
+    assert response["error"]["code"] == INVALID_REQUEST
+
+def test_errors_stay_in_their_batch_slot():
+    dispatcher = _dispatcher()
+    responses = asyncio.run(dispatcher.handle_payload([
+        _request(1, "add", {"a": 1}),
+        _request(2, "missing"),
+        _request(3, "add", [1, 2]),
+        "not a request",
+        _request(5, "add", {"a": 2, "b": 3}),
+    ]))
+    assert [r["id"] for r in responses] == [1, 2, 3, None, 5]
+    assert responses[0]["error"]["code"] == INVALID_PARAMS
+    assert responses[0]["error"]["data"][0]["loc"] == ("b",)
+    assert responses[1]["error"]["code"] == METHOD_NOT_FOUND
+    assert responses[2]["error"]["code"] == INVALID_PARAMS
+    assert responses[3]["error"]["code"] == INVALID_REQUEST
+    assert responses[4]["result"] == 5
+
+def test_scopes_limit_callable_tools():
+    dispatcher = _dispatcher()
+
+    async def call_as(principal, message):
+        current_principal.set(principal)
+        return await dispatcher.handle(message)
+
+    reader = Principal("reader", frozenset({"ech*"}))
+    allowed = asyncio.run(call_as(reader, _request(1, "echo", {"text": "hi"})))
+    denied = asyncio.run(call_as(reader, _request(2, "tools/call", {"name": "add", "arguments": {"a": 1, "b": 2}})))
+    assert allowed["result"] == "hi"
+    assert denied["error"]["code"] == FORBIDDEN
+    assert "reader" in denied["error"]["message"]
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+Startup tests for the stdio transport.
+Spawns `server.py --stdio-only` the way Claude Desktop does and measures the
+time until the first tools/list response. Also checks that building the tool
+registry does not import HTTP or Google client libraries.
+
+Startup takes about 0.7s; the default budget leaves room for slow CI
+machines and can be tightened with MCP_STARTUP_BUDGET.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Maximum seconds from process spawn to the first tools/list response
+STARTUP_BUDGET = float(os.environ.get("MCP_STARTUP_BUDGET", "3"))
+
+# Modules that must only be imported when a tool or HTTP transport needs them
+LAZY_MODULES = [
+    "fastapi",
+    "googleapiclient",
+    "google_auth_oauthlib",
+    "fuzzywuzzy",
+    "tools.calendar",
+    "tools.contacts",
+    "tools.weather",
+]
+
+def _send(proc, message):
+    proc.stdin.write(json.dumps(message) + "\n")
+    proc.stdin.flush()
+
+def _read_response(proc, request_id):
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError("Server closed stdout before responding")
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if message.get("id") == request_id:
+            return message
+
+def measure_time_to_tools_list():
+    """Spawn the stdio server and return (seconds to first tools/list, tool count)."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "server.py", "--stdio-only"],
+        cwd=SERVER_DIR,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        _send(proc, {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "initialize",
+            "params": {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {},
+                "clientInfo": {"name": "startup-test", "version": "1.0"},
+            },
+        })
+        _read_response(proc, 1)
+        _send(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        _send(proc, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        response = _read_response(proc, 2)
+        elapsed = time.perf_counter() - start
+        return elapsed, len(response["result"]["tools"])
+    finally:
+        proc.stdin.close()
+        proc.wait(timeout=10)
+
+def test_time_to_first_tools_list():
+    """The stdio server answers tools/list within the startup budget."""
+    elapsed, tool_count = measure_time_to_tools_list()
+    assert tool_count > 0
+    assert elapsed < STARTUP_BUDGET, f"startup took {elapsed:.3f}s, budget is {STARTUP_BUDGET}s"
+
+def test_registry_does_not_import_heavy_modules():
+    """Building the tool registry leaves tool modules and heavy dependencies unimported."""
+    code = (
+        "import asyncio, json, sys\n"
+        "import server\n"
+        "asyncio.run(server.create_mcp_server().list_tools())\n"
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=SERVER_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    assert loaded == [], f"imported at startup: {loaded}"
+
+if __name__ == "__main__":
+    elapsed, tool_count = measure_time_to_tools_list()
+    print(f"Time to first tools/list: {elapsed:.3f}s ({tool_count} tools), budget {STARTUP_BUDGET}s")
+    sys.exit(0 if elapsed < STARTUP_BUDGET else 1)
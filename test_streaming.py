@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+Tests for streamed tool results.
+Streams must go through the same admission and metrics as regular calls.
+"""
+import asyncio
+
+from mcp.server.fastmcp import FastMCP
+from starlette.testclient import TestClient
+
+import server
+from adapter.common.metrics import TOOL_CALLS, TOOL_IN_FLIGHT
+from middleware import tool_registrar
+from middleware.admission import TokenBucket, _buckets
+from transport.rpc import RATE_LIMITED, RpcDispatcher, RpcError
+
+def test_stream_rate_limited_over_http(monkeypatch):
+    """A streamed call to an exhausted upstream is rejected with 429 before any item is produced."""
+    monkeypatch.setitem(_buckets, ("upstream", "google_calendar"),
+                        TokenBucket("upstream", "google_calendar", rate=1, burst=0, max_queue=0))
+    client = TestClient(server.create_http_app(server.create_mcp_server()))
+    response = client.post(
+        "/rpc",
+        json={"jsonrpc": "2.0", "id": 1, "method": "list_calendar_events", "params": {}},
+        headers={"Authorization": f"Bearer {server.API_TOKEN}", "Accept": "application/x-ndjson"},
+    )
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.json()["error"]["code"] == RATE_LIMITED
+
+def test_stream_admitted_and_metered(monkeypatch):
+    """Opening a stream takes an admission token; the call is in flight until the stream closes."""
+    mcp = FastMCP("test")
+    tool = tool_registrar(mcp)
+
+    @tool(upstream="stream_test")
+    async def count_items(n: int) -> list:
+        return list(range(n))
+
+    async def iter_items(n: int):
+        for i in range(n):
+            yield i
+
+    monkeypatch.setitem(_buckets, ("upstream", "stream_test"),
+                        TokenBucket("upstream", "stream_test", rate=0.001, burst=1, max_queue=0))
+    dispatcher = RpcDispatcher(mcp, streams={"count_items": iter_items})
+    message = {"jsonrpc": "2.0", "id": 1, "method": "count_items", "params": {"n": 3}}
+
+    async def scenario():
+        calls = TOOL_CALLS.value(tool="count_items")
+        items = await dispatcher.open_stream(message)
+        assert TOOL_IN_FLIGHT.value(tool="count_items") == 1
+        assert [item async for item in items] == [0, 1, 2]
+        assert TOOL_IN_FLIGHT.value(tool="count_items") == 0
+        assert TOOL_CALLS.value(tool="count_items") == calls + 1
+
+        # The only token went to the first stream
+        try:
+            await dispatcher.open_stream(message)
+        except RpcError as e:
+            assert e.code == RATE_LIMITED
+        else:
+            raise AssertionError("second stream was admitted")
+
+    asyncio.run(scenario())
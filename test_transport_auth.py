@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Tests for bearer token authentication on the HTTP transport.
+AuthMiddleware wraps a minimal ASGI app that echoes the authenticated
+principal, so no server process is needed.
+"""
+import hashlib
+import json
+
+from starlette.testclient import TestClient
+
+from transport.auth import EXEMPT_PATHS, AuthMiddleware, TokenTable, current_principal
+
+async def _echo_principal(scope, receive, send):
+    principal = current_principal.get()
+    body = json.dumps({"principal": principal.name if principal else None}).encode("utf-8")
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": body})
+
+def _client(table):
+    return TestClient(AuthMiddleware(_echo_principal, table))
+
+def _table():
+    table = TokenTable()
+    table.add("orchestrator", ["*"], token="s3cret")
+    table.add("dashboard", ["list_*"], digest=hashlib.sha256(b"dash-token").digest())
+    table.add("unicode", ["*"], token="tøken-ü")
+    return table
+
+def test_missing_or_wrong_token_is_rejected():
+    client = _client(_table())
+    for headers in ({}, {"Authorization": "Basic s3cret"}, {"Authorization": "Bearer wrong"}):
+        response = client.post("/rpc", headers=headers)
+        assert response.status_code == 401
+        assert response.headers["www-authenticate"] == "Bearer"
+    assert client.post("/rpc", headers={"Authorization": "Bearer wrong"}).json() == {"detail": "Invalid authorization token"}
+
+def test_valid_tokens_identify_their_principal():
+    client = _client(_table())
+    assert client.post("/rpc", headers={"Authorization": "Bearer s3cret"}).json() == {"principal": "orchestrator"}
+    # Entry configured by its SHA-256 digest only
+    assert client.post("/rpc", headers={"Authorization": "Bearer dash-token"}).json() == {"principal": "dashboard"}
+
+def test_non_ascii_token_matches():
+    """Tokens are hashed as UTF-8 on both sides."""
+    client = _client(_table())
+    response = client.post("/rpc", headers={"Authorization": "Bearer tøken-ü".encode("utf-8")})
+    assert response.json() == {"principal": "unicode"}
+    assert client.post("/rpc", headers={"Authorization": b"Bearer \xff\xfe"}).status_code == 401
+
+def test_exempt_paths_need_no_token():
+    client = _client(_table())
+    for path in EXEMPT_PATHS:
+        response = client.get(path)
+        assert response.status_code == 200
+        assert response.json() == {"principal": None}
+    assert client.get("/health/extra").status_code == 401
+
+def test_table_from_env(monkeypatch):
+    monkeypatch.setenv("MCP_API_TOKENS", json.dumps({
+        "orchestrator": {"token": "s3cret"},
+        "dashboard": {"sha256": hashlib.sha256(b"dash-token").hexdigest(), "scopes": ["list_*"]},
+    }))
+    table = TokenTable.from_env(default_token="ignored")
+    assert len(table) == 2
+    assert table.verify("s3cret").scopes == frozenset({"*"})
+    dashboard = table.verify("dash-token")
+    assert dashboard.allows("list_calendar_events") and not dashboard.allows("delete_calendar_event")
+    assert table.verify("ignored") is None
+
+    monkeypatch.delenv("MCP_API_TOKENS")
+    fallback = TokenTable.from_env(default_token="single")
+    assert fallback.verify("single").name == "default"
+    assert len(TokenTable.from_env()) == 0
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+"""
+Tests for startup warmup and the readiness it reports.
+Warmup runs stand-in steps, so no credentials or files are needed.
+"""
+import asyncio
+
+from adapter.common.warmup import Warmup
+
+def test_unavailable_upstream_does_not_block_readiness():
+    warmup = Warmup(steps=[("files", lambda: True), ("calendar_service", lambda: False)])
+    asyncio.run(warmup.run())
+
+    status = warmup.status()
+    assert status["status"] == "ready"
+    assert status["steps"]["calendar_service"]["status"] == "unavailable"
+
+def test_failed_step_blocks_readiness_until_retry_succeeds():
+    attempts = []
+
+    def flaky_step():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("contacts file locked")
+        return True
+
+    warmup = Warmup(steps=[("files", lambda: True), ("contact_files", flaky_step)], retry_delay=0.05)
+
+    async def scenario():
+        task = asyncio.create_task(warmup.run())
+        await asyncio.sleep(0.02)
+        failing = warmup.status()
+        ready_now = warmup.ready
+        await task
+        return failing, ready_now
+
+    failing, ready_now = asyncio.run(scenario())
+    assert not ready_now
+    assert failing["status"] == "failed"
+    assert failing["steps"]["contact_files"]["status"] == "error: contacts file locked"
+    assert warmup.status()["status"] == "ready"
+    assert warmup.status()["steps"]["contact_files"]["status"] == "ok"
+    assert len(attempts) == 2
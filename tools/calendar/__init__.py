@@ -1,15 +1,20 @@
+from .bulk_events import bulk_create_events, bulk_delete_events, bulk_update_events
 from .create_event import create_event
 from .delete_event import delete_event
 from .find_and_delete_event import find_and_delete_event
 from .find_and_update_event import find_and_update_event
-from .list_events import list_events
+from .list_events import list_events, iter_events
 from .update_event import update_event
 
 __all__ = [
+    "bulk_create_events",
+    "bulk_delete_events",
+    "bulk_update_events",
     "create_event",
     "delete_event",
     "find_and_delete_event",
     "find_and_update_event",
     "list_events",
+    "iter_events",
     "update_event"
 ]
\ No newline at end of file
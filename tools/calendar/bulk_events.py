@@ -0,0 +1,38 @@
+from adapter.calendar.batch import send_bulk_create_request, send_bulk_delete_request, send_bulk_update_request
+
+async def bulk_create_events(events: list) -> dict:
+    """
+    Create many calendar events in batch requests.
+    
+    Args:
+        events: Event dicts with summary, start_time, end_time and optional
+            description, location and attendees
+        
+    Returns:
+        Dictionary with a result per event and totals
+    """
+    return await send_bulk_create_request(events)
+
+async def bulk_update_events(updates: list) -> dict:
+    """
+    Update many calendar events in batch requests.
+    
+    Args:
+        updates: Dicts with event_id and the fields to change
+        
+    Returns:
+        Dictionary with a result per event and totals
+    """
+    return await send_bulk_update_request(updates)
+
+async def bulk_delete_events(event_ids: list) -> dict:
+    """
+    Delete many calendar events in batch requests.
+    
+    Args:
+        event_ids: IDs of the events to delete
+        
+    Returns:
+        Dictionary with a result per event and totals
+    """
+    return await send_bulk_delete_request(event_ids)
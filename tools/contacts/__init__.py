@@ -2,7 +2,7 @@ from .search_person import search_person
 from .add_name_alias import add_name_alias
 from .select_contact import select_contact
 from .list_name_aliases import list_name_aliases
-from .list_contacts import list_contacts
+from .list_contacts import list_contacts, iter_contacts
 from .edit_contact import edit_contact
 from .add_contact import add_contact
 from .delete_contact import delete_contact
@@ -13,6 +13,7 @@ __all__ = [
     "select_contact",
     "list_name_aliases",
     "list_contacts",
+    "iter_contacts",
     "edit_contact",
     "add_contact",
     "delete_contact"
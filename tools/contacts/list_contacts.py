@@ -2,8 +2,14 @@
 Tool to list all available contacts from both directory and fallback sources.
 """
 
+import logging
+
+from adapter.contacts.directory_api import iter_directory_contacts
+from adapter.contacts.fallback import get_all_fallback_contacts
 from adapter.contacts.resolution import list_all_contacts as get_all_contacts
 
+logger = logging.getLogger(__name__)
+
 async def list_contacts():
     """
     List all available contacts from both directory and fallback sources.
@@ -12,3 +18,19 @@ async def list_contacts():
         Dictionary with contacts grouped by source (directory and fallback)
     """
     return await get_all_contacts()
+
+async def iter_contacts():
+    """
+    Yield all available contacts one at a time, directory contacts first.
+    
+    Directory contacts are yielded as each result page arrives. Each contact
+    carries its "source" ("directory" or "fallback").
+    """
+    try:
+        async for contact in iter_directory_contacts():
+            yield contact
+    except Exception as e:
+        # As in list_contacts, a directory failure still leaves the fallback contacts
+        logger.error(f"Error fetching directory contacts: {e}")
+    for contact in get_all_fallback_contacts():
+        yield contact
@@ -1,5 +1,9 @@
+import logging
+
 from adapter.weather import fetch_alerts_from_api
 
+logger = logging.getLogger(__name__)
+
 def format_alert(feature: dict) -> str:
     """Format an alert feature into a readable string."""
     props = feature["properties"]
@@ -29,7 +33,7 @@ async def get_alerts(state: str) -> str:
             try:
                 alerts.append(format_alert(feature))
             except Exception as feature_err:
-                print(f"Error formatting alert: {feature_err}")
+                logger.error(f"Error formatting alert: {feature_err}")
                 # Continue processing other alerts
                 
         if not alerts:
@@ -0,0 +1,6 @@
+"""
+Transport layer for exposing MCP tools over HTTP.
+"""
+
+from transport.rpc import RpcDispatcher, RpcError, build_dispatch_table
+from transport.auth import AuthMiddleware, Principal, TokenTable, current_principal
@@ -0,0 +1,201 @@
+"""
+Bearer token authentication for the HTTP transport.
+
+AuthMiddleware is a plain ASGI middleware: it checks the Authorization header
+once per request, without wrapping or buffering the request body. Tokens are
+held only as SHA-256 digests and compared in constant time.
+
+Tokens are configured through the MCP_API_TOKENS environment variable as a
+JSON object mapping a token name to its secret and scopes, e.g.
+
+    {"orchestrator": {"token": "...", "scopes": ["*"]},
+     "dashboard": {"sha256": "<hex digest>", "scopes": ["list_*", "get_weather_*"]}}
+
+Scopes are tool/method names or fnmatch patterns; "*" allows everything. When
+MCP_API_TOKENS is unset, the single MCP_API_TOKEN is accepted with scope "*".
+"""
+
+import contextvars
+import fnmatch
+import hashlib
+import hmac
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+# Paths that never require a token, matched exactly
+EXEMPT_PATHS = frozenset({
+    "/",
+    "/health",
+    "/ready",
+    "/docs",
+    "/docs/oauth2-redirect",
+    "/redoc",
+    "/openapi.json",
+})
+
+# Principal authenticated for the request being handled, if any
+current_principal = contextvars.ContextVar("current_principal", default=None)
+
+
+@dataclass
+class Principal:
+    """An authenticated API token and the methods it may call."""
+
+    name: str
+    scopes: frozenset
+    _allowed: dict = field(default_factory=dict, repr=False, compare=False)
+
+    def allows(self, method: str) -> bool:
+        """
+        Check whether this principal may call a method.
+
+        Args:
+            method: JSON-RPC method or tool name
+
+        Returns:
+            True if one of the principal's scopes matches the method
+        """
+        allowed = self._allowed.get(method)
+        if allowed is None:
+            allowed = "*" in self.scopes or method in self.scopes or any(
+                fnmatch.fnmatchcase(method, scope) for scope in self.scopes
+            )
+            self._allowed[method] = allowed
+        return allowed
+
+
+def hash_token(token: str) -> bytes:
+    """Return the SHA-256 digest used to store and compare a token."""
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class TokenTable:
+    """Hashed table of accepted API tokens."""
+
+    def __init__(self):
+        self._entries = []
+
+    def add(self, name: str, scopes, token: str = None, digest: bytes = None):
+        """
+        Register a token by its plaintext or its precomputed SHA-256 digest.
+
+        Args:
+            name: Name identifying the token in logs and metrics
+            scopes: Iterable of scopes granted to the token
+            token: Plaintext token (optional if digest is given)
+            digest: SHA-256 digest of the token (optional if token is given)
+        """
+        if digest is None:
+            if not token:
+                raise ValueError(f"Token '{name}' needs a 'token' or 'sha256' value")
+            digest = hash_token(token)
+        self._entries.append((digest, Principal(name, frozenset(scopes))))
+
+    def verify(self, token: str):
+        """
+        Look up the principal for a presented token.
+
+        Every entry is compared with hmac.compare_digest and the loop never
+        exits early, so timing does not depend on which entry matched.
+
+        Args:
+            token: Token taken from the Authorization header
+
+        Returns:
+            The matching Principal, or None if the token is not accepted
+        """
+        digest = hash_token(token)
+        match = None
+        for entry_digest, principal in self._entries:
+            if hmac.compare_digest(entry_digest, digest):
+                match = principal
+        return match
+
+    def __len__(self):
+        return len(self._entries)
+
+    @classmethod
+    def from_env(cls, default_token: str = None):
+        """
+        Build the token table from MCP_API_TOKENS, falling back to a single token.
+
+        Args:
+            default_token: Token accepted with scope "*" when MCP_API_TOKENS is unset
+
+        Returns:
+            A populated TokenTable
+        """
+        table = cls()
+        raw = os.environ.get("MCP_API_TOKENS")
+        if raw:
+            for name, spec in json.loads(raw).items():
+                digest = bytes.fromhex(spec["sha256"]) if "sha256" in spec else None
+                table.add(name, spec.get("scopes", ["*"]), token=spec.get("token"), digest=digest)
+        elif default_token:
+            table.add("default", ["*"], token=default_token)
+        return table
+
+
+def _json_body(detail: str) -> bytes:
+    return json.dumps({"detail": detail}).encode("utf-8")
+
+
+_MISSING_TOKEN_BODY = _json_body("Invalid or missing authorization token")
+_INVALID_TOKEN_BODY = _json_body("Invalid authorization token")
+
+
+class AuthMiddleware:
+    """Pure ASGI middleware that authenticates requests using a bearer token."""
+
+    def __init__(self, app, tokens: TokenTable, exempt_paths=EXEMPT_PATHS):
+        self.app = app
+        self.tokens = tokens
+        self.exempt_paths = frozenset(exempt_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            return await self.app(scope, receive, send)
+
+        auth_header = b""
+        for key, value in scope["headers"]:
+            if key == b"authorization":
+                auth_header = value
+                break
+
+        if not auth_header.startswith(b"Bearer "):
+            logger.warning("Missing or invalid authorization token")
+            return await self._reject(send, _MISSING_TOKEN_BODY)
+
+        # Configured tokens are hashed as UTF-8, so the header is decoded the same way
+        try:
+            principal = self.tokens.verify(auth_header[7:].decode("utf-8"))
+        except UnicodeDecodeError:
+            principal = None
+        if principal is None:
+            logger.warning("Invalid authorization token")
+            return await self._reject(send, _INVALID_TOKEN_BODY)
+
+        # Expose the principal to handlers as request.state.principal
+        scope.setdefault("state", {})["principal"] = principal
+        reset_token = current_principal.set(principal)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_principal.reset(reset_token)
+
+    @staticmethod
+    async def _reject(send, body: bytes):
+        await send({
+            "type": "http.response.start",
+            "status": 401,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"www-authenticate", b"Bearer"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
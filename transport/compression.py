@@ -0,0 +1,171 @@
+"""
+Negotiated response compression for the HTTP transport.
+
+Responses are compressed with brotli (when the brotli package is installed)
+or gzip, whichever the client's Accept-Encoding prefers, once the body
+reaches a minimum size. Streamed responses (NDJSON/SSE) are compressed chunk
+by chunk and flushed after every chunk, so frames still reach the client as
+soon as they are produced.
+
+Every response whose encoding was negotiated carries Vary: Accept-Encoding,
+including those sent uncompressed, so shared caches key on the header.
+"""
+
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+# Try to import brotli, but fall back to gzip only if not available
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Bodies smaller than this are sent uncompressed; the saving would not pay for the CPU
+MINIMUM_SIZE = int(os.environ.get("MCP_COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = 6
+# Dynamic content: quality 4 is close to gzip's speed with better ratios
+BROTLI_QUALITY = 4
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """
+    Pick a content coding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding: Value of the request's Accept-Encoding header
+
+    Returns:
+        "br", "gzip", or None if neither is acceptable
+    """
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    candidates = ["br", "gzip"] if BROTLI_AVAILABLE else ["gzip"]
+    best = None
+    for coding in candidates:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > 0 and (best is None or q > best[1]):
+            best = (coding, q)
+    return best[0] if best else None
+
+
+class _GzipCodec:
+    def __init__(self):
+        # wbits=31 selects the gzip container
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliCodec:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+_CODECS = {"gzip": _GzipCodec, "br": _BrotliCodec}
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing responses per the client's Accept-Encoding."""
+
+    def __init__(self, app, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        await _CompressingSender(send, encoding, self.minimum_size).run(self.app, scope, receive)
+
+
+class _CompressingSender:
+    """Wraps send() for one response, deciding on the first body chunk whether to compress."""
+
+    def __init__(self, send, encoding: str | None, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.codec = None
+        self.passthrough = False
+
+    async def run(self, app, scope, receive):
+        await app(scope, receive, self.wrapped_send)
+
+    async def wrapped_send(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Hold the headers until the first body chunk shows what to do
+            self.start_message = message
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            if "content-encoding" in headers:
+                # Already encoded by the app; left exactly as it is
+                self.passthrough = True
+            else:
+                headers.add_vary_header("Accept-Encoding")
+                self.passthrough = self.encoding is None or (not more_body and len(body) < self.minimum_size)
+            if self.passthrough:
+                await self.send(start)
+                await self.send(message)
+                return
+
+            self.codec = _CODECS[self.encoding]()
+            headers["Content-Encoding"] = self.encoding
+            if not more_body:
+                body = self.codec.compress(body) + self.codec.finish()
+                headers["Content-Length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            del headers["Content-Length"]
+            await self.send(start)
+
+        if more_body:
+            chunk = self.codec.compress(body) + self.codec.flush()
+        else:
+            chunk = self.codec.compress(body) + self.codec.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
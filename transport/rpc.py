@@ -0,0 +1,358 @@
+"""
+JSON-RPC 2.0 dispatch for the HTTP transport.
+
+The dispatch table is compiled once from the FastMCP tool registry, so serving
+a call costs one dict lookup plus argument validation against the tool's
+precomputed pydantic model.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable
+
+from pydantic import ValidationError
+
+from middleware.errors import AdmissionRejected, IdempotencyConflict
+from transport.auth import current_principal
+
+logger = logging.getLogger(__name__)
+
+JSONRPC_VERSION = "2.0"
+
+# Standard JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+# Server-defined error codes
+FORBIDDEN = -32001
+RATE_LIMITED = -32002
+
+
+class RpcError(Exception):
+    """Error that maps directly onto a JSON-RPC error object."""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+    def to_dict(self) -> dict:
+        error = {"code": self.code, "message": self.message}
+        if self.data is not None:
+            error["data"] = self.data
+        return error
+
+
+@dataclass(frozen=True)
+class ToolEntry:
+    """Precompiled call information for a single registered tool."""
+
+    name: str
+    fn: Callable[..., Any]
+    is_async: bool
+    validate: Callable[[Any], Any]
+    context_kwarg: str | None = None
+    stream: Callable[..., AsyncIterator[Any]] | None = None
+
+    def _kwargs(self, arguments: dict) -> dict:
+        try:
+            parsed = self.validate(arguments)
+        except ValidationError as e:
+            raise RpcError(
+                INVALID_PARAMS,
+                f"Invalid params for '{self.name}'",
+                e.errors(include_url=False, include_context=False),
+            )
+        return parsed.model_dump_one_level()
+
+    async def call(self, arguments: dict) -> Any:
+        """
+        Validate the arguments and invoke the tool.
+
+        Args:
+            arguments: Raw keyword arguments from the request
+
+        Returns:
+            The tool's return value
+        """
+        kwargs = self._kwargs(arguments)
+        if self.context_kwarg is not None:
+            kwargs[self.context_kwarg] = None
+
+        if self.is_async:
+            return await self.fn(**kwargs)
+        return self.fn(**kwargs)
+
+    async def open_stream(self, arguments: dict) -> AsyncIterator[Any]:
+        """
+        Validate the arguments and start the tool's streaming variant.
+
+        The stream is run up to its first item here, so admission and errors
+        raised before any item is produced reach the caller as exceptions
+        rather than in the middle of a streamed response.
+
+        Args:
+            arguments: Raw keyword arguments from the request
+
+        Returns:
+            Async iterator over the tool's result items
+        """
+        items = self.stream(**self._kwargs(arguments))
+        first = await anext(items, _END)
+        return _resume(first, items)
+
+
+_END = object()
+
+
+async def _resume(first: Any, items: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """Yield an already fetched first item (unless the stream was empty), then the rest."""
+    if first is _END:
+        return
+    yield first
+    async for item in items:
+        yield item
+
+
+def build_dispatch_table(mcp, streams: dict = None) -> dict[str, ToolEntry]:
+    """
+    Compile the tool registry of a FastMCP server into a dispatch table.
+
+    Args:
+        mcp: FastMCP server produced by create_mcp_server()
+        streams: Optional mapping of tool name to an async generator function
+            that yields the tool's result items incrementally. It receives the
+            same validated arguments as the tool, and is wrapped in the stream
+            pipeline with the tool's registration options.
+
+    Returns:
+        Dictionary mapping tool names to their precompiled ToolEntry
+    """
+    # Imported here: the middleware package imports transport.auth
+    from middleware.pipeline import wrap_stream
+
+    streams = streams or {}
+    table = {}
+    for tool in mcp._tool_manager.list_tools():
+        stream = streams.get(tool.name)
+        if stream is not None:
+            stream = wrap_stream(tool.name, stream, getattr(tool.fn, "tool_options", {}))
+        table[tool.name] = ToolEntry(
+            name=tool.name,
+            fn=tool.fn,
+            is_async=tool.is_async,
+            validate=tool.fn_metadata.arg_model.model_validate,
+            context_kwarg=tool.context_kwarg,
+            stream=stream,
+        )
+    return table
+
+
+class RpcDispatcher:
+    """
+    Routes JSON-RPC messages to tools through a precompiled dispatch table.
+
+    Supported methods:
+    - tools/call: params {"name": <tool>, "arguments": {...}}
+    - tools/list (alias list_tools): describe the registered tools
+    - <tool name>: call the tool directly with params as its arguments
+
+    Batch requests (JSON arrays) run their entries concurrently, with at most
+    batch_concurrency entries in flight per batch. Tools with a streaming
+    variant can also be opened as a stream of result items (see open_stream).
+    """
+
+    def __init__(self, mcp, batch_concurrency: int = 8, streams: dict = None):
+        if batch_concurrency < 1:
+            raise ValueError("batch_concurrency must be at least 1")
+        self.batch_concurrency = batch_concurrency
+        self.tools = build_dispatch_table(mcp, streams)
+        self._tool_list = [
+            {
+                "name": tool.name,
+                "description": tool.description,
+                "inputSchema": tool.parameters,
+            }
+            for tool in mcp._tool_manager.list_tools()
+        ]
+        self._builtins = {
+            "tools/call": self._tools_call,
+            "tools/list": self._tools_list,
+            "list_tools": self._tools_list,
+        }
+
+    async def _tools_list(self, params: dict) -> dict:
+        return {"tools": self._tool_list}
+
+    async def _tools_call(self, params: dict) -> Any:
+        entry, arguments = self._resolve_tool("tools/call", params)
+        return await entry.call(arguments)
+
+    def _resolve_tool(self, method: str, params: dict) -> tuple[ToolEntry, dict]:
+        """Find the tool addressed by a tools/call or direct tool-name request."""
+        if method == "tools/call":
+            name = params.get("name")
+            if not isinstance(name, str):
+                raise RpcError(INVALID_PARAMS, "tools/call requires a tool 'name'")
+            arguments = params.get("arguments") or {}
+            if not isinstance(arguments, dict):
+                raise RpcError(INVALID_PARAMS, "tools/call 'arguments' must be an object")
+        else:
+            name, arguments = method, params
+
+        entry = self.tools.get(name)
+        if entry is None:
+            raise RpcError(METHOD_NOT_FOUND, f"Method '{name}' not found")
+        principal = current_principal.get()
+        if principal is not None and not principal.allows(name):
+            raise RpcError(FORBIDDEN, f"Token '{principal.name}' is not permitted to call '{name}'")
+        return entry, arguments
+
+    async def call(self, method: str, params: dict) -> Any:
+        """
+        Execute a single method call.
+
+        Args:
+            method: JSON-RPC method name or tool name
+            params: Method parameters (must be an object)
+
+        Returns:
+            The method result
+        """
+        builtin = self._builtins.get(method)
+        if builtin is not None:
+            return await builtin(params)
+        entry, arguments = self._resolve_tool(method, params)
+        return await entry.call(arguments)
+
+    async def open_stream(self, message: Any) -> AsyncIterator[Any] | None:
+        """
+        Start streaming the result items of a single tool request.
+
+        Args:
+            message: The decoded JSON-RPC request
+
+        Returns:
+            Async iterator over result items, or None if the request does not
+            address a tool with a streaming variant
+
+        Raises:
+            RpcError: If the call is not permitted, invalid, rate limited or
+                fails before its first item
+        """
+        if not isinstance(message, dict) or "id" not in message:
+            return None
+        method = message.get("method")
+        params = message.get("params") or {}
+        if not isinstance(method, str) or not isinstance(params, dict):
+            return None
+        if method in self._builtins and method != "tools/call":
+            return None
+        entry, arguments = self._resolve_tool(method, params)
+        if entry.stream is None:
+            return None
+        try:
+            return await entry.open_stream(arguments)
+        except Exception as e:
+            raise rpc_error(method, e)
+
+    async def handle(self, message: Any) -> dict | None:
+        """
+        Handle one decoded JSON-RPC request object.
+
+        Args:
+            message: The decoded request
+
+        Returns:
+            A JSON-RPC response object, or None for notifications
+        """
+        if not isinstance(message, dict):
+            return error_response(None, RpcError(INVALID_REQUEST, "Invalid Request"))
+
+        request_id = message.get("id")
+        is_notification = "id" not in message
+        method = message.get("method")
+        params = message.get("params")
+        if params is None:
+            params = {}
+
+        try:
+            if not isinstance(method, str):
+                raise RpcError(INVALID_REQUEST, "Invalid Request")
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "params must be an object")
+            result = await self.call(method, params)
+        except Exception as e:
+            response = error_response(request_id, rpc_error(method, e))
+        else:
+            response = {"jsonrpc": JSONRPC_VERSION, "id": request_id, "result": result}
+
+        return None if is_notification else response
+
+    async def handle_batch(self, messages: list) -> list | dict | None:
+        """
+        Handle a JSON-RPC batch concurrently under the concurrency cap.
+
+        Each entry is handled independently, so one failing call only
+        produces an error object in its own slot.
+
+        Args:
+            messages: The decoded batch array
+
+        Returns:
+            List of response objects in request order, or None if the batch
+            consisted only of notifications
+        """
+        if not messages:
+            return error_response(None, RpcError(INVALID_REQUEST, "Invalid Request: empty batch"))
+
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def run(message):
+            async with semaphore:
+                return await self.handle(message)
+
+        responses = await asyncio.gather(*(run(message) for message in messages))
+        responses = [response for response in responses if response is not None]
+        return responses or None
+
+    async def handle_payload(self, payload: Any) -> dict | list | None:
+        """
+        Handle a decoded request body, which may be a single request or a batch.
+
+        Args:
+            payload: The decoded JSON body
+
+        Returns:
+            The response object(s), or None if nothing should be sent back
+        """
+        if isinstance(payload, list):
+            return await self.handle_batch(payload)
+        return await self.handle(payload)
+
+
+def rpc_error(method: Any, error: Exception) -> RpcError:
+    """
+    Map an exception raised while executing a method onto a JSON-RPC error.
+
+    Must be called from the except block handling it, so unexpected errors
+    are logged with their traceback.
+    """
+    if isinstance(error, RpcError):
+        return error
+    if isinstance(error, IdempotencyConflict):
+        return RpcError(INVALID_PARAMS, str(error))
+    if isinstance(error, AdmissionRejected):
+        return RpcError(RATE_LIMITED, str(error), {"retry_after": round(error.retry_after, 3)})
+    logger.exception(f"Error executing method '{method}'")
+    return RpcError(INTERNAL_ERROR, f"Error executing tool {method}: {error}")
+
+
+def error_response(request_id: Any, error: RpcError) -> dict:
+    """Build a JSON-RPC error response object."""
+    return {"jsonrpc": JSONRPC_VERSION, "id": request_id, "error": error.to_dict()}
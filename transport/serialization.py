@@ -0,0 +1,62 @@
+"""
+JSON encoding and decoding for the RPC transport.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Both paths serialize the shapes tools return: plain dicts and lists,
+datetime/date/time values (as ISO 8601 strings), sets and tuples, and pydantic
+models.
+"""
+
+import datetime
+import json
+from typing import Any
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+# Try to import orjson, but fall back to the stdlib encoder if not available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _default(obj: Any) -> Any:
+    """Convert values the JSON encoder does not handle natively."""
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize obj to compact UTF-8 JSON bytes."""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    def loads(data: bytes | str) -> Any:
+        """Deserialize JSON bytes or text. Raises ValueError on invalid input."""
+        return orjson.loads(data)
+else:
+    _encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(",", ":"))
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize obj to compact UTF-8 JSON bytes."""
+        return _encoder.encode(obj).encode("utf-8")
+
+    def loads(data: bytes | str) -> Any:
+        """Deserialize JSON bytes or text. Raises ValueError on invalid input."""
+        return json.loads(data)
+
+
+class RpcJSONResponse(JSONResponse):
+    """JSONResponse rendered with the transport's fast serializer."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,91 @@
+"""
+Incremental (streamed) JSON-RPC responses for large tool results.
+
+A client opts in per request through the Accept header:
+- application/x-ndjson: one JSON object per line
+- text/event-stream: Server-Sent Events
+
+Each result item is sent as soon as the tool yields it, followed by a final
+frame carrying the JSON-RPC result (the item count) or error. Streaming tools
+fetch their upstream results a page at a time and only one item is
+serialized at a time, so server memory is bounded by the upstream page size
+rather than the result size.
+"""
+
+import logging
+from typing import Any, AsyncIterator
+
+from starlette.responses import StreamingResponse
+
+from transport.rpc import INTERNAL_ERROR, JSONRPC_VERSION, RpcError
+from transport.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+def negotiate_stream_format(accept: str) -> str | None:
+    """
+    Pick a streaming format from an Accept header.
+
+    Args:
+        accept: Value of the request's Accept header
+
+    Returns:
+        NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE, or None if streaming was not requested
+    """
+    if NDJSON_MEDIA_TYPE in accept:
+        return NDJSON_MEDIA_TYPE
+    if SSE_MEDIA_TYPE in accept:
+        return SSE_MEDIA_TYPE
+    return None
+
+
+async def _frames(request_id: Any, items: AsyncIterator[Any]):
+    """Yield (event, payload) pairs for every item and the closing frame."""
+    count = 0
+    try:
+        async for item in items:
+            count += 1
+            yield "item", {"jsonrpc": JSONRPC_VERSION, "id": request_id, "item": item}
+    except Exception as e:
+        logger.exception(f"Error while streaming result for request {request_id}")
+        error = e if isinstance(e, RpcError) else RpcError(INTERNAL_ERROR, f"Error streaming result: {e}")
+        yield "error", {"jsonrpc": JSONRPC_VERSION, "id": request_id, "error": error.to_dict()}
+        return
+    yield "result", {"jsonrpc": JSONRPC_VERSION, "id": request_id, "result": {"count": count}}
+
+
+async def ndjson_stream(request_id: Any, items: AsyncIterator[Any]):
+    """Encode a result stream as newline-delimited JSON."""
+    async for _, payload in _frames(request_id, items):
+        yield dumps(payload) + b"\n"
+
+
+async def sse_stream(request_id: Any, items: AsyncIterator[Any]):
+    """Encode a result stream as Server-Sent Events."""
+    async for event, payload in _frames(request_id, items):
+        yield b"event: " + event.encode("ascii") + b"\ndata: " + dumps(payload) + b"\n\n"
+
+
+def streaming_response(media_type: str, request_id: Any, items: AsyncIterator[Any]) -> StreamingResponse:
+    """
+    Build a chunked HTTP response that streams tool result items.
+
+    Args:
+        media_type: NDJSON_MEDIA_TYPE or SSE_MEDIA_TYPE
+        request_id: JSON-RPC id echoed in every frame
+        items: Async iterator over result items
+
+    Returns:
+        StreamingResponse sending each frame as it is produced
+    """
+    if media_type == SSE_MEDIA_TYPE:
+        body = sse_stream(request_id, items)
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    else:
+        body = ndjson_stream(request_id, items)
+        headers = {}
+    return StreamingResponse(body, media_type=media_type, headers=headers)